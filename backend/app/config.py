@@ -12,6 +12,32 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 480
 
+    # /companies/count: above this planner estimate return the estimate instead of COUNT(*)
+    count_exact_threshold: int = 20000
+    count_cache_ttl_seconds: int = 300
+
+    # /companies/public: in-memory prefix index (app.services.typeahead)
+    typeahead_index_enabled: bool = True
+    typeahead_refresh_seconds: int = 60
+    # Full background rebuild, which also drops companies deleted by other processes
+    typeahead_rebuild_seconds: int = 3600
+
+    # /companies/{id}/network: in-memory company–officer graph (app.services.officer_graph)
+    officer_graph_enabled: bool = True
+    officer_graph_rebuild_seconds: int = 900
+    # Network graphs (app.services.network_cache) and server-side node
+    # coordinates for ?layout=true (app.services.network_layout)
+    network_cache_size: int = 2000
+    network_cache_ttl_seconds: int = 3600
+    network_layout_cache_size: int = 500
+    network_layout_cache_ttl_seconds: int = 3600
+
+    # Response caches for the anonymous endpoints (app.services.public_cache)
+    public_search_cache_size: int = 10000
+    public_search_cache_ttl_seconds: int = 60
+    nav_lookup_cache_size: int = 10000
+    nav_lookup_cache_ttl_seconds: int = 3600
+
     # SMTP email notifications
     smtp_host: str = ""
     smtp_port: int = 587
@@ -31,6 +57,15 @@ class Settings(BaseSettings):
     nav_tax_number: str = ""
     nav_software_id: str = "HU00000000-00000001"
 
+    # Background jobs (Celery worker: app.worker)
+    celery_broker_url: str = "redis://localhost:6379/0"
+    celery_result_backend: str = "redis://localhost:6379/0"
+    export_dir: str = str(Path(__file__).resolve().parent.parent / "exports")
+    # A running export without a heartbeat for this long is taken over by a redelivered task or failed
+    export_job_stale_seconds: int = 1800
+    # Finished export jobs and their files are deleted after this many days
+    export_retention_days: int = 7
+
     model_config = {"env_file": str(_ENV_FILE)}
 
 
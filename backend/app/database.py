@@ -1,5 +1,9 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.schema import CreateIndex
 
 from app.config import settings
 
@@ -11,6 +15,93 @@ class Base(DeclarativeBase):
     pass
 
 
+# pg_advisory_lock key held while add_missing_columns / create_missing_indexes run
+_SCHEMA_LOCK_KEY = 0x636567
+
+
+@contextmanager
+def _schema_lock(bind):
+    """Let one process at a time change the schema (PostgreSQL only)."""
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Polled rather than waited for: a session blocked in pg_advisory_lock is an open
+        # transaction, and CREATE INDEX CONCURRENTLY in the holder would wait for it
+        while not conn.exec_driver_sql("SELECT pg_try_advisory_lock(%s)", (_SCHEMA_LOCK_KEY,)).scalar():
+            time.sleep(1)
+        try:
+            yield
+        finally:
+            conn.exec_driver_sql("SELECT pg_advisory_unlock(%s)", (_SCHEMA_LOCK_KEY,))
+
+
+def add_missing_columns(bind) -> None:
+    """Add nullable model columns that are missing from already-existing tables.
+
+    Columns are added empty; populating them is up to ``maintenance.py``.
+    Run as a deploy step (``maintenance.py migrate-schema``), not at startup.
+    """
+    if_not_exists = "IF NOT EXISTS " if bind.dialect.name == "postgresql" else ""
+    with _schema_lock(bind), bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}{column.name} {col_type}")
+
+
+def create_missing_indexes(bind) -> None:
+    """Create indexes added to models after their table already existed.
+
+    ``create_all`` skips tables that exist, together with their indexes. On
+    PostgreSQL the indexes are built ``CONCURRENTLY``, so writes to the table
+    go on meanwhile; an invalid index left by an interrupted build is
+    dropped and built again. Run as a deploy step, not at startup.
+    """
+    if bind.dialect.name != "postgresql":
+        with bind.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = _index_names(conn, table.name)
+                for index in table.indexes:
+                    if index.name not in existing:
+                        index.create(bind=conn)
+        return
+
+    with _schema_lock(bind), bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        invalid = set(conn.exec_driver_sql(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+        ).scalars())
+        for table in Base.metadata.sorted_tables:
+            existing = _index_names(conn, table.name) - invalid
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.name in invalid:
+                    conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}")
+                # CONCURRENTLY cannot run inside a transaction, hence AUTOCOMMIT
+                index.dialect_options["postgresql"]["concurrently"] = True
+                try:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                finally:
+                    index.dialect_options["postgresql"]["concurrently"] = False
+
+
+def _index_names(conn, table_name: str) -> set[str]:
+    if conn.dialect.name == "sqlite":
+        # The SQLite inspector skips expression indexes
+        rows = conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table_name,)
+        )
+        return set(rows.scalars())
+    return {index["name"] for index in inspect(conn).get_indexes(table_name)}
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -4,15 +4,22 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import Base, engine
+from app.config import settings
+from app.database import Base, SessionLocal, engine
 from app.middleware import RequestLogMiddleware
-from app.routers import auth, companies, admin, admin_stats, admin_logs, integrations, notifications, watchlist, chat, dashboard, financial_analysis, risk_analysis
+from app.services.officer_graph import officer_graph
+from app.services.typeahead import typeahead_index
+from app.routers import auth, companies, admin, admin_stats, admin_logs, integrations, notifications, watchlist, chat, dashboard, exports, financial_analysis, risk_analysis
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     import app.models  # noqa: F401 — ensure all models are loaded
     Base.metadata.create_all(bind=engine)
+    if settings.typeahead_index_enabled:
+        typeahead_index.build_in_background(SessionLocal)
+    if settings.officer_graph_enabled:
+        officer_graph.build_in_background(SessionLocal)
     yield
 
 
@@ -25,11 +32,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 app.add_middleware(RequestLogMiddleware)
 
 app.include_router(auth.router)
 app.include_router(companies.router)
+app.include_router(exports.router)
 app.include_router(admin.router)
 app.include_router(integrations.router)
 app.include_router(notifications.router)
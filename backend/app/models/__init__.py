@@ -1,10 +1,13 @@
 from app.models.chat import ChatMessage
 from app.models.company import Company
-from app.models.financial import FinancialReport, Officer
+from app.models.company_cluster import CompanyCluster
+from app.models.export_job import ExportJob
+from app.models.financial import FinancialReport, Officer, Person
+from app.models.industry_benchmark import IndustryBenchmark
 from app.models.module import Module, UserModule
 from app.models.notification import Notification
 from app.models.request_log import RequestLog
 from app.models.user import User
 from app.models.watchlist import WatchlistItem
 
-__all__ = ["ChatMessage", "Company", "FinancialReport", "Module", "Notification", "Officer", "RequestLog", "User", "UserModule", "WatchlistItem"]
+__all__ = ["ChatMessage", "Company", "CompanyCluster", "ExportJob", "FinancialReport", "IndustryBenchmark", "Module", "Notification", "Officer", "Person", "RequestLog", "User", "UserModule", "WatchlistItem"]
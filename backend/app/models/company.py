@@ -1,21 +1,59 @@
 from datetime import date, datetime
 
-from sqlalchemy import String, Boolean, Date, DateTime, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DDL, Index, String, Boolean, Date, DateTime, event, func
+from sqlalchemy.orm import Mapped, mapped_column, validates
 
 from app.database import Base
+from app.services.normalize import normalize_company_name
+
+
+def _trgm_index(column: str) -> Index:
+    """GIN trigram index so ``ILIKE '%q%'`` can use a bitmap index scan (PostgreSQL only)."""
+    return Index(
+        f"ix_companies_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
 
 
 class Company(Base):
     __tablename__ = "companies"
+    __table_args__ = (
+        _trgm_index("nev_normalized"),
+        # text_pattern_ops serves both equality and ``LIKE 'prefix%'`` regardless of collation
+        Index(
+            "ix_companies_nev_normalized",
+            "nev_normalized",
+            postgresql_ops={"nev_normalized": "text_pattern_ops"},
+        ),
+        # ``LIKE '12345678%'`` tax-number-core lookups; the unique index serves equality
+        Index(
+            "ix_companies_adoszam_pattern",
+            "adoszam",
+            postgresql_ops={"adoszam": "text_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+        _trgm_index("adoszam"),
+        _trgm_index("cegjegyzekszam"),
+        # keyset pagination: ORDER BY <column>, id (see services.pagination); the
+        # descending orders of the non-null columns scan these backwards
+        Index("ix_companies_nev_id", "nev", "id"),
+        Index("ix_companies_statusz_id", "statusz", "id"),
+        Index("ix_companies_alapitas_datuma_id", "alapitas_datuma", "id"),
+        # incremental refresh of the typeahead index (see services.typeahead)
+        Index("ix_companies_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     nev: Mapped[str] = mapped_column(String(500), index=True)
+    # Lowercased, accent-folded, legal-form-free name — kept in sync by _sync_nev_normalized
+    nev_normalized: Mapped[str | None] = mapped_column(String(500))
     rovidnev: Mapped[str | None] = mapped_column(String(500))
     adoszam: Mapped[str | None] = mapped_column(String(20), unique=True, index=True)
     cegjegyzekszam: Mapped[str | None] = mapped_column(String(20), unique=True, index=True)
     szekhely: Mapped[str | None] = mapped_column(String(500))
-    teaor_kod: Mapped[str | None] = mapped_column(String(10))
+    # The previous code is kept on change for services.industry_benchmarks
+    teaor_kod: Mapped[str | None] = mapped_column(String(10), active_history=True)
     teaor_megnevezes: Mapped[str | None] = mapped_column(String(500))
     alapitas_datuma: Mapped[date | None] = mapped_column(Date)
     statusz: Mapped[str] = mapped_column(String(50), default="aktív")
@@ -42,3 +80,31 @@ class Company(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    @validates("nev")
+    def _sync_nev_normalized(self, _key: str, value: str) -> str:
+        self.nev_normalized = normalize_company_name(value)
+        return value
+
+
+# Batch lookups match full tax numbers and 8-digit cores with one IN on the core
+# (see services.company_lookup)
+Index("ix_companies_adoszam_core", func.substr(Company.adoszam, 1, 8))
+
+
+# ``alapitas_desc`` orders by ``alapitas_datuma DESC NULLS LAST, id DESC``, which is not
+# the backward scan of ix_companies_alapitas_datuma_id (that puts NULLs first). SQLite
+# has no NULLS LAST in index definitions.
+Index(
+    "ix_companies_alapitas_datuma_desc_id",
+    Company.alapitas_datuma.desc().nulls_last(),
+    Company.id.desc(),
+).ddl_if(dialect="postgresql")
+
+
+# pg_trgm must exist before the trigram indexes above are created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
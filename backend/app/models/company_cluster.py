@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CompanyCluster(Base):
+    """Connected component of the company–officer graph a company belongs to.
+
+    Written by ``services.company_clusters.compute_clusters`` for companies in
+    groups of two or more; a company without a row stands alone.
+    """
+
+    __tablename__ = "company_clusters"
+
+    company_id: Mapped[int] = mapped_column(Integer, ForeignKey("companies.id"), primary_key=True)
+    # Smallest company id of the group, so it survives recomputation
+    cluster_id: Mapped[int] = mapped_column(Integer, index=True)
+    cluster_size: Mapped[int] = mapped_column(Integer)
+    # Companies of the group with a negative event flag (felszámolás, csőd, ...)
+    negative_count: Mapped[int] = mapped_column(Integer)
+    computed_at: Mapped[datetime] = mapped_column(DateTime)
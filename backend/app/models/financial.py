@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, Float, String, DateTime, ForeignKey, func
+from sqlalchemy import Integer, Float, Index, String, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -10,8 +10,9 @@ class FinancialReport(Base):
     __tablename__ = "financial_reports"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    company_id: Mapped[int] = mapped_column(Integer, ForeignKey("companies.id"), index=True)
-    ev: Mapped[int] = mapped_column(Integer)
+    # Previous values are kept on change for services.industry_benchmarks
+    company_id: Mapped[int] = mapped_column(Integer, ForeignKey("companies.id"), index=True, active_history=True)
+    ev: Mapped[int] = mapped_column(Integer, active_history=True)
 
     # Eredménykimutatás (ezer HUF)
     netto_arbevetel: Mapped[float | None] = mapped_column(Float)
@@ -46,13 +47,37 @@ class FinancialReport(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
 
+class Person(Base):
+    """One natural person behind officer rows of any number of companies.
+
+    Identified by normalized name + mother's name (see
+    ``services.normalize.person_identity_key``); rows are created by
+    ``services.officer_identity`` when officers are written.
+    """
+
+    __tablename__ = "persons"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    identity_key: Mapped[str] = mapped_column(String(700), unique=True, index=True)
+    nev: Mapped[str] = mapped_column(String(300))
+    anyja_neve: Mapped[str | None] = mapped_column(String(300))
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
 class Officer(Base):
     __tablename__ = "officers"
+    __table_args__ = (
+        # company -> person -> other companies, without touching the table rows
+        Index("ix_officers_person_id_company_id", "person_id", "company_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     company_id: Mapped[int] = mapped_column(Integer, ForeignKey("companies.id"), index=True)
     nev: Mapped[str] = mapped_column(String(300))
     anyja_neve: Mapped[str | None] = mapped_column(String(300))
     titulus: Mapped[str | None] = mapped_column(String(200))
+    # Kept in sync by services.officer_identity; NULL only before the backfill
+    person_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("persons.id"))
 
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class IndustryBenchmark(Base):
+    """Averages of the reports of one year over the companies of one TEÁOR code.
+
+    Maintained by ``services.industry_benchmarks``: rebuilt by
+    ``maintenance.py refresh-benchmarks`` and refreshed after every commit
+    that writes reports or changes a company's TEÁOR code. Each average
+    comes with the number of reports it was taken over (``NULL`` values are
+    skipped), so a single company's report can be taken back out of it.
+    """
+
+    __tablename__ = "industry_benchmarks"
+
+    teaor_kod: Mapped[str] = mapped_column(String(10), primary_key=True)
+    ev: Mapped[int] = mapped_column(Integer, primary_key=True)
+    company_count: Mapped[int] = mapped_column(Integer)
+
+    avg_profit_margin: Mapped[float | None] = mapped_column(Float)
+    profit_margin_count: Mapped[int] = mapped_column(Integer)
+    avg_roe: Mapped[float | None] = mapped_column(Float)
+    roe_count: Mapped[int] = mapped_column(Integer)
+    avg_debt_ratio: Mapped[float | None] = mapped_column(Float)
+    debt_ratio_count: Mapped[int] = mapped_column(Integer)
+    avg_liquidity: Mapped[float | None] = mapped_column(Float)
+    liquidity_count: Mapped[int] = mapped_column(Integer)
+    avg_revenue: Mapped[float | None] = mapped_column(Float)
+    revenue_count: Mapped[int] = mapped_column(Integer)
+    avg_ebitda: Mapped[float | None] = mapped_column(Float)
+    ebitda_count: Mapped[int] = mapped_column(Integer)
+
+    computed_at: Mapped[datetime] = mapped_column(DateTime)
@@ -10,6 +10,8 @@ from app.models.chat import ChatMessage
 from app.models.company import Company
 from app.models.request_log import RequestLog
 from app.models.user import User
+from app.services.cache import cache_stats
+from app.services.officer_graph import officer_graph
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -124,3 +126,15 @@ def get_admin_stats(db: Session = Depends(get_db), _admin: User = Depends(requir
         "avg_response_time_ms": round(avg_response_time_ms, 2),
         "top_searched_companies": top_searched_companies,
     }
+
+
+@router.get("/cache-stats")
+def get_cache_stats(_admin: User = Depends(require_admin)):
+    """Hit/miss/eviction counters of the in-process caches of the worker that answers."""
+    return cache_stats()
+
+
+@router.get("/officer-graph-stats")
+def get_officer_graph_stats(_admin: User = Depends(require_admin)):
+    """Size and memory use of the in-memory officer graph of the worker that answers."""
+    return officer_graph.stats()
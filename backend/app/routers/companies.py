@@ -1,68 +1,116 @@
-import csv
-import io
+import json
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy import or_, func as sa_func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 from app.auth import get_current_user
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.company import Company
+from app.models.company_cluster import CompanyCluster
 from app.models.financial import FinancialReport, Officer
 from app.models.user import User
-from app.schemas.company import CompanyRead, CompanyListItem, CompanyPublicItem, MarketingExportRequest
+from app.models.watchlist import WatchlistItem
+from app.schemas.company import (
+    CompanyClusterRead,
+    CompanyFacets,
+    CompanyListItem,
+    CompanyLookupRequest,
+    CompanyLookupResult,
+    CompanyPublicItem,
+    CompanyRead,
+    CompanySearchResponse,
+    MarketingExportRequest,
+)
+from app.schemas.company_profile import CompanyProfile
 from app.schemas.financial import FinancialReportRead, OfficerRead
+from app.schemas.watchlist import WatchlistStatus
+from app.services.company_count import count_filtered, count_generation, remember_count
+from app.services.company_facets import compute_facets
+from app.services.company_lookup import lookup_companies
+from app.services.company_search import apply_filters, order_clauses, sort_key
+from app.services.export import (
+    COMPANY_EXPORT_COLUMNS,
+    MARKETING_EXPORT_COLUMNS,
+    export_row_limit,
+    iter_csv,
+    select_columns,
+    stream_rows,
+    stream_rows_by_ids,
+)
+from app.services.fieldsets import UnknownField, dump_fields, load_fields, parse_fields
+from app.services.financial_metrics import build_financial_analysis
+from app.services.network import (
+    DEFAULT_MAX_EDGES,
+    DEFAULT_MAX_NODES,
+    DEFAULT_MAX_PATHS,
+    DEFAULT_MAX_VISITS,
+    MAX_DEPTH,
+    MAX_EDGES,
+    MAX_NODES,
+    MAX_PATH_LENGTH,
+    MAX_PATHS,
+    MAX_VISITS,
+    NetworkWalk,
+    shortest_paths,
+    sql_expand,
+)
+from app.services.network_export import (
+    MAX_EXPORT_DEPTH,
+    MAX_EXPORT_EDGES,
+    MAX_EXPORT_NODES,
+    NETWORK_EXPORT_FORMATS,
+    NetworkExportFormat,
+    iter_network_export,
+)
+from app.services.network_cache import cached_network
+from app.services.network_layout import add_layout
+from app.services.officer_graph import officer_graph
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_order, rows_after
+from app.services.public_cache import public_search_cache, public_search_key
+from app.services.risk import build_risk_analysis, pick_latest_report
+from app.services.typeahead import typeahead_index
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
-ORDER_BY_MAP = {
-    "nev_asc": Company.nev.asc(),
-    "nev_desc": Company.nev.desc(),
-    "alapitas_asc": Company.alapitas_datuma.asc(),
-    "alapitas_desc": Company.alapitas_datuma.desc(),
-    "statusz_asc": Company.statusz.asc(),
-    "statusz_desc": Company.statusz.desc(),
-}
-
-
-def _apply_filters(query, params: dict):
-    """Apply shared filter logic for list and count endpoints."""
-    q = params.get("q")
-    if q:
-        pattern = f"%{q}%"
-        query = query.filter(
-            or_(
-                Company.nev.ilike(pattern),
-                Company.adoszam.ilike(pattern),
-                Company.cegjegyzekszam.ilike(pattern),
-            )
-        )
-    if params.get("statusz"):
-        query = query.filter(Company.statusz == params["statusz"])
-    if params.get("cegforma"):
-        query = query.filter(Company.cegforma.ilike(f"%{params['cegforma']}%"))
-    if params.get("teaor_kod"):
-        query = query.filter(Company.teaor_kod == params["teaor_kod"])
-    if params.get("fotevekenyseg"):
-        query = query.filter(Company.fotevekenyseg.ilike(f"%{params['fotevekenyseg']}%"))
-    if params.get("szekhely"):
-        query = query.filter(Company.szekhely.ilike(f"%{params['szekhely']}%"))
-    if params.get("alapitas_tol"):
-        query = query.filter(Company.alapitas_datuma >= params["alapitas_tol"])
-    if params.get("alapitas_ig"):
-        query = query.filter(Company.alapitas_datuma <= params["alapitas_ig"])
-    if params.get("letszam_kategoria"):
-        query = query.filter(Company.letszam_kategoria == params["letszam_kategoria"])
-
-    # Boolean filters
-    for field in ("felszamolas", "csodeljras", "vegelszamolas", "kenyszertorles", "afa_alany"):
-        val = params.get(field)
-        if val is not None:
-            query = query.filter(getattr(Company, field) == val)
-
-    return query
+PROFILE_SECTIONS = ("financials", "officers", "risk", "financial_analysis", "watchlist")
+
+# Batch lookups above this many values are always streamed as NDJSON
+LOOKUP_NDJSON_THRESHOLD = 1000
+
+FIELDS_DESCRIPTION = "Vesszővel elválasztott mezőnevek; csak ezek (és az id) kerülnek a válaszba"
+
+
+def _parse_fields(fields: str | None, allowed) -> list[str] | None:
+    try:
+        return parse_fields(fields, allowed)
+    except UnknownField as exc:
+        raise HTTPException(status_code=400, detail=f"Ismeretlen mező: {exc}")
+
+
+def _export_columns(columns: list[tuple[str, str]], fields: str | None) -> list[tuple[str, str]]:
+    return select_columns(columns, _parse_fields(fields, [attr for _, attr in columns]))
+
+
+def _fetch_page(query, order_by: str | None, skip: int, limit: int, cursor: str | None) -> list[Company]:
+    """Fetch ``limit + 1`` rows so the caller can tell whether another page exists."""
+    order_key, column, descending = sort_key(order_by)
+    query = query.order_by(*keyset_order(column, descending, Company.id))
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, order_key, column)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Érvénytelen lapozási cursor")
+        return rows_after(query, column, descending, Company.id, value, row_id, limit + 1)
+    return query.offset(skip).limit(limit + 1).all()
+
+
+def _cursor_for(order_by: str | None, row: Company) -> str:
+    order_key, column, _ = sort_key(order_by)
+    return encode_cursor(order_key, getattr(row, column.key), row.id)
 
 
 def _collect_filter_params(
@@ -81,31 +129,84 @@ def _collect_filter_params(
     }
 
 
+def _network_expansion():
+    """The in-memory officer graph once it is built, SQL joins until then."""
+    if officer_graph.ready:
+        officer_graph.rebuild_if_due(SessionLocal)
+        return officer_graph.expand
+    return sql_expand
+
+
 @router.get("/public", response_model=list[CompanyPublicItem])
 def public_search(
     q: str = Query(..., min_length=2, description="Keresés név, adószám vagy cégjegyzékszám alapján"),
     db: Session = Depends(get_db),
 ):
     """Public search endpoint — no auth required, returns limited fields, max 10 results."""
-    pattern = f"%{q}%"
-    results = (
-        db.query(Company)
-        .filter(
-            or_(
-                Company.nev.ilike(pattern),
-                Company.adoszam.ilike(pattern),
-                Company.cegjegyzekszam.ilike(pattern),
-            )
-        )
-        .order_by(Company.nev)
-        .limit(10)
-        .all()
-    )
-    return results
+    key = public_search_key(q)
+    cached = public_search_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = public_search_cache.generation
+    if typeahead_index.ready:
+        typeahead_index.refresh_if_due(db)
+        result = typeahead_index.search(q, limit=10)
+    else:
+        query = apply_filters(db.query(Company), {"q": q})
+        rows = query.order_by(Company.nev).limit(10).all()
+        result = [CompanyPublicItem.model_validate(row).model_dump() for row in rows]
+    public_search_cache.set(key, result, generation)
+    return result
 
 
 @router.get("/", response_model=list[CompanyListItem])
 def list_companies(
+    response: Response,
+    q: str | None = Query(None, description="Keresés név, adószám vagy cégjegyzékszám alapján"),
+    statusz: str | None = Query(None),
+    cegforma: str | None = Query(None),
+    teaor_kod: str | None = Query(None),
+    fotevekenyseg: str | None = Query(None),
+    szekhely: str | None = Query(None, description="Részleges egyezés a címre"),
+    alapitas_tol: date | None = Query(None),
+    alapitas_ig: date | None = Query(None),
+    letszam_kategoria: str | None = Query(None),
+    felszamolas: bool | None = Query(None),
+    csodeljras: bool | None = Query(None),
+    vegelszamolas: bool | None = Query(None),
+    kenyszertorles: bool | None = Query(None),
+    afa_alany: bool | None = Query(None),
+    order_by: str | None = Query(None, description="Rendezés: nev_asc, nev_desc, alapitas_asc, alapitas_desc, statusz_asc, statusz_desc"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Az előző oldal X-Next-Cursor fejléce; megadása esetén a skip figyelmen kívül marad"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    names = _parse_fields(fields, CompanyListItem.model_fields)
+    params = _collect_filter_params(
+        q, statusz, cegforma, teaor_kod, fotevekenyseg, szekhely,
+        alapitas_tol, alapitas_ig, letszam_kategoria,
+        felszamolas, csodeljras, vegelszamolas, kenyszertorles, afa_alany,
+    )
+    query = apply_filters(db.query(Company), params)
+    if names is not None:
+        query = query.options(load_fields(names, sort_key(order_by)[1]))
+    rows = _fetch_page(query, order_by, skip, limit, cursor)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _cursor_for(order_by, rows[-1])
+    if names is not None:
+        # Bypass response_model: it would require (and lazy-load) every column
+        return JSONResponse(jsonable_encoder([dump_fields(row, names) for row in rows]), headers=headers)
+    response.headers.update(headers)
+    return rows
+
+
+@router.get("/search", response_model=CompanySearchResponse)
+def search_companies(
     q: str | None = Query(None, description="Keresés név, adószám vagy cégjegyzékszám alapján"),
     statusz: str | None = Query(None),
     cegforma: str | None = Query(None),
@@ -123,18 +224,38 @@ def list_companies(
     order_by: str | None = Query(None, description="Rendezés: nev_asc, nev_desc, alapitas_asc, alapitas_desc, statusz_asc, statusz_desc"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Az előző válasz next_cursor mezője; megadása esetén a skip figyelmen kívül marad"),
+    facets: bool = Query(False, description="Facet-számok is (pontos összesítés a teljes szűrt halmazon, lassabb)"),
     db: Session = Depends(get_db),
     _user: User = Depends(get_current_user),
 ):
+    """Találati oldal és összes találat (igény szerint facet-számok) egyetlen kérésben."""
     params = _collect_filter_params(
         q, statusz, cegforma, teaor_kod, fotevekenyseg, szekhely,
         alapitas_tol, alapitas_ig, letszam_kategoria,
         felszamolas, csodeljras, vegelszamolas, kenyszertorles, afa_alany,
     )
-    query = _apply_filters(db.query(Company), params)
-    if order_by and order_by in ORDER_BY_MAP:
-        query = query.order_by(ORDER_BY_MAP[order_by])
-    return query.offset(skip).limit(limit).all()
+    query = apply_filters(db.query(Company), params)
+    rows = _fetch_page(query, order_by, skip, limit, cursor)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _cursor_for(order_by, rows[-1])
+
+    if not facets:
+        total, is_estimate = count_filtered(db, query, params)
+        return CompanySearchResponse(items=rows, total=total, total_is_estimate=is_estimate, next_cursor=next_cursor)
+
+    # The facet query counts the whole set anyway; its total serves later counts
+    generation = count_generation()
+    total, facet_counts = compute_facets(db, query)
+    remember_count(params, total, generation)
+    return CompanySearchResponse(
+        items=rows,
+        total=total,
+        next_cursor=next_cursor,
+        facets=CompanyFacets(**facet_counts),
+    )
 
 
 @router.get("/count")
@@ -153,6 +274,7 @@ def count_companies(
     vegelszamolas: bool | None = Query(None),
     kenyszertorles: bool | None = Query(None),
     afa_alany: bool | None = Query(None),
+    exact: bool = Query(False, description="Pontos darabszám becslés helyett (lassabb széles szűrésnél)"),
     db: Session = Depends(get_db),
     _user: User = Depends(get_current_user),
 ):
@@ -161,8 +283,9 @@ def count_companies(
         alapitas_tol, alapitas_ig, letszam_kategoria,
         felszamolas, csodeljras, vegelszamolas, kenyszertorles, afa_alany,
     )
-    query = _apply_filters(db.query(Company), params)
-    return {"count": query.count()}
+    query = apply_filters(db.query(Company), params)
+    count, is_estimate = count_filtered(db, query, params, exact=exact)
+    return {"count": count, "is_estimate": is_estimate}
 
 
 @router.get("/export/csv")
@@ -182,41 +305,27 @@ def export_csv(
     kenyszertorles: bool | None = Query(None),
     afa_alany: bool | None = Query(None),
     order_by: str | None = Query(None),
+    fields: str | None = Query(None, description="Vesszővel elválasztott oszlopok (attribútumnevek), ebben a sorrendben"),
     db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    user: User = Depends(get_current_user),
 ):
+    columns = _export_columns(COMPANY_EXPORT_COLUMNS, fields)
     params = _collect_filter_params(
         q, statusz, cegforma, teaor_kod, fotevekenyseg, szekhely,
         alapitas_tol, alapitas_ig, letszam_kategoria,
         felszamolas, csodeljras, vegelszamolas, kenyszertorles, afa_alany,
     )
-    query = _apply_filters(db.query(Company), params)
-    if order_by and order_by in ORDER_BY_MAP:
-        query = query.order_by(ORDER_BY_MAP[order_by])
-    rows = query.limit(5000).all()
-
-    columns = [
-        ("Cégnév", "nev"),
-        ("Adószám", "adoszam"),
-        ("Cégjegyzékszám", "cegjegyzekszam"),
-        ("Székhely", "szekhely"),
-        ("Cégforma", "cegforma"),
-        ("Státusz", "statusz"),
-        ("TEÁOR kód", "teaor_kod"),
-        ("Fő tevékenység", "fotevekenyseg"),
-        ("Alapítás dátuma", "alapitas_datuma"),
-        ("Létszám kategória", "letszam_kategoria"),
-    ]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([col[0] for col in columns])
-    for row in rows:
-        writer.writerow([getattr(row, col[1], "") or "" for col in columns])
-
-    output.seek(0)
+    query = apply_filters(db.query(Company), params).order_by(*order_clauses(order_by))
+    rows = stream_rows(query, columns, limit=export_row_limit(user))
+
+    def generate():
+        try:
+            yield from iter_csv(rows, columns)
+        finally:
+            db.close()
+
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=cegverzum_export.csv"},
     )
@@ -225,50 +334,120 @@ def export_csv(
 @router.post("/export/marketing")
 def export_marketing_csv(
     body: MarketingExportRequest,
+    fields: str | None = Query(None, description="Vesszővel elválasztott oszlopok (attribútumnevek), ebben a sorrendben"),
     db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    user: User = Depends(get_current_user),
 ):
-    rows = db.query(Company).filter(Company.id.in_(body.ids)).all()
-
-    columns = [
-        ("Cégnév", "nev"),
-        ("Rövidnév", "rovidnev"),
-        ("Adószám", "adoszam"),
-        ("Cégjegyzékszám", "cegjegyzekszam"),
-        ("Székhely", "szekhely"),
-        ("Cégforma", "cegforma"),
-        ("Státusz", "statusz"),
-        ("TEÁOR kód", "teaor_kod"),
-        ("Fő tevékenység", "fotevekenyseg"),
-        ("Alapítás dátuma", "alapitas_datuma"),
-        ("Létszám kategória", "letszam_kategoria"),
-        ("Email", "email"),
-        ("Telefon", "telefon"),
-        ("Weboldal", "weboldal"),
-    ]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([col[0] for col in columns])
-    for row in rows:
-        writer.writerow([getattr(row, col[1], "") or "" for col in columns])
-
-    output.seek(0)
+    columns = _export_columns(MARKETING_EXPORT_COLUMNS, fields)
+    limit = export_row_limit(user)
+    if limit is not None and len(set(body.ids)) > limit:
+        raise HTTPException(status_code=403, detail=f"A csomagodban legfeljebb {limit} cég exportálható egyszerre")
+    rows = stream_rows_by_ids(db, body.ids, columns)
+
+    def generate():
+        try:
+            yield from iter_csv(rows, columns)
+        finally:
+            db.close()
+
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=cegverzum_marketing.csv"},
     )
 
 
+@router.post("/lookup", response_model=list[CompanyLookupResult])
+def lookup_companies_batch(
+    body: CompanyLookupRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Resolve a list of adószám / cégjegyzékszám values, one result per value in input order.
+
+    Answers with NDJSON (one result per line, streamed) when the client accepts
+    ``application/x-ndjson`` or sends more than ``LOOKUP_NDJSON_THRESHOLD`` values.
+    """
+    results = lookup_companies(db, body.values)
+    if len(body.values) <= LOOKUP_NDJSON_THRESHOLD and "application/x-ndjson" not in request.headers.get("accept", ""):
+        return list(results)
+
+    def generate():
+        try:
+            for result in results:
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{company_id}", response_model=CompanyRead)
-def get_company(company_id: int, db: Session = Depends(get_db), _user: User = Depends(get_current_user)):
-    company = db.get(Company, company_id)
+def get_company(
+    company_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    names = _parse_fields(fields, CompanyRead.model_fields)
+    if names is None:
+        company = db.get(Company, company_id)
+    else:
+        company = db.query(Company).options(load_fields(names)).filter(Company.id == company_id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Cég nem található")
+    if names is not None:
+        return JSONResponse(jsonable_encoder(dump_fields(company, names)))
     return company
 
 
+@router.get("/{company_id}/profile", response_model=CompanyProfile)
+def get_company_profile(
+    company_id: int,
+    include: str | None = Query(None, description="Vesszővel elválasztott szekciók; alapértelmezés: mind"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Company page data in one request: the company with its watchlist status, then
+    at most one query each for financial reports and officers."""
+    sections = set(PROFILE_SECTIONS) if include is None else {s.strip() for s in include.split(",") if s.strip()}
+    unknown = sections - set(PROFILE_SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Ismeretlen include érték: {', '.join(sorted(unknown))}")
+
+    row = (
+        db.query(Company, WatchlistItem.id, CompanyCluster)
+        .outerjoin(WatchlistItem, and_(WatchlistItem.company_id == Company.id, WatchlistItem.user_id == user.id))
+        .outerjoin(CompanyCluster, CompanyCluster.company_id == Company.id)
+        .filter(Company.id == company_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Cég nem található")
+    company, watchlist_item_id, cluster = row
+
+    profile = CompanyProfile(company=company)
+    if sections & {"financials", "risk", "financial_analysis"}:
+        reports = (
+            db.query(FinancialReport)
+            .filter(FinancialReport.company_id == company_id)
+            .order_by(FinancialReport.ev)
+            .all()
+        )
+        if "financials" in sections:
+            profile.financials = reports
+        if "risk" in sections:
+            profile.risk = build_risk_analysis(company, pick_latest_report(reports), cluster)
+        if "financial_analysis" in sections:
+            profile.financial_analysis = build_financial_analysis(company, reports)
+    if "officers" in sections:
+        profile.officers = db.query(Officer).filter(Officer.company_id == company_id).all()
+    if "watchlist" in sections:
+        profile.watchlist = WatchlistStatus(is_watched=watchlist_item_id is not None, watchlist_item_id=watchlist_item_id)
+    return profile
+
+
 @router.get("/{company_id}/financials", response_model=list[FinancialReportRead])
 def get_financials(company_id: int, db: Session = Depends(get_db), _user: User = Depends(get_current_user)):
     company = db.get(Company, company_id)
@@ -286,86 +465,73 @@ def get_officers(company_id: int, db: Session = Depends(get_db), _user: User = D
 
 
 @router.get("/{company_id}/network")
-def get_network(company_id: int, db: Session = Depends(get_db), _user: User = Depends(get_current_user)):
-    """Build a 2-level connection graph through shared officers."""
-    company = db.get(Company, company_id)
-    if not company:
+def get_network(
+    company_id: int,
+    depth: int = Query(2, ge=1, le=MAX_DEPTH, description="Ennyi szintnyi kapcsolat a cég körül"),
+    max_nodes: int = Query(DEFAULT_MAX_NODES, ge=1, le=MAX_NODES),
+    max_edges: int = Query(DEFAULT_MAX_EDGES, ge=1, le=MAX_EDGES),
+    layout: bool = Query(False, description="Csúcsok koordinátái (x, y) szerveroldali elrendezéssel"),
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Connection graph through shared officers, ``depth`` levels around the company."""
+    key = (company_id, depth, max_nodes, max_edges)
+    network = cached_network(db, key, _network_expansion())
+    if network is None:
         raise HTTPException(status_code=404, detail="Cég nem található")
+    if layout:
+        network = add_layout(network, key)
+    cluster = db.get(CompanyCluster, company_id)
+    return {**network, "cluster": CompanyClusterRead.model_validate(cluster) if cluster else None}
+
+
+@router.get("/{company_id}/network/export")
+def export_network(
+    company_id: int,
+    format: NetworkExportFormat = Query("graphml", description="graphml, gexf vagy ndjson"),
+    depth: int = Query(2, ge=1, le=MAX_EXPORT_DEPTH, description="Ennyi szintnyi kapcsolat a cég körül"),
+    max_nodes: int = Query(MAX_NODES, ge=1, le=MAX_EXPORT_NODES),
+    max_edges: int = Query(MAX_EDGES, ge=1, le=MAX_EXPORT_EDGES),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Connection graph streamed level by level as GraphML, GEXF or NDJSON (e.g. for Gephi).
 
-    # Level 1: officers of this company
-    officers = db.query(Officer).filter(Officer.company_id == company_id).all()
+    Nodes count as exported rows: ``max_nodes`` is capped at the package's export limit.
+    """
+    if db.get(Company, company_id) is None:
+        raise HTTPException(status_code=404, detail="Cég nem található")
+    row_limit = export_row_limit(user)
+    if row_limit is not None:
+        max_nodes = min(max_nodes, row_limit)
+    walk = NetworkWalk(db, company_id, depth, max_nodes, max_edges, _network_expansion())
+    media_type, extension = NETWORK_EXPORT_FORMATS[format]
+
+    def generate():
+        try:
+            yield from iter_network_export(walk, format)
+        finally:
+            db.close()
 
-    nodes_map: dict[int, dict] = {
-        company.id: {"id": company.id, "nev": company.nev, "statusz": company.statusz, "is_center": True}
-    }
-    links_map: dict[tuple[int, int], list[str]] = {}
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=cegverzum_network_{company_id}.{extension}"},
+    )
 
-    for officer in officers:
-        # Find other companies where this officer also appears
-        other_officers = (
-            db.query(Officer)
-            .filter(Officer.nev == officer.nev, Officer.company_id != company_id)
-            .all()
-        )
-        for other_off in other_officers:
-            other_company = db.get(Company, other_off.company_id)
-            if not other_company:
-                continue
-
-            if other_company.id not in nodes_map:
-                nodes_map[other_company.id] = {
-                    "id": other_company.id,
-                    "nev": other_company.nev,
-                    "statusz": other_company.statusz,
-                    "is_center": False,
-                }
-
-            link_key = (min(company_id, other_company.id), max(company_id, other_company.id))
-            if link_key not in links_map:
-                links_map[link_key] = []
-            if officer.nev not in links_map[link_key]:
-                links_map[link_key].append(officer.nev)
-
-            # Level 2: officers of connected companies → find their other companies
-            level2_officers = (
-                db.query(Officer)
-                .filter(Officer.company_id == other_company.id)
-                .all()
-            )
-            for l2_off in level2_officers:
-                l2_others = (
-                    db.query(Officer)
-                    .filter(
-                        Officer.nev == l2_off.nev,
-                        Officer.company_id != other_company.id,
-                        Officer.company_id != company_id,
-                    )
-                    .all()
-                )
-                for l2_other in l2_others:
-                    l2_company = db.get(Company, l2_other.company_id)
-                    if not l2_company:
-                        continue
-                    if l2_company.id not in nodes_map:
-                        nodes_map[l2_company.id] = {
-                            "id": l2_company.id,
-                            "nev": l2_company.nev,
-                            "statusz": l2_company.statusz,
-                            "is_center": False,
-                        }
-                    l2_key = (
-                        min(other_company.id, l2_company.id),
-                        max(other_company.id, l2_company.id),
-                    )
-                    if l2_key not in links_map:
-                        links_map[l2_key] = []
-                    if l2_off.nev not in links_map[l2_key]:
-                        links_map[l2_key].append(l2_off.nev)
-
-    nodes = list(nodes_map.values())
-    links = [
-        {"source": src, "target": tgt, "officers": names}
-        for (src, tgt), names in links_map.items()
-    ]
-
-    return {"nodes": nodes, "links": links}
+
+@router.get("/{company_id}/path/{target_id}")
+def get_connection_path(
+    company_id: int,
+    target_id: int,
+    max_length: int = Query(4, ge=1, le=MAX_PATH_LENGTH, description="Leghosszabb keresett út (kapcsolatok száma)"),
+    max_visits: int = Query(DEFAULT_MAX_VISITS, ge=2, le=MAX_VISITS, description="Legfeljebb ennyi céget jár be a keresés"),
+    max_paths: int = Query(DEFAULT_MAX_PATHS, ge=1, le=MAX_PATHS),
+    db: Session = Depends(get_db),
+    _user: User = Depends(get_current_user),
+):
+    """Shortest connections between two companies through shared officers."""
+    result = shortest_paths(db, company_id, target_id, max_length, max_visits, max_paths, _network_expansion())
+    if result is None:
+        raise HTTPException(status_code=404, detail="Cég nem található")
+    return result
@@ -0,0 +1,104 @@
+import json
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.models.export_job import ExportJob
+from app.models.user import User
+from app.schemas.export_job import ExportJobCreate, ExportJobRead
+from app.services.export import export_row_limit
+from app.services.export_jobs import EXPORT_FORMATS, delete_job_file, fail_job, fail_stale_jobs, job_columns
+from app.services.fieldsets import UnknownField
+from app.worker import run_export
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Unfinished (queued/running) jobs per user
+ACTIVE_JOB_LIMIT = 3
+
+
+def _get_job(db: Session, user: User, job_id: int) -> ExportJob:
+    job = db.query(ExportJob).filter(ExportJob.id == job_id, ExportJob.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export nem található")
+    return job
+
+
+@router.post("", response_model=ExportJobRead, status_code=202)
+def create_export(body: ExportJobCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    limit = export_row_limit(user)
+    if body.ids is not None and limit is not None and len(set(body.ids)) > limit:
+        raise HTTPException(status_code=403, detail=f"A csomagodban legfeljebb {limit} cég exportálható egyszerre")
+    fail_stale_jobs(db, user.id)
+    active = (
+        db.query(ExportJob)
+        .filter(ExportJob.user_id == user.id, ExportJob.status.in_(("queued", "running")))
+        .count()
+    )
+    if active >= ACTIVE_JOB_LIMIT:
+        raise HTTPException(status_code=429, detail="Túl sok folyamatban lévő export, várd meg, amíg elkészülnek")
+
+    if body.ids is not None:
+        params = {"ids": body.ids, "dataset": body.dataset}
+    else:
+        filters = body.filters.model_dump(mode="json", exclude_none=True) if body.filters else {}
+        params = {"filters": filters, "order_by": body.order_by, "dataset": body.dataset}
+    if body.fields is not None:
+        params["fields"] = list(dict.fromkeys(body.fields))
+        try:
+            job_columns(params)
+        except UnknownField as exc:
+            raise HTTPException(status_code=400, detail=f"Ismeretlen mező: {exc}")
+    job = ExportJob(user_id=user.id, format=body.format, params=json.dumps(params), processed_rows=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    try:
+        run_export.delay(job.id)
+    except Exception:
+        logger.exception("Export job %s could not be queued", job.id)
+        fail_job(db, job, "Az exportot nem sikerült elindítani")
+        raise HTTPException(status_code=503, detail="Az export most nem indítható, próbáld újra később")
+    return job
+
+
+@router.get("", response_model=list[ExportJobRead])
+def list_exports(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return (
+        db.query(ExportJob)
+        .filter(ExportJob.user_id == user.id)
+        .order_by(ExportJob.id.desc())
+        .limit(50)
+        .all()
+    )
+
+
+@router.get("/{job_id}", response_model=ExportJobRead)
+def get_export(job_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return _get_job(db, user, job_id)
+
+
+@router.get("/{job_id}/download")
+def download_export(job_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    job = _get_job(db, user, job_id)
+    if job.status != "done" or not job.file_path:
+        raise HTTPException(status_code=409, detail="Az export még nem készült el")
+    extension, media_type, _ = EXPORT_FORMATS[job.format]
+    return FileResponse(job.file_path, media_type=media_type, filename=f"cegverzum_export_{job.id}{extension}")
+
+
+@router.delete("/{job_id}", status_code=204)
+def delete_export(job_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    fail_stale_jobs(db, user.id)
+    job = _get_job(db, user, job_id)
+    if job.status == "running":
+        raise HTTPException(status_code=409, detail="Futó export nem törölhető")
+    delete_job_file(job)
+    db.delete(job)
+    db.commit()
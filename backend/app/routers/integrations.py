@@ -11,6 +11,8 @@ from app.models.company import Company
 from app.models.user import User
 from app.schemas.nav import NavIntegrationStatus, NavTaxpayerResponse
 from app.services.nav_client import query_taxpayer
+from app.services.normalize import normalize_company_name
+from app.services.public_cache import nav_lookup_cache, nav_lookup_key
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +104,19 @@ def nav_query(
     if sync and result.get("taxpayerName"):
         clean = adoszam.strip().replace("-", "")[:8]
         company = db.query(Company).filter(Company.adoszam.like(f"{clean}%")).first()
+        tn = result.get("taxNumberDetail") or {}
+        if not company:
+            # Known by name but not yet by tax number — one indexed equality lookup
+            company = (
+                db.query(Company)
+                .filter(
+                    Company.adoszam.is_(None),
+                    Company.nev_normalized == normalize_company_name(result["taxpayerName"]),
+                )
+                .first()
+            )
+            if company and tn.get("vatCode") and tn.get("countyCode"):
+                company.adoszam = f"{clean}-{tn['vatCode']}-{tn['countyCode']}"
         if company:
             company.nev = result["taxpayerName"]
             if result.get("taxpayerShortName"):
@@ -111,7 +126,6 @@ def nav_query(
             if result.get("incorporation"):
                 company.cegforma = result["incorporation"]
             # VAT status: if vatCode is "2" the entity is VAT-registered
-            tn = result.get("taxNumberDetail") or {}
             if tn.get("vatCode"):
                 company.afa_alany = tn["vatCode"] == "2"
             # Check validity — if end date is set, taxpayer is deleted
@@ -132,6 +146,11 @@ def nav_public_lookup(adoszam: str):
     if not _nav_configured():
         raise HTTPException(status_code=503, detail="NAV API nincs konfigurálva")
 
+    key = nav_lookup_key(adoszam)
+    cached = nav_lookup_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         result = query_taxpayer(adoszam)
     except HTTPError as exc:
@@ -144,6 +163,7 @@ def nav_public_lookup(adoszam: str):
             detail=result.get("message") or f"NAV hiba: {result.get('errorCode', 'ismeretlen')}",
         )
 
+    nav_lookup_cache.set(key, result)
     return result
 
 
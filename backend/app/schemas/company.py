@@ -11,8 +11,8 @@ class MarketingExportRequest(BaseModel):
     def validate_ids(cls, v: list[int]) -> list[int]:
         if len(v) == 0:
             raise ValueError("ids list must not be empty")
-        if len(v) > 5000:
-            raise ValueError("ids list must not exceed 5000 items")
+        if len(v) > 50_000:
+            raise ValueError("ids list must not exceed 50000 items")
         return v
 
 
@@ -46,6 +46,26 @@ class CompanyListItem(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CompanyLookupRequest(BaseModel):
+    # Adószám (8-digit core or full) or cégjegyzékszám, dashes optional
+    values: list[str]
+
+    @field_validator("values")
+    @classmethod
+    def validate_values(cls, v: list[str]) -> list[str]:
+        if len(v) == 0:
+            raise ValueError("values list must not be empty")
+        if len(v) > 10_000:
+            raise ValueError("values list must not exceed 10000 items")
+        return v
+
+
+class CompanyLookupResult(BaseModel):
+    query: str
+    status: str  # found | not_found | invalid
+    company: CompanyListItem | None
+
+
 class CompanyRead(BaseModel):
     id: int
     nev: str
@@ -76,3 +96,30 @@ class CompanyRead(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class CompanyFacets(BaseModel):
+    statusz: dict[str, int]
+    cegforma: dict[str, int]
+    letszam_kategoria: dict[str, int]
+    teaor_fo: dict[str, int]  # TEÁOR first two digits
+    negative_events: dict[str, int]
+
+
+class CompanySearchResponse(BaseModel):
+    items: list[CompanyListItem]
+    total: int
+    total_is_estimate: bool = False
+    next_cursor: str | None = None
+    facets: CompanyFacets | None = None  # only with ``facets=true``
+
+
+class CompanyClusterRead(BaseModel):
+    """The company's group of companies linked through shared officers."""
+
+    cluster_id: int
+    cluster_size: int
+    negative_count: int
+    computed_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from app.schemas.company import CompanyRead
+from app.schemas.financial import FinancialReportRead, OfficerRead
+from app.schemas.financial_analysis import FinancialAnalysisResponse
+from app.schemas.risk_analysis import RiskAnalysisResponse
+from app.schemas.watchlist import WatchlistStatus
+
+
+class CompanyProfile(BaseModel):
+    """``GET /companies/{id}/profile``; sections not requested in ``include`` are null."""
+
+    company: CompanyRead
+    financials: list[FinancialReportRead] | None = None
+    officers: list[OfficerRead] | None = None
+    risk: RiskAnalysisResponse | None = None
+    financial_analysis: FinancialAnalysisResponse | None = None
+    watchlist: WatchlistStatus | None = None
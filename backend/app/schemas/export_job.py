@@ -0,0 +1,57 @@
+from datetime import date, datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+ExportFormat = Literal["csv", "csv.gz", "xlsx", "parquet", "arrow"]
+# companies_financials: each company joined with its latest financial report
+ExportDataset = Literal["companies", "companies_financials"]
+
+
+class ExportFilters(BaseModel):
+    """Same filters as ``GET /companies/export/csv``."""
+
+    q: str | None = None
+    statusz: str | None = None
+    cegforma: str | None = None
+    teaor_kod: str | None = None
+    fotevekenyseg: str | None = None
+    szekhely: str | None = None
+    alapitas_tol: date | None = None
+    alapitas_ig: date | None = None
+    letszam_kategoria: str | None = None
+    felszamolas: bool | None = None
+    csodeljras: bool | None = None
+    vegelszamolas: bool | None = None
+    kenyszertorles: bool | None = None
+    afa_alany: bool | None = None
+
+
+class ExportJobCreate(BaseModel):
+    format: ExportFormat = "csv"
+    dataset: ExportDataset = "companies"
+    filters: ExportFilters | None = None
+    order_by: str | None = None
+    ids: list[int] | None = Field(None, min_length=1, max_length=50_000)
+    # Attribute names of the exported columns, in output order; None = all
+    fields: list[str] | None = Field(None, min_length=1)
+
+    @model_validator(mode="after")
+    def _filters_or_ids(self):
+        if self.ids is not None and self.filters is not None:
+            raise ValueError("Either filters or ids can be given, not both")
+        return self
+
+
+class ExportJobRead(BaseModel):
+    id: int
+    status: str
+    format: str
+    total_rows: int | None
+    processed_rows: int
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
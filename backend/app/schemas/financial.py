@@ -37,5 +37,6 @@ class OfficerRead(BaseModel):
     nev: str
     anyja_neve: str | None
     titulus: str | None
+    person_id: int | None
 
     model_config = {"from_attributes": True}
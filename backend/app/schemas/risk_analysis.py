@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.schemas.company import CompanyClusterRead
+
 
 class RiskFactor(BaseModel):
     category: str
@@ -25,6 +27,8 @@ class RiskAnalysisResponse(BaseModel):
     sajat_toke: float | None = None
     likviditasi_gyorsrata: float | None = None
     adozott_eredmeny: float | None = None
+    # Group of companies linked through shared officers; None if the company stands alone
+    cluster: CompanyClusterRead | None = None
 
 
 class WatchlistRiskItem(BaseModel):
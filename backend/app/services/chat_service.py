@@ -7,6 +7,11 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.models.company import Company
 from app.models.financial import FinancialReport, Officer
+from app.services.company_search import find_by_names
+from app.services.officer_identity import other_companies_of_officers
+
+# Other companies listed per officer in the chat context
+_MAX_OTHER_COMPANIES = 5
 
 
 def find_company_context(message: str, db: Session) -> tuple[Company | None, str]:
@@ -22,30 +27,19 @@ def find_company_context(message: str, db: Session) -> tuple[Company | None, str
         if company:
             return company, _build_company_text(company, db)
 
-    # Try name search — extract quoted names or longer capitalized words
-    # First try quoted text
-    quoted = re.findall(r'[""„]([^""„"]+)["""]', message)
-    for name in quoted:
-        company = db.query(Company).filter(Company.nev.ilike(f"%{name}%")).first()
-        if company:
-            return company, _build_company_text(company, db)
-
-    # Try common Hungarian company suffixes
+    # Name candidates in priority order: quoted text, names ending in a legal
+    # form, then capitalized words — resolved in one normalized-name lookup
+    candidates = re.findall(r'[""„]([^""„"]+)["""]', message)
     pattern = r"([\w\s\-\.]+(?:Kft|Zrt|Nyrt|Bt|Kkt|Kht|Zrt|Egyesület|Alapítvány)\.?)"
-    suffix_matches = re.findall(pattern, message, re.IGNORECASE)
-    for name in suffix_matches:
-        name = name.strip()
-        if len(name) >= 3:
-            company = db.query(Company).filter(Company.nev.ilike(f"%{name}%")).first()
-            if company:
-                return company, _build_company_text(company, db)
-
-    # Fallback: try each word longer than 3 chars as company name (less precise)
-    words = [w for w in message.split() if len(w) > 3 and w[0].isupper()]
-    for word in words:
-        company = db.query(Company).filter(Company.nev.ilike(f"%{word}%")).first()
-        if company:
-            return company, _build_company_text(company, db)
+    for name in re.findall(pattern, message, re.IGNORECASE):
+        # The match may start mid-sentence: try every word tail, longest first
+        words = name.split()
+        candidates += [" ".join(words[i:]) for i in range(len(words) - 1)]
+    candidates += [w for w in message.split() if len(w) > 3 and w[0].isupper()]
+
+    company = find_by_names(db, candidates)
+    if company:
+        return company, _build_company_text(company, db)
 
     return None, ""
 
@@ -152,12 +146,19 @@ def _build_company_text(company: Company, db: Session) -> str:
         .all()
     )
     if officers:
+        other_companies = other_companies_of_officers(db, company.id)
         lines.append("")
         lines.append("Tisztségviselők:")
         for o in officers:
             entry = f"  - {o.nev}"
             if o.titulus:
                 entry += f" ({o.titulus})"
+            others = other_companies.get(o.person_id, [])
+            if others:
+                names = ", ".join(nev for _, nev in others[:_MAX_OTHER_COMPANIES])
+                if len(others) > _MAX_OTHER_COMPANIES:
+                    names += f" és további {len(others) - _MAX_OTHER_COMPANIES}"
+                entry += f"; további cégei: {names}"
             lines.append(entry)
 
     return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""Connected components of the company–officer graph ("company groups")."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.company_cluster import CompanyCluster
+from app.models.financial import Officer
+from app.services.company_facets import NEGATIVE_EVENT_FLAGS
+
+_LOAD_BATCH = 100_000
+_WRITE_BATCH = 10_000
+
+
+class UnionFind:
+    """Disjoint sets over arbitrary hashable ids, with union by size and path halving."""
+
+    def __init__(self):
+        self.parent: dict[int, int] = {}
+        self.size: dict[int, int] = {}
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        if node not in parent:
+            parent[node] = node
+            self.size[node] = 1
+            return node
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+
+
+def connected_companies(db: Session) -> UnionFind:
+    """Companies joined through shared persons; companies without officers are left out."""
+    groups = UnionFind()
+    first_company: dict[int, int] = {}  # person -> a company of theirs
+    result = db.execute(
+        select(Officer.company_id, Officer.person_id)
+        .join(Company, Company.id == Officer.company_id)
+        .where(Officer.person_id.is_not(None))
+        .execution_options(yield_per=_LOAD_BATCH)
+    )
+    for company_id, person_id in result:
+        other = first_company.setdefault(person_id, company_id)
+        groups.union(company_id, other)
+    return groups
+
+
+def compute_clusters(db: Session) -> int:
+    """Rewrite ``company_clusters``; returns the number of companies in groups."""
+    groups = connected_companies(db)
+    members: dict[int, list[int]] = {}
+    for company_id in groups.parent:
+        root = groups.find(company_id)
+        if groups.size[root] > 1:
+            members.setdefault(root, []).append(company_id)
+
+    negative = set(
+        db.scalars(
+            select(Company.id).where(or_(*(getattr(Company, flag).is_(True) for flag in NEGATIVE_EVENT_FLAGS)))
+        )
+    )
+    now = datetime.now(timezone.utc)
+    rows = []
+    for companies in members.values():
+        cluster = {
+            "cluster_id": min(companies),
+            "cluster_size": len(companies),
+            "negative_count": len(negative.intersection(companies)),
+            "computed_at": now,
+        }
+        rows += [{"company_id": company_id, **cluster} for company_id in companies]
+
+    # One transaction: readers see the previous clusters until the commit
+    db.execute(delete(CompanyCluster))
+    for start in range(0, len(rows), _WRITE_BATCH):
+        db.execute(insert(CompanyCluster), rows[start:start + _WRITE_BATCH])
+    db.commit()
+    return len(rows)
@@ -0,0 +1,77 @@
+"""Counts for the company filter endpoints, estimated on PostgreSQL for large result sets."""
+
+import hashlib
+import json
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.company import Company
+from app.services.cache import TTLCache
+from app.services.session_changes import after_commit
+
+_count_cache = TTLCache(maxsize=2048, ttl=settings.count_cache_ttl_seconds, name="company_count")
+
+
+def filter_key(params: dict) -> str:
+    """Stable hash of the active filters; empty and ``None`` filters are ignored."""
+    active = {}
+    for name, value in params.items():
+        if value is None or value == "":
+            continue
+        if name == "q":
+            value = " ".join(str(value).lower().split())
+        active[name] = value
+    raw = json.dumps(active, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _planner_estimate(db: Session, query) -> int:
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_filtered(db: Session, query, params: dict, exact: bool = False) -> tuple[int, bool]:
+    """Return ``(count, is_estimate)`` for a filtered ``Company`` query."""
+    key = filter_key(params)
+    if not exact:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            return cached, False
+        if db.get_bind().dialect.name == "postgresql":
+            estimate = _planner_estimate(db, query)
+            if estimate >= settings.count_exact_threshold:
+                return estimate, True
+
+    generation = _count_cache.generation
+    count = query.order_by(None).count()
+    _count_cache.set(key, count, generation)
+    return count, False
+
+
+def count_generation() -> int:
+    """Read before computing a count passed to ``remember_count``."""
+    return _count_cache.generation
+
+
+def remember_count(params: dict, count: int, generation: int) -> None:
+    """Cache an exact count computed elsewhere, e.g. alongside facets."""
+    _count_cache.set(filter_key(params), count, generation)
+
+
+def invalidate_counts() -> None:
+    _count_cache.clear()
+
+
+def _company_written(session: Session) -> bool:
+    return any(isinstance(obj, Company) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+def _invalidate_on_company_write(_session: Session, _batches: list[bool]) -> None:
+    invalidate_counts()
+
+
+after_commit("company_counts", _company_written, _invalidate_on_company_write)
@@ -0,0 +1,69 @@
+"""Facet counts for the filtered company set, computed in a single query."""
+
+from collections import defaultdict
+
+from sqlalchemy import Integer, case, func, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+
+FACET_COLUMNS = {
+    "statusz": Company.statusz,
+    "cegforma": Company.cegforma,
+    "letszam_kategoria": Company.letszam_kategoria,
+    "teaor_fo": func.substr(Company.teaor_kod, 1, 2),
+}
+NEGATIVE_EVENT_FLAGS = ("felszamolas", "csodeljras", "vegelszamolas", "kenyszertorles")
+
+
+def _flag_sums() -> list:
+    return [
+        func.sum(case((getattr(Company, flag).is_(True), 1), else_=0)).cast(Integer).label(flag)
+        for flag in NEGATIVE_EVENT_FLAGS
+    ]
+
+
+def compute_facets(db: Session, query) -> tuple[int, dict[str, dict[str, int]]]:
+    """Return ``(total, facets)`` for a filtered ``Company`` query.
+
+    ``facets`` maps each facet name to ``{value: count}`` (NULL values are
+    left out) and ``"negative_events"`` to ``{flag: companies with flag set}``.
+    """
+    columns = [col.label(name) for name, col in FACET_COLUMNS.items()]
+    query = query.order_by(None)
+    facets: dict[str, dict[str, int]] = {name: defaultdict(int) for name in FACET_COLUMNS}
+    negative_events = dict.fromkeys(NEGATIVE_EVENT_FLAGS, 0)
+    total = 0
+
+    if db.get_bind().dialect.name == "postgresql":
+        groupings = [func.grouping(col).label(f"g_{name}") for name, col in FACET_COLUMNS.items()]
+        rows = query.with_entities(
+            *columns, *groupings, func.count().label("cnt"), *_flag_sums()
+        ).group_by(
+            func.grouping_sets(*(tuple_(col) for col in FACET_COLUMNS.values()), text("()"))
+        ).all()
+        for row in rows:
+            grouped = [name for name in FACET_COLUMNS if getattr(row, f"g_{name}") == 0]
+            if not grouped:
+                total = row.cnt
+                negative_events = {flag: getattr(row, flag) or 0 for flag in NEGATIVE_EVENT_FLAGS}
+                continue
+            value = getattr(row, grouped[0])
+            if value is not None:
+                facets[grouped[0]][value] = row.cnt
+    else:
+        rows = query.with_entities(
+            *columns, func.count().label("cnt"), *_flag_sums()
+        ).group_by(*FACET_COLUMNS.values()).all()
+        for row in rows:
+            total += row.cnt
+            for flag in NEGATIVE_EVENT_FLAGS:
+                negative_events[flag] += getattr(row, flag) or 0
+            for name in FACET_COLUMNS:
+                value = getattr(row, name)
+                if value is not None:
+                    facets[name][value] += row.cnt
+
+    result = {name: dict(sorted(values.items(), key=lambda kv: -kv[1])) for name, values in facets.items()}
+    result["negative_events"] = negative_events
+    return total, result
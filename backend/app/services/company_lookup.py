@@ -0,0 +1,51 @@
+"""Batch company lookup by tax number and registry number."""
+
+from collections.abc import Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.schemas.company import CompanyListItem
+from app.services.company_search import classify_query
+
+_CHUNK = 1000
+
+
+def _match_tax_number(candidates: list[Company], value: str) -> Company | None:
+    if "-" not in value:
+        return candidates[0] if candidates else None
+    return next((c for c in candidates if c.adoszam == value), None)
+
+
+def lookup_companies(db: Session, values: list[str], chunk_size: int = _CHUNK) -> Iterator[dict]:
+    """Yield ``{"query", "status", "company"}`` per value; status is found, not_found or invalid."""
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        parsed = [classify_query(value.strip()) for value in chunk]
+        cores = {value[:8] for kind, value in parsed if kind == "adoszam"}
+        registry_numbers = {value for kind, value in parsed if kind == "cegjegyzekszam"}
+
+        by_core: dict[str, list[Company]] = {}
+        if cores:
+            rows = db.query(Company).filter(func.substr(Company.adoszam, 1, 8).in_(cores)).order_by(Company.id)
+            for company in rows:
+                by_core.setdefault(company.adoszam[:8], []).append(company)
+        by_registry_number = {}
+        if registry_numbers:
+            rows = db.query(Company).filter(Company.cegjegyzekszam.in_(registry_numbers))
+            by_registry_number = {company.cegjegyzekszam: company for company in rows}
+
+        for value, (kind, key) in zip(chunk, parsed):
+            if kind == "adoszam":
+                company = _match_tax_number(by_core.get(key[:8], []), key)
+            elif kind == "cegjegyzekszam":
+                company = by_registry_number.get(key)
+            else:
+                yield {"query": value, "status": "invalid", "company": None}
+                continue
+            yield {
+                "query": value,
+                "status": "found" if company else "not_found",
+                "company": CompanyListItem.model_validate(company).model_dump(mode="json") if company else None,
+            }
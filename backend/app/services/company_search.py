@@ -0,0 +1,168 @@
+"""Company search, filtering and ordering shared by the list, count, export and public endpoints."""
+
+import re
+from collections.abc import Iterable
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.company import Company
+from app.services.normalize import normalize_company_name, normalize_company_query
+from app.services.pagination import keyset_order
+
+
+_TAX_NUMBER = re.compile(r"(\d{8})(?:-?(\d)-?(\d{2}))?")
+_REGISTRY_NUMBER = re.compile(r"(\d{2})-?(\d{2})-?(\d{6})")
+
+
+def classify_query(q: str) -> tuple[str, str]:
+    """Detect identifier-shaped queries.
+
+    Returns ``("adoszam", "12345678")`` for a bare 8-digit tax number core,
+    ``("adoszam", "12345678-2-41")`` for a full one, ``("cegjegyzekszam",
+    "01-09-123456")`` for a registry number and ``("name", q)`` otherwise.
+    Dashes are optional and spaces ignored on input; values are returned in
+    the dashed form stored in the database.
+    """
+    compact = q.replace(" ", "")
+    if m := _TAX_NUMBER.fullmatch(compact):
+        core, vat, county = m.groups()
+        return "adoszam", f"{core}-{vat}-{county}" if vat else core
+    if m := _REGISTRY_NUMBER.fullmatch(compact):
+        return "cegjegyzekszam", "-".join(m.groups())
+    return "name", q
+
+
+def search_condition(q: str) -> ColumnElement[bool]:
+    """Index-friendly predicate for a free-text query.
+
+    Tax and registry numbers become equality (or tax-number-core prefix)
+    probes on their unique indexes; anything else is a substring match on
+    normalized name, tax number or registry number.
+    """
+    q = q.strip()
+    kind, value = classify_query(q)
+    if kind == "adoszam":
+        return Company.adoszam == value if "-" in value else Company.adoszam.like(f"{value}%")
+    if kind == "cegjegyzekszam":
+        return Company.cegjegyzekszam == value
+
+    pattern = f"%{q}%"
+    normalized = normalize_company_query(q)
+    # A bare legal form ("kft") normalizes to itself; nothing useful is lost
+    name_match = Company.nev_normalized.like(f"%{normalized}%") if normalized else Company.nev.ilike(pattern)
+    return or_(
+        name_match,
+        Company.adoszam.ilike(pattern),
+        Company.cegjegyzekszam.ilike(pattern),
+    )
+
+
+def apply_search(query, q: str):
+    return query.filter(search_condition(q))
+
+
+def find_by_names(db: Session, names: Iterable[str]) -> Company | None:
+    """Resolve the first matching candidate name, in priority order.
+
+    One indexed lookup over all candidates, ranked in SQL: exact normalized
+    matches before prefix matches, then candidate priority, active
+    companies, shorter names. Replaces a separate ``ILIKE`` scan per
+    candidate.
+    """
+    candidates = list(dict.fromkeys(n for n in map(normalize_company_name, names) if len(n) >= 3))
+    if not candidates:
+        return None
+
+    exact = Company.nev_normalized.in_(candidates)
+    priority = case(
+        *((Company.nev_normalized == name, i) for i, name in enumerate(candidates)),
+        *((Company.nev_normalized.like(f"{name}%"), i) for i, name in enumerate(candidates)),
+    )
+    return (
+        db.query(Company)
+        .filter(or_(*(Company.nev_normalized.like(f"{name}%") for name in candidates)))
+        .order_by(
+            case((exact, 0), else_=1),
+            priority,
+            case((Company.statusz == "aktív", 0), else_=1),
+            func.length(Company.nev_normalized),
+            Company.id,
+        )
+        .first()
+    )
+
+
+def backfill_normalized_names(db: Session, batch_size: int = 5000) -> int:
+    """Populate ``nev_normalized`` for rows written before the column existed."""
+    companies = Company.__table__
+    total = 0
+    while True:
+        rows = db.execute(
+            select(Company.id, Company.nev).where(Company.nev_normalized.is_(None)).limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        db.execute(
+            update(companies)
+            .where(companies.c.id == bindparam("row_id"))
+            # keep updated_at: a backfill is not a change to the company
+            .values(nev_normalized=bindparam("normalized"), updated_at=companies.c.updated_at),
+            [{"row_id": row.id, "normalized": normalize_company_name(row.nev)} for row in rows],
+        )
+        db.commit()
+        total += len(rows)
+
+
+# order_by key -> (sort column, descending); ``id`` breaks ties, see services.pagination
+ORDER_BY_MAP = {
+    "nev_asc": (Company.nev, False),
+    "nev_desc": (Company.nev, True),
+    "alapitas_asc": (Company.alapitas_datuma, False),
+    "alapitas_desc": (Company.alapitas_datuma, True),
+    "statusz_asc": (Company.statusz, False),
+    "statusz_desc": (Company.statusz, True),
+}
+
+
+def sort_key(order_by: str | None) -> tuple[str, InstrumentedAttribute, bool]:
+    if order_by in ORDER_BY_MAP:
+        return (order_by, *ORDER_BY_MAP[order_by])
+    return "id", Company.id, False
+
+
+def order_clauses(order_by: str | None) -> list:
+    _, column, descending = sort_key(order_by)
+    return keyset_order(column, descending, Company.id)
+
+
+def apply_filters(query, params: dict):
+    """Apply the company filter parameters shared by the list, count, search and export endpoints."""
+    q = params.get("q")
+    if q and q.strip():
+        query = apply_search(query, q)
+    if params.get("statusz"):
+        query = query.filter(Company.statusz == params["statusz"])
+    if params.get("cegforma"):
+        query = query.filter(Company.cegforma.ilike(f"%{params['cegforma']}%"))
+    if params.get("teaor_kod"):
+        query = query.filter(Company.teaor_kod == params["teaor_kod"])
+    if params.get("fotevekenyseg"):
+        query = query.filter(Company.fotevekenyseg.ilike(f"%{params['fotevekenyseg']}%"))
+    if params.get("szekhely"):
+        query = query.filter(Company.szekhely.ilike(f"%{params['szekhely']}%"))
+    if params.get("alapitas_tol"):
+        query = query.filter(Company.alapitas_datuma >= params["alapitas_tol"])
+    if params.get("alapitas_ig"):
+        query = query.filter(Company.alapitas_datuma <= params["alapitas_ig"])
+    if params.get("letszam_kategoria"):
+        query = query.filter(Company.letszam_kategoria == params["letszam_kategoria"])
+
+    # Boolean filters
+    for field in ("felszamolas", "csodeljras", "vegelszamolas", "kenyszertorles", "afa_alany"):
+        val = params.get(field)
+        if val is not None:
+            query = query.filter(getattr(Company, field) == val)
+
+    return query
@@ -0,0 +1,200 @@
+"""Streaming CSV export of company rows."""
+
+import csv
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.financial import FinancialReport
+from app.models.user import User
+from app.services.company_search import sort_key
+from app.services.pagination import keyset_order, rows_after
+
+# (CSV header, Company attribute)
+COMPANY_EXPORT_COLUMNS: list[tuple[str, str]] = [
+    ("Cégnév", "nev"),
+    ("Adószám", "adoszam"),
+    ("Cégjegyzékszám", "cegjegyzekszam"),
+    ("Székhely", "szekhely"),
+    ("Cégforma", "cegforma"),
+    ("Státusz", "statusz"),
+    ("TEÁOR kód", "teaor_kod"),
+    ("Fő tevékenység", "fotevekenyseg"),
+    ("Alapítás dátuma", "alapitas_datuma"),
+    ("Létszám kategória", "letszam_kategoria"),
+]
+
+MARKETING_EXPORT_COLUMNS: list[tuple[str, str]] = [
+    ("Cégnév", "nev"),
+    ("Rövidnév", "rovidnev"),
+    ("Adószám", "adoszam"),
+    ("Cégjegyzékszám", "cegjegyzekszam"),
+    ("Székhely", "szekhely"),
+    ("Cégforma", "cegforma"),
+    ("Státusz", "statusz"),
+    ("TEÁOR kód", "teaor_kod"),
+    ("Fő tevékenység", "fotevekenyseg"),
+    ("Alapítás dátuma", "alapitas_datuma"),
+    ("Létszám kategória", "letszam_kategoria"),
+    ("Email", "email"),
+    ("Telefon", "telefon"),
+    ("Weboldal", "weboldal"),
+]
+
+# (CSV header, FinancialReport attribute) — appended from the latest report of each company
+FINANCIAL_EXPORT_COLUMNS: list[tuple[str, str]] = [
+    ("Beszámoló éve", "ev"),
+    ("Nettó árbevétel (ezer HUF)", "netto_arbevetel"),
+    ("Üzemi eredmény (ezer HUF)", "uzemi_eredmeny"),
+    ("Adózás előtti eredmény (ezer HUF)", "adozas_elotti_eredmeny"),
+    ("Adózott eredmény (ezer HUF)", "adozott_eredmeny"),
+    ("Eszközök összesen (ezer HUF)", "eszkozok_osszesen"),
+    ("Saját tőke (ezer HUF)", "sajat_toke"),
+    ("Kötelezettségek (ezer HUF)", "kotelezettsegek"),
+    ("EBITDA (ezer HUF)", "ebitda"),
+    ("Eladósodottság foka", "eladosodottsag_foka"),
+    ("Likviditási gyorsráta", "likviditasi_gyorsrata"),
+    ("ROE", "roe"),
+]
+
+# Max exported rows per request; None = unlimited
+EXPORT_ROW_LIMITS: dict[str, int | None] = {
+    "free": 5000,
+    "basic": 20_000,
+    "pro": 100_000,
+    "enterprise": None,
+}
+
+_YIELD_PER = 1000
+_ID_CHUNK = 1000
+_KEYSET_BATCH = 5000
+_CHUNK_BYTES = 64 * 1024
+
+
+def export_row_limit(user: User) -> int | None:
+    return EXPORT_ROW_LIMITS.get(user.package, EXPORT_ROW_LIMITS["free"])
+
+
+def select_columns(columns: list[tuple[str, str]], fields: list[str] | None) -> list[tuple[str, str]]:
+    """The ``columns`` named in ``fields`` (attribute names), in the order of ``fields``."""
+    if fields is None:
+        return columns
+    by_attr = {attr: (header, attr) for header, attr in columns}
+    return [by_attr[name] for name in fields]
+
+
+def stream_rows(query, columns: list[tuple[str, str]], limit: int | None = None) -> Iterator[tuple]:
+    """Lazily yield tuples of the exported columns for a ``Company`` query."""
+    query = query.with_entities(*(getattr(Company, attr) for _, attr in columns))
+    if limit is not None:
+        query = query.limit(limit)
+    yield from query.execution_options(yield_per=_YIELD_PER)
+
+
+def stream_rows_keyset(
+    query,
+    order_by: str | None,
+    columns: list[tuple[str, str]],
+    limit: int | None = None,
+    batch_size: int = _KEYSET_BATCH,
+) -> Iterator[tuple]:
+    """Like ``stream_rows``, but one bounded statement per ``batch_size`` rows.
+
+    Each batch continues after the ``(sort key, id)`` of the previous one (see
+    ``services.pagination``), so no cursor stays open between batches and the
+    caller may commit on the same session while consuming the rows.
+    """
+    _, column, descending = sort_key(order_by)
+    query = query.with_entities(
+        *(getattr(Company, attr) for _, attr in columns), column.label("_sort"), Company.id.label("_id")
+    ).order_by(None).order_by(*keyset_order(column, descending, Company.id))
+    remaining = limit
+    last = None
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        if last is None:
+            batch = query.limit(size).all()
+        else:
+            batch = rows_after(query, column, descending, Company.id, *last, size)
+        for row in batch:
+            yield tuple(row[:-2])
+        if len(batch) < size:
+            return
+        last = (batch[-1][-2], batch[-1][-1])
+        if remaining is not None:
+            remaining -= len(batch)
+
+
+def stream_rows_by_ids(
+    db: Session, ids: list[int], columns: list[tuple[str, str]], chunk_size: int = _ID_CHUNK
+) -> Iterator[tuple]:
+    """Yield export tuples for ``ids`` in the requested order, ``chunk_size`` ids per query.
+
+    Bounded ``IN`` lists keep every statement small and let the first rows
+    reach the client before later chunks are queried. Unknown ids are
+    skipped; repeated ids are exported once.
+    """
+    entities = [Company.id, *(getattr(Company, attr) for _, attr in columns)]
+    ordered = list(dict.fromkeys(ids))
+    for start in range(0, len(ordered), chunk_size):
+        chunk = ordered[start:start + chunk_size]
+        by_id = {row[0]: row[1:] for row in db.query(*entities).filter(Company.id.in_(chunk))}
+        for company_id in chunk:
+            if company_id in by_id:
+                yield by_id[company_id]
+
+
+def with_latest_financials(
+    db: Session, rows: Iterable[tuple], columns: list[tuple[str, str]], chunk_size: int = _ID_CHUNK
+) -> Iterator[tuple]:
+    """Append the latest ``FinancialReport`` columns to company rows.
+
+    ``rows`` must start with the company id, which is dropped from the output.
+    Reports are fetched with one query per ``chunk_size`` companies; companies
+    without a report get ``None`` values.
+    """
+    rows = iter(rows)
+    latest = func.row_number().over(
+        partition_by=FinancialReport.company_id,
+        order_by=(FinancialReport.ev.desc(), FinancialReport.id.desc()),
+    ).label("rn")
+    empty = (None,) * len(columns)
+    while chunk := list(islice(rows, chunk_size)):
+        ranked = (
+            select(FinancialReport.company_id, *(getattr(FinancialReport, attr) for _, attr in columns), latest)
+            .where(FinancialReport.company_id.in_([row[0] for row in chunk]))
+            .subquery()
+        )
+        reports = {
+            report[0]: tuple(report[1:])
+            for report in db.execute(
+                select(*(c for c in ranked.c if c.key != "rn")).where(ranked.c.rn == 1)
+            )
+        }
+        for row in chunk:
+            yield row[1:] + reports.get(row[0], empty)
+
+
+class _Echo:
+    """File-like object whose ``write`` just returns the formatted line."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[tuple], columns: list[tuple[str, str]]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    chunk = [writer.writerow([header for header, _ in columns])]
+    size = 0
+    for row in rows:
+        line = writer.writerow(["" if value is None else value for value in row])
+        chunk.append(line)
+        size += len(line)
+        if size >= _CHUNK_BYTES:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk)
@@ -0,0 +1,304 @@
+"""Background export jobs run by the Celery worker (``app.worker``)."""
+
+import gzip
+import json
+import logging
+import os
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, and_, func, or_, update
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.company import Company
+from app.models.export_job import ExportJob
+from app.models.financial import FinancialReport
+from app.models.user import User
+from app.schemas.export_job import ExportFilters
+from app.services.company_search import apply_filters
+from app.services.fieldsets import UnknownField
+from app.services.export import (
+    COMPANY_EXPORT_COLUMNS,
+    FINANCIAL_EXPORT_COLUMNS,
+    MARKETING_EXPORT_COLUMNS,
+    export_row_limit,
+    iter_csv,
+    select_columns,
+    stream_rows_by_ids,
+    stream_rows_keyset,
+    with_latest_financials,
+)
+
+logger = logging.getLogger(__name__)
+
+XLSX_MAX_ROWS = 1_048_575  # Excel sheet limit minus the header row
+_PROGRESS_EVERY = 5000
+_BATCH_ROWS = 50_000
+
+# (header, mapped attribute)
+Fields = list[tuple[str, InstrumentedAttribute]]
+
+
+class ExportError(Exception):
+    pass
+
+
+def _write_csv(path: Path, fields: Fields, rows: Iterable[tuple]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        fh.writelines(iter_csv(rows, fields))
+
+
+def _write_csv_gz(path: Path, fields: Fields, rows: Iterable[tuple]) -> None:
+    with gzip.open(path, "wt", newline="", encoding="utf-8") as fh:
+        fh.writelines(iter_csv(rows, fields))
+
+
+def _write_xlsx(path: Path, fields: Fields, rows: Iterable[tuple]) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Cégek")
+    sheet.append([header for header, _ in fields])
+    for row in rows:
+        sheet.append(list(row))
+    workbook.save(path)
+
+
+def _arrow_type(column: InstrumentedAttribute) -> pa.DataType:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(fields: Fields) -> pa.Schema:
+    return pa.schema([pa.field(column.key, _arrow_type(column)) for _, column in fields])
+
+
+def iter_record_batches(rows: Iterable[tuple], schema: pa.Schema) -> Iterator[pa.RecordBatch]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, _BATCH_ROWS)):
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)],
+            schema=schema,
+        )
+
+
+def _write_parquet(path: Path, fields: Fields, rows: Iterable[tuple]) -> None:
+    schema = arrow_schema(fields)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in iter_record_batches(rows, schema):
+            writer.write_batch(batch)
+
+
+def _write_arrow(path: Path, fields: Fields, rows: Iterable[tuple]) -> None:
+    schema = arrow_schema(fields)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in iter_record_batches(rows, schema):
+            writer.write_batch(batch)
+
+
+# format -> (file extension, media type, writer)
+EXPORT_FORMATS: dict[str, tuple[str, str, Callable]] = {
+    "csv": (".csv", "text/csv", _write_csv),
+    "csv.gz": (".csv.gz", "application/gzip", _write_csv_gz),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", _write_xlsx),
+    "parquet": (".parquet", "application/vnd.apache.parquet", _write_parquet),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file", _write_arrow),
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_file_path(job: ExportJob) -> Path:
+    extension = EXPORT_FORMATS[job.format][0]
+    return Path(settings.export_dir) / f"export_{job.id}{extension}"
+
+
+def _fields(model, columns: list[tuple[str, str]]) -> Fields:
+    return [(header, getattr(model, attr)) for header, attr in columns]
+
+
+def job_columns(params: dict) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """``(company columns, financial columns)`` exported for the job parameters.
+
+    ``fields`` picks from both lists by attribute name (company columns still
+    come first); raises ``UnknownField`` for names the dataset does not have.
+    """
+    company = MARKETING_EXPORT_COLUMNS if params.get("ids") is not None else COMPANY_EXPORT_COLUMNS
+    financial = FINANCIAL_EXPORT_COLUMNS if params.get("dataset") == "companies_financials" else []
+    fields = params.get("fields")
+    if fields is None:
+        return company, financial
+    available = {attr for _, attr in company + financial}
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise UnknownField(unknown)
+    company_attrs = {attr for _, attr in company}
+    return (
+        select_columns(company, [name for name in fields if name in company_attrs]),
+        select_columns(financial, [name for name in fields if name not in company_attrs]),
+    )
+
+
+def _job_rows(db: Session, job: ExportJob) -> tuple[Fields, int, Iterator[tuple]]:
+    """Return ``(fields, total_rows, rows)`` for the job's filter or id list."""
+    params = json.loads(job.params)
+    limit = export_row_limit(db.get(User, job.user_id))
+    columns, financial_columns = job_columns(params)
+    if params.get("ids") is not None:
+        ids = list(dict.fromkeys(params["ids"]))[:limit]
+        total = len(ids)
+    else:
+        # Stored as JSON: dates come back as strings until parsed again
+        filters = ExportFilters.model_validate(params.get("filters") or {}).model_dump(exclude_none=True)
+        query = apply_filters(db.query(Company), filters)
+        total = query.order_by(None).count()
+        if limit is not None:
+            total = min(total, limit)
+
+    fields = _fields(Company, columns)
+    if financial_columns:
+        # Leading company id for with_latest_financials
+        columns = [("id", "id"), *columns]
+        fields += _fields(FinancialReport, financial_columns)
+    if params.get("ids") is not None:
+        rows = stream_rows_by_ids(db, ids, columns)
+    else:
+        rows = stream_rows_keyset(query, params.get("order_by"), columns, limit=limit)
+    if financial_columns:
+        rows = with_latest_financials(db, rows, financial_columns)
+    return fields, total, rows
+
+
+def _track_progress(db: Session, job: ExportJob, rows: Iterable[tuple]) -> Iterator[tuple]:
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % _PROGRESS_EVERY == 0:
+            job.processed_rows = processed
+            job.heartbeat_at = _now()
+            db.commit()
+    job.processed_rows = processed
+
+
+def _stale(now: datetime):
+    """Running jobs whose worker stopped reporting progress."""
+    last_seen = func.coalesce(ExportJob.heartbeat_at, ExportJob.started_at)
+    stale_before = now - timedelta(seconds=settings.export_job_stale_seconds)
+    return and_(ExportJob.status == "running", last_seen < stale_before)
+
+
+def _claim(db: Session, job_id: int) -> bool:
+    """Mark the job running if it is queued or stale; False if another worker has it."""
+    now = _now()
+    claimed = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, or_(ExportJob.status == "queued", _stale(now)))
+        .values(status="running", started_at=now, heartbeat_at=now, processed_rows=0)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+
+def fail_job(db: Session, job: ExportJob, error: str) -> None:
+    job.status = "failed"
+    job.error = error
+    job.finished_at = _now()
+    db.commit()
+
+
+def fail_stale_jobs(db: Session, user_id: int) -> None:
+    """Fail the user's running jobs whose worker is gone, so they stop counting as active."""
+    db.execute(
+        update(ExportJob)
+        .where(ExportJob.user_id == user_id, _stale(_now()))
+        .values(status="failed", error="Az export megszakadt, indítsd újra", finished_at=_now())
+    )
+    db.commit()
+
+
+def run_export_job(job_id: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Write the artifact of a queued or stale job. Failures are recorded on the job, not raised."""
+    db = session_factory()
+    try:
+        if not _claim(db, job_id):
+            return
+        job = db.get(ExportJob, job_id)
+
+        path = job_file_path(job)
+        partial = path.with_name(path.name + ".part")
+        try:
+            fields, total, rows = _job_rows(db, job)
+            if job.format == "xlsx" and total > XLSX_MAX_ROWS:
+                raise ExportError(f"Az XLSX legfeljebb {XLSX_MAX_ROWS} sort tartalmazhat, válassz CSV formátumot")
+            job.total_rows = total
+            job.heartbeat_at = _now()
+            db.commit()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            EXPORT_FORMATS[job.format][2](partial, fields, _track_progress(db, job, rows))
+            os.replace(partial, path)
+        except Exception as exc:
+            db.rollback()
+            partial.unlink(missing_ok=True)
+            logger.exception("Export job %s failed", job_id)
+            job.status = "failed"
+            job.error = str(exc)
+        else:
+            job.status = "done"
+            job.file_path = str(path)
+        job.finished_at = _now()
+        db.commit()
+    finally:
+        db.close()
+
+
+def delete_job_file(job: ExportJob) -> None:
+    if job.file_path:
+        Path(job.file_path).unlink(missing_ok=True)
+
+
+def purge_expired_exports(session_factory: Callable[[], Session] = SessionLocal) -> int:
+    """Delete finished jobs older than the retention period with their files; returns the number of jobs.
+
+    Files in ``settings.export_dir`` without a job (e.g. ``.part`` files of a
+    crashed worker) are removed once they are as old.
+    """
+    cutoff = _now() - timedelta(days=settings.export_retention_days)
+    db = session_factory()
+    try:
+        jobs = (
+            db.query(ExportJob)
+            .filter(ExportJob.status.in_(("done", "failed")), ExportJob.finished_at < cutoff)
+            .all()
+        )
+        for job in jobs:
+            delete_job_file(job)
+            db.delete(job)
+        db.commit()
+        kept = {path for (path,) in db.query(ExportJob.file_path).filter(ExportJob.file_path.is_not(None))}
+    finally:
+        db.close()
+
+    export_dir = Path(settings.export_dir)
+    if export_dir.is_dir():
+        for path in export_dir.iterdir():
+            if str(path) not in kept and path.is_file() and path.stat().st_mtime < cutoff.timestamp():
+                path.unlink(missing_ok=True)
+    return len(jobs)
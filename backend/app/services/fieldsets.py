@@ -0,0 +1,36 @@
+"""Sparse fieldsets (``fields=nev,adoszam``) for company responses and exports."""
+
+from collections.abc import Iterable
+
+from sqlalchemy.orm import InstrumentedAttribute, load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models.company import Company
+
+
+class UnknownField(ValueError):
+    def __init__(self, names: list[str]):
+        super().__init__(", ".join(names))
+        self.names = names
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str]) -> list[str] | None:
+    """Comma-separated attribute names in request order; ``None`` means all fields."""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    allowed = set(allowed)
+    unknown = [name for name in names if name not in allowed]
+    if unknown or not names:
+        raise UnknownField(unknown)
+    return names
+
+
+def load_fields(names: list[str], *extra: InstrumentedAttribute) -> LoaderOption:
+    """``load_only`` option for ``names`` plus ``id`` and ``extra`` (e.g. the sort column)."""
+    attributes = dict.fromkeys([Company.id, *(getattr(Company, name) for name in names), *extra])
+    return load_only(*attributes)
+
+
+def dump_fields(company: Company, names: list[str]) -> dict:
+    return {"id": company.id, **{name: getattr(company, name) for name in names}}
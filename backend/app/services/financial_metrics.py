@@ -0,0 +1,151 @@
+"""Yearly financial metrics and averages shared by ``/financial-analysis`` and the company profile."""
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only
+
+from app.models.company import Company
+from app.models.financial import FinancialReport
+from app.models.user import User
+from app.schemas.financial_analysis import CompanyCompareItem, FinancialAnalysisResponse, YearlyMetric
+
+# Companies per ``/financial-analysis/compare`` request, by package
+COMPARE_LIMITS: dict[str, int] = {
+    "free": 5,
+    "basic": 5,
+    "pro": 20,
+    "enterprise": 50,
+}
+
+# CompanyCompareItem average -> averaged FinancialReport column
+_COMPARE_AVERAGES = {
+    "avg_profit_margin": "arbevetel_aranyos_eredmeny",
+    "avg_roe": "roe",
+    "avg_debt_ratio": "eladosodottsag_foka",
+    "avg_liquidity": "likviditasi_gyorsrata",
+}
+
+
+def build_yearly_metrics(reports: list[FinancialReport]) -> list[YearlyMetric]:
+    sorted_reports = sorted(reports, key=lambda r: r.ev)
+    metrics: list[YearlyMetric] = []
+    prev_revenue: float | None = None
+
+    for r in sorted_reports:
+        growth: float | None = None
+        if prev_revenue and prev_revenue != 0 and r.netto_arbevetel is not None:
+            growth = round(((r.netto_arbevetel - prev_revenue) / abs(prev_revenue)) * 100, 2)
+
+        metrics.append(
+            YearlyMetric(
+                ev=r.ev,
+                netto_arbevetel=r.netto_arbevetel,
+                uzemi_eredmeny=r.uzemi_eredmeny,
+                adozott_eredmeny=r.adozott_eredmeny,
+                sajat_toke=r.sajat_toke,
+                kotelezettsegek=r.kotelezettsegek,
+                eszkozok_osszesen=r.eszkozok_osszesen,
+                forgoeszkozok=r.forgoeszkozok,
+                rovid_lejaratu_kotelezettsegek=r.rovid_lejaratu_kotelezettsegek,
+                eladosodottsag_foka=r.eladosodottsag_foka,
+                arbevetel_aranyos_eredmeny=r.arbevetel_aranyos_eredmeny,
+                likviditasi_gyorsrata=r.likviditasi_gyorsrata,
+                roe=r.roe,
+                ebitda=r.ebitda,
+                novekedesi_rata=growth,
+            )
+        )
+        prev_revenue = r.netto_arbevetel
+
+    return metrics
+
+
+def safe_avg(values: list[float | None]) -> float | None:
+    valid = [v for v in values if v is not None]
+    if not valid:
+        return None
+    return round(sum(valid) / len(valid), 4)
+
+
+def calc_cagr(reports: list[FinancialReport]) -> float | None:
+    sorted_r = sorted(reports, key=lambda r: r.ev)
+    revenues = [(r.ev, r.netto_arbevetel) for r in sorted_r if r.netto_arbevetel and r.netto_arbevetel > 0]
+    if len(revenues) < 2:
+        return None
+    first_year, first_val = revenues[0]
+    last_year, last_val = revenues[-1]
+    years = last_year - first_year
+    if years <= 0 or first_val <= 0:
+        return None
+    cagr = ((last_val / first_val) ** (1 / years) - 1) * 100
+    return round(cagr, 2)
+
+
+def build_financial_analysis(company: Company, reports: list[FinancialReport]) -> FinancialAnalysisResponse:
+    metrics = build_yearly_metrics(reports)
+
+    return FinancialAnalysisResponse(
+        company_id=company.id,
+        company_name=company.nev,
+        teaor_kod=company.teaor_kod,
+        yearly_metrics=metrics,
+        avg_profit_margin=safe_avg([r.arbevetel_aranyos_eredmeny for r in reports]),
+        avg_roe=safe_avg([r.roe for r in reports]),
+        avg_debt_ratio=safe_avg([r.eladosodottsag_foka for r in reports]),
+        avg_liquidity=safe_avg([r.likviditasi_gyorsrata for r in reports]),
+        revenue_cagr=calc_cagr(reports),
+    )
+
+
+def compare_limit(user: User) -> int:
+    return COMPARE_LIMITS.get(user.package, COMPARE_LIMITS["free"])
+
+
+def group_averages(groups: list[list[FinancialReport]], columns: list[str]) -> list[list[float | None]]:
+    """``safe_avg`` of each column over each group of reports, computed for all groups at once."""
+    sizes = np.fromiter((len(reports) for reports in groups), dtype=np.int64, count=len(groups))
+    group = np.repeat(np.arange(len(groups)), sizes)
+    values = np.array(
+        [[getattr(r, column) for column in columns] for reports in groups for r in reports],
+        dtype=np.float64,
+    ).reshape(len(group), len(columns))  # None -> NaN
+    present = ~np.isnan(values)
+    counts = np.stack([np.bincount(group, present[:, i], len(groups)) for i in range(len(columns))], axis=1)
+    sums = np.stack(
+        [np.bincount(group, np.where(present[:, i], values[:, i], 0), len(groups)) for i in range(len(columns))],
+        axis=1,
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return [[round(m, 4) if c else None for m, c in zip(row, row_counts)] for row, row_counts in zip(means.tolist(), counts.tolist())]
+
+
+def load_comparison(db: Session, ids: list[int]) -> dict[int, CompanyCompareItem]:
+    """Compare items of the existing companies among ``ids``, in two queries.
+
+    Missing ids are left out of the result; repeated ids are loaded once.
+    """
+    wanted = set(ids)
+    companies = db.scalars(
+        select(Company).options(load_only(Company.id, Company.nev)).where(Company.id.in_(wanted))
+    ).all()
+    by_company: dict[int, list[FinancialReport]] = {company.id: [] for company in companies}
+    reports = db.scalars(
+        select(FinancialReport)
+        .where(FinancialReport.company_id.in_(by_company))
+        .order_by(FinancialReport.company_id, FinancialReport.ev)
+    )
+    for report in reports:
+        by_company[report.company_id].append(report)
+
+    averages = group_averages(list(by_company.values()), list(_COMPARE_AVERAGES.values()))
+    items = {}
+    for company, row in zip(companies, averages):
+        reports = by_company[company.id]
+        items[company.id] = CompanyCompareItem(
+            company_id=company.id,
+            company_name=company.nev,
+            yearly_metrics=build_yearly_metrics(reports),
+            **dict(zip(_COMPARE_AVERAGES, row)),
+        )
+    return items
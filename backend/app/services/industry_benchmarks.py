@@ -0,0 +1,165 @@
+"""Materialized industry averages behind ``GET /financial-analysis/benchmark``."""
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, delete, distinct, func, insert, inspect, literal, select, true, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.financial import FinancialReport
+from app.models.industry_benchmark import IndustryBenchmark
+from app.services.session_changes import after_commit, touched_values
+
+logger = logging.getLogger(__name__)
+
+# Benchmark metric -> averaged FinancialReport column; the table has
+# ``avg_<metric>`` and ``<metric>_count`` for each
+BENCHMARK_METRICS = {
+    "profit_margin": "arbevetel_aranyos_eredmeny",
+    "roe": "roe",
+    "debt_ratio": "eladosodottsag_foka",
+    "liquidity": "likviditasi_gyorsrata",
+    "revenue": "netto_arbevetel",
+    "ebitda": "ebitda",
+}
+
+_CHUNK = 1000
+
+# Labels and insert order of the ``_aggregate`` columns
+_COLUMNS = [
+    "teaor_kod",
+    "ev",
+    "company_count",
+    *(name for metric in BENCHMARK_METRICS for name in (f"avg_{metric}", f"{metric}_count")),
+    "computed_at",
+]
+
+
+def _aggregate(condition):
+    columns = [Company.teaor_kod, FinancialReport.ev, func.count(distinct(FinancialReport.company_id))]
+    for attr in BENCHMARK_METRICS.values():
+        value = getattr(FinancialReport, attr)
+        columns += [func.avg(value), func.count(value)]
+    columns.append(literal(datetime.now(timezone.utc), DateTime))
+    return (
+        select(*(column.label(name) for column, name in zip(columns, _COLUMNS)))
+        .join(Company, Company.id == FinancialReport.company_id)
+        .where(Company.teaor_kod.is_not(None), condition)
+        .group_by(Company.teaor_kod, FinancialReport.ev)
+    )
+
+
+def refresh_industry_benchmarks(db: Session) -> int:
+    """Rebuild ``industry_benchmarks`` in one transaction; returns the number of rows."""
+    db.execute(delete(IndustryBenchmark))
+    db.execute(insert(IndustryBenchmark).from_select(_COLUMNS, _aggregate(true())))
+    db.commit()
+    return db.scalar(select(func.count()).select_from(IndustryBenchmark))
+
+
+def refresh_benchmark_rows(db: Session, keys: set[tuple[str, int]]) -> None:
+    """Recompute the ``(teaor_kod, ev)`` rows of ``keys``, without committing."""
+    keys = sorted(keys)
+    for start in range(0, len(keys), _CHUNK):
+        chunk = keys[start:start + _CHUNK]
+        db.execute(
+            delete(IndustryBenchmark).where(tuple_(IndustryBenchmark.teaor_kod, IndustryBenchmark.ev).in_(chunk))
+        )
+        db.execute(
+            insert(IndustryBenchmark).from_select(
+                _COLUMNS, _aggregate(tuple_(Company.teaor_kod, FinancialReport.ev).in_(chunk))
+            )
+        )
+
+
+def peer_averages(
+    db: Session, teaor_kod: str, latest_report: FinancialReport | None
+) -> tuple[int, dict[str, float | None]]:
+    """Number of other companies and their averages per metric, for the year of ``latest_report``.
+
+    Without a report the latest year of the TEÁOR code is used as it is. A
+    missing row (e.g. before the first ``maintenance.py refresh-benchmarks``)
+    is aggregated from the reports.
+    """
+    if latest_report is not None:
+        row = db.get(IndustryBenchmark, (teaor_kod, latest_report.ev))
+        if row is None:
+            row = db.execute(
+                _aggregate(Company.teaor_kod == teaor_kod).where(FinancialReport.ev == latest_report.ev)
+            ).first()
+    else:
+        row = db.scalars(
+            select(IndustryBenchmark)
+            .where(IndustryBenchmark.teaor_kod == teaor_kod)
+            .order_by(IndustryBenchmark.ev.desc())
+            .limit(1)
+        ).first()
+        if row is None:
+            row = db.execute(
+                _aggregate(Company.teaor_kod == teaor_kod).order_by(FinancialReport.ev.desc()).limit(1)
+            ).first()
+    if row is None:
+        return 0, dict.fromkeys(BENCHMARK_METRICS)
+
+    peers = row.company_count - (latest_report is not None)
+    averages = {}
+    for metric, attr in BENCHMARK_METRICS.items():
+        avg, count = getattr(row, f"avg_{metric}"), getattr(row, f"{metric}_count")
+        own = getattr(latest_report, attr) if latest_report is not None else None
+        if own is not None and avg is not None:
+            # The row includes the company's own report
+            avg = (avg * count - own) / (count - 1) if count > 1 else None
+        averages[metric] = avg
+    return max(peers, 0), averages
+
+
+def _benchmark_writes(session: Session) -> set[tuple[str, int]] | None:
+    reports: set[tuple[int, int]] = set()
+    moved: dict[int, list[str]] = {}  # old and new TEÁOR codes of changed or deleted companies
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, FinancialReport):
+            reports.update(
+                (company_id, ev) for company_id in touched_values(obj, "company_id") for ev in touched_values(obj, "ev")
+            )
+        elif isinstance(obj, Company) and obj not in session.new:
+            if obj in session.deleted or inspect(obj).attrs.teaor_kod.history.has_changes():
+                moved[obj.id] = touched_values(obj, "teaor_kod")
+    if not reports and not moved:
+        return None
+
+    # A moved company's years leave the old code and enter the new one
+    moved_ids = sorted(moved)
+    for start in range(0, len(moved_ids), _CHUNK):
+        chunk = moved_ids[start:start + _CHUNK]
+        reports.update(
+            session.execute(
+                select(FinancialReport.company_id, FinancialReport.ev).where(FinancialReport.company_id.in_(chunk))
+            ).all()
+        )
+    company_ids = sorted({company_id for company_id, _ in reports if company_id not in moved})
+    teaor: dict[int, str | None] = {}
+    for start in range(0, len(company_ids), _CHUNK):
+        chunk = company_ids[start:start + _CHUNK]
+        teaor.update(session.execute(select(Company.id, Company.teaor_kod).where(Company.id.in_(chunk))).all())
+    return {
+        (code, ev)
+        for company_id, ev in reports
+        for code in moved.get(company_id, [teaor.get(company_id)])
+        if code
+    }
+
+
+def _refresh_benchmarks(session: Session, batches: list[set[tuple[str, int]]]) -> None:
+    keys = set().union(*batches)
+    with Session(session.get_bind()) as db:
+        try:
+            refresh_benchmark_rows(db, keys)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Industry benchmark refresh of %d rows failed; run refresh-benchmarks", len(keys))
+
+
+after_commit("benchmark_keys", _benchmark_writes, _refresh_benchmarks)
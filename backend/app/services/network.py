@@ -0,0 +1,264 @@
+"""Company connection graph through shared officers (``GET /companies/{id}/network``)."""
+
+from collections.abc import Callable, Iterable, Iterator
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.company import Company
+from app.models.financial import Officer, Person
+
+MAX_DEPTH = 4
+DEFAULT_MAX_NODES = 300
+MAX_NODES = 2000
+DEFAULT_MAX_EDGES = 1000
+MAX_EDGES = 10_000
+MAX_PATH_LENGTH = 8
+DEFAULT_MAX_VISITS = 10_000
+MAX_VISITS = 100_000
+DEFAULT_MAX_PATHS = 10
+MAX_PATHS = 100
+_CHUNK = 1000
+
+# (frontier company id, connected company id, name of the shared person)
+Expansion = Callable[[Session, list[int]], Iterable[tuple[int, int, str]]]
+
+
+class Connections(list):
+    """Expansion result that can tell it is incomplete: ``cut`` is set when a size limit stopped it."""
+
+    cut = False
+
+
+def sql_expand(db: Session, frontier: list[int]) -> Iterator[tuple[int, int, str]]:
+    mine = aliased(Officer)
+    other = aliased(Officer)
+    for start in range(0, len(frontier), _CHUNK):
+        chunk = frontier[start:start + _CHUNK]
+        yield from db.execute(
+            select(mine.company_id, other.company_id, Person.nev)
+            .join(other, and_(other.person_id == mine.person_id, other.company_id != mine.company_id))
+            .join(Person, Person.id == mine.person_id)
+            .where(mine.company_id.in_(chunk))
+        )
+
+
+def _company_nodes(db: Session, ids: list[int], level: int) -> list[dict]:
+    found = {}
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start:start + _CHUNK]
+        for row in db.execute(select(Company.id, Company.nev, Company.statusz).where(Company.id.in_(chunk))):
+            found[row.id] = {"id": row.id, "nev": row.nev, "statusz": row.statusz, "is_center": level == 0, "level": level}
+    return [found[company_id] for company_id in ids if company_id in found]
+
+
+class NetworkWalk:
+    """Iterate for ``(nodes, links)`` per level, starting with the center alone.
+
+    Yields nothing when the company does not exist. ``expand`` finds the
+    connections of a frontier; ``truncated`` is set once a cap dropped
+    anything.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        company_id: int,
+        depth: int = 2,
+        max_nodes: int = DEFAULT_MAX_NODES,
+        max_edges: int = DEFAULT_MAX_EDGES,
+        expand: Expansion = sql_expand,
+    ):
+        self.db = db
+        self.company_id = company_id
+        self.depth = depth
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.expand = expand
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[tuple[list[dict], list[dict]]]:
+        center = _company_nodes(self.db, [self.company_id], 0)
+        if not center:
+            return
+        yield center, []
+        levels = {self.company_id: 0}
+        frontier = [self.company_id]
+        edges = 0
+        for level in range(1, self.depth + 1):
+            if not frontier:
+                return
+            links: dict[tuple[int, int], list[str]] = {}
+            new: list[int] = []
+            connections = self.expand(self.db, frontier)
+            for source, target, name in connections:
+                known = levels.get(target)
+                if known is not None and known < level - 1:
+                    continue  # linked when the earlier level was expanded
+                key = (min(source, target), max(source, target))
+                if key not in links:
+                    if edges >= self.max_edges:
+                        self.truncated = True
+                        break
+                    if known is None:
+                        if len(levels) >= self.max_nodes:
+                            self.truncated = True
+                            continue
+                        levels[target] = level
+                        new.append(target)
+                    links[key] = []
+                    edges += 1
+                if name not in links[key]:
+                    links[key].append(name)
+            if getattr(connections, "cut", False):
+                self.truncated = True
+
+            nodes = _company_nodes(self.db, new, level)
+            if len(nodes) < len(new):
+                # Officers pointing at deleted companies
+                missing = set(new) - {node["id"] for node in nodes}
+                links = {key: names for key, names in links.items() if not missing.intersection(key)}
+                for company_id in missing:
+                    levels[company_id] = -1  # skipped from now on
+            yield nodes, [{"source": s, "target": t, "officers": names} for (s, t), names in links.items()]
+            frontier = [node["id"] for node in nodes]
+
+
+def build_network(
+    db: Session,
+    company_id: int,
+    depth: int = 2,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    max_edges: int = DEFAULT_MAX_EDGES,
+    expand: Expansion = sql_expand,
+) -> dict | None:
+    """The whole graph as ``{"nodes", "links", "truncated"}``; None if the company does not exist."""
+    walk = NetworkWalk(db, company_id, depth, max_nodes, max_edges, expand)
+    nodes: list[dict] = []
+    links: list[dict] = []
+    for level_nodes, level_links in walk:
+        nodes += level_nodes
+        links += level_links
+    if not nodes:
+        return None
+    return {"nodes": nodes, "links": links, "truncated": walk.truncated}
+
+
+class _Search:
+    """One side of the bidirectional search: distances and all shortest-path parents."""
+
+    def __init__(self, start: int):
+        self.depth = 0
+        self.frontier = [start]
+        self.levels = {start: 0}
+        # company -> {parent company: names of the persons they share}
+        self.parents: dict[int, dict[int, list[str]]] = {start: {}}
+
+    def chains(self, node: int, limit: int) -> Iterator[list[tuple[int, list[str]]]]:
+        """Chains ``[(node, []), (parent, names), ...]`` back to the start, at most ``limit``."""
+        if not self.parents[node]:
+            yield [(node, [])]
+            return
+        produced = 0
+        for parent, names in self.parents[node].items():
+            for chain in self.chains(parent, limit - produced):
+                yield [(node, names), *chain]
+                produced += 1
+                if produced >= limit:
+                    return
+
+
+def shortest_paths(
+    db: Session,
+    source_id: int,
+    target_id: int,
+    max_length: int = 4,
+    max_visits: int = DEFAULT_MAX_VISITS,
+    max_paths: int = DEFAULT_MAX_PATHS,
+    expand: Expansion = sql_expand,
+) -> dict | None:
+    """Shortest connections of two companies through shared officers.
+
+    Returns ``{"length", "nodes", "paths", "truncated", "exhausted"}``;
+    ``length`` is None when no path of at most ``max_length`` links was
+    found, and ``exhausted`` tells that the search stopped at
+    ``max_visits`` companies, or that an expansion was cut, before it
+    could decide. ``paths`` lists
+    ``{"companies", "officers"}`` with the shared person names per link;
+    ``truncated`` is set when there were more than ``max_paths`` paths.
+    None if either company does not exist.
+    """
+    ends = _company_nodes(db, list(dict.fromkeys([source_id, target_id])), 0)
+    if len(ends) < len({source_id, target_id}):
+        return None
+    for node in ends:
+        del node["level"]
+    result = {"length": None, "nodes": [], "paths": [], "truncated": False, "exhausted": False}
+    if source_id == target_id:
+        return {**result, "length": 0, "nodes": ends, "paths": [{"companies": [source_id], "officers": []}]}
+
+    forward, backward = _Search(source_id), _Search(target_id)
+    visits = 2
+    meeting: list[int] = []
+    while not meeting and forward.depth + backward.depth < max_length:
+        side, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+        if not side.frontier:
+            break
+        level = side.depth + 1
+        new: list[int] = []
+        connections = expand(db, side.frontier)
+        for parent, company_id, name in connections:
+            known = side.levels.get(company_id)
+            if known is None:
+                if visits >= max_visits:
+                    result["exhausted"] = True
+                    break
+                visits += 1
+                side.levels[company_id] = level
+                side.parents[company_id] = {}
+                new.append(company_id)
+            elif known != level:
+                continue
+            names = side.parents[company_id].setdefault(parent, [])
+            if name not in names:
+                names.append(name)
+        if getattr(connections, "cut", False):
+            # Some connections of this level are missing: a miss proves nothing
+            result["exhausted"] = True
+        if result["exhausted"]:
+            break
+        side.depth, side.frontier = level, new
+        # Both sides were complete up to their depths without meeting, so every
+        # company reached from both ends now lies on a shortest path.
+        meeting = [company_id for company_id in new if company_id in other.levels]
+
+    if not meeting:
+        result["nodes"] = ends
+        return result
+
+    paths = []
+    for middle in meeting:
+        for head in forward.chains(middle, max_paths + 1 - len(paths)):
+            for tail in backward.chains(middle, max_paths + 1 - len(paths)):
+                companies = [node for node, _ in reversed(head)] + [node for node, _ in tail[1:]]
+                officers = [names for _, names in reversed(head[:-1])] + [names for _, names in tail[:-1]]
+                paths.append({"companies": companies, "officers": officers})
+                if len(paths) > max_paths:
+                    break
+            if len(paths) > max_paths:
+                break
+        if len(paths) > max_paths:
+            break
+    result["truncated"] = len(paths) > max_paths
+    paths = paths[:max_paths]
+
+    ids = list(dict.fromkeys(company_id for path in paths for company_id in path["companies"]))
+    nodes = _company_nodes(db, ids, 0)
+    found = {node["id"] for node in nodes}
+    # Officers pointing at deleted companies
+    paths = [path for path in paths if found.issuperset(path["companies"])]
+    for node in nodes:
+        node["is_center"] = node["id"] in (source_id, target_id)
+        del node["level"]
+    result.update(length=forward.depth + backward.depth if paths else None, nodes=nodes, paths=paths)
+    return result
@@ -0,0 +1,83 @@
+"""Per-worker cache of ``GET /companies/{id}/network`` graphs."""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.company import Company
+from app.models.financial import Officer
+from app.services.cache import TTLCache
+from app.services.network import Expansion, build_network
+from app.services.network_layout import network_layout_cache
+from app.services.session_changes import after_commit, touched_values
+
+# Registers the officer graph's after_commit listener before ours, so the
+# in-memory graph is updated before the entries built from it are dropped
+import app.services.officer_graph  # noqa: F401
+
+_CHUNK = 1000
+
+network_cache = TTLCache(
+    maxsize=settings.network_cache_size,
+    ttl=settings.network_cache_ttl_seconds,
+    name="network",
+)
+
+
+class _CachedNetwork:
+    def __init__(self, network: dict):
+        self.network = network
+        self.companies = frozenset(node["id"] for node in network["nodes"])
+
+
+def cached_network(db: Session, key: tuple[int, int, int, int], expand: Expansion) -> dict | None:
+    """``build_network(db, *key, expand)``, from the cache when possible.
+
+    The result is shared between requests: callers must not modify the
+    node or link dicts (copy the top-level dict to add keys).
+    """
+    entry = network_cache.get(key)
+    if entry is None:
+        network = build_network(db, *key, expand)
+        if network is None:
+            return None
+        entry = _CachedNetwork(network)
+        network_cache.set(key, entry)
+    return entry.network
+
+
+def invalidate_companies(companies: set[int]) -> None:
+    """Drop the cached graphs and layouts that contain any of ``companies``."""
+    network_cache.discard_if(lambda entry: not entry.companies.isdisjoint(companies))
+    network_layout_cache.discard_if(lambda layout: not layout.companies.isdisjoint(companies))
+
+
+def _companies_of_persons(session: Session, persons: set[int]) -> set[int]:
+    ordered = list(persons)
+    companies = set()
+    for start in range(0, len(ordered), _CHUNK):
+        chunk = ordered[start:start + _CHUNK]
+        companies.update(session.scalars(select(Officer.company_id).where(Officer.person_id.in_(chunk))))
+    return companies
+
+
+def _network_writes(session: Session) -> set[int]:
+    companies: set[int] = set()
+    persons: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Officer):
+            companies.update(touched_values(obj, "company_id"))
+            persons.update(touched_values(obj, "person_id"))
+        elif isinstance(obj, Company) and obj not in session.new:
+            companies.add(obj.id)
+    if persons:
+        # Still in the flush's transaction: the written rows are visible
+        companies |= _companies_of_persons(session, persons)
+    return companies
+
+
+def _invalidate_networks(_session: Session, batches: list[set[int]]) -> None:
+    invalidate_companies(set().union(*batches))
+
+
+after_commit("network_companies", _network_writes, _invalidate_networks)
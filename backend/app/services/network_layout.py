@@ -0,0 +1,145 @@
+"""Server-side node coordinates for ``GET /companies/{id}/network?layout=true``."""
+
+from collections.abc import Hashable
+
+import numpy as np
+
+from app.config import settings
+from app.services.cache import TTLCache
+
+_ITERATIONS = 50
+_COOLING = 0.95
+_EXACT_NODES = 500
+_PER_CELL = 8
+_GRID_PERCENTILES = (2, 98)
+_EDGE_PX = 40  # screen length of the ideal link length ``k``
+
+network_layout_cache = TTLCache(
+    maxsize=settings.network_layout_cache_size,
+    ttl=settings.network_layout_cache_ttl_seconds,
+    name="network_layout",
+)
+
+
+def _exact_repulsion(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    w = dx * dx + dy * dy
+    np.maximum(w, 1e-4, out=w)
+    np.reciprocal(w, out=w)
+    return (dx * w).sum(1), (dy * w).sum(1)
+
+
+def _grid_repulsion(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    n = len(x)
+    size = max(int(np.sqrt(n / _PER_CELL)), 1)
+    # The grid spans the bulk of the nodes; outliers (pushed-away loose nodes)
+    # are clamped into the edge cells instead of stretching every cell
+    (x0, x1), (y0, y1) = np.percentile(x, _GRID_PERCENTILES), np.percentile(y, _GRID_PERCENTILES)
+    cx = np.clip(((x - x0) / max(x1 - x0, 1e-9) * size).astype(np.int64), 0, size - 1)
+    cy = np.clip(((y - y0) / max(y1 - y0, 1e-9) * size).astype(np.int64), 0, size - 1)
+    cell = cx * size + cy
+
+    # Far field: every occupied cell through its centre of mass...
+    mass = np.bincount(cell, minlength=size * size).astype(np.float64)
+    occupied = np.flatnonzero(mass)
+    m = mass[occupied]
+    mx = np.bincount(cell, x, size * size)[occupied] / m
+    my = np.bincount(cell, y, size * size)[occupied] / m
+    dx = x[:, None] - mx[None, :]
+    dy = y[:, None] - my[None, :]
+    w = dx * dx + dy * dy
+    np.maximum(w, 1e-4, out=w)
+    w = m / w
+    # ...except the neighbouring cells, added pair by pair below
+    near = (np.abs(cx[:, None] - occupied // size) <= 1) & (np.abs(cy[:, None] - occupied % size) <= 1)
+    w[near] = 0
+    fx, fy = (dx * w).sum(1), (dy * w).sum(1)
+
+    order = np.argsort(cell, kind="stable")
+    cells = np.arange(size * size)
+    starts = np.searchsorted(cell[order], cells)
+    ends = np.searchsorted(cell[order], cells, side="right")
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            nx, ny = cx + ox, cy + oy
+            inside = (nx >= 0) & (nx < size) & (ny >= 0) & (ny < size)
+            nodes = np.flatnonzero(inside)
+            neighbour_cells = nx[inside] * size + ny[inside]
+            first, counts = starts[neighbour_cells], ends[neighbour_cells] - starts[neighbour_cells]
+            total = int(counts.sum())
+            if not total:
+                continue
+            src = np.repeat(nodes, counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            dst = order[np.repeat(first, counts) + offsets]
+            ddx, ddy = x[src] - x[dst], y[src] - y[dst]
+            ww = ddx * ddx + ddy * ddy
+            np.maximum(ww, 1e-4, out=ww)
+            ww = 1 / ww
+            ww[src == dst] = 0
+            fx += np.bincount(src, ddx * ww, n)
+            fy += np.bincount(src, ddy * ww, n)
+    return fx, fy
+
+
+def force_layout(
+    levels: np.ndarray, sources: np.ndarray, targets: np.ndarray, iterations: int = _ITERATIONS
+) -> np.ndarray:
+    """``(n, 2)`` coordinates in units of the ideal link length, node 0 at the origin.
+
+    ``levels`` is the BFS level per node; ``sources`` / ``targets`` index the nodes.
+    """
+    n = len(levels)
+    rng = np.random.default_rng(0)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    radius = levels.astype(np.float64) * np.sqrt(n) / max(int(levels.max(initial=0)), 1)
+    x, y = radius * np.cos(angle), radius * np.sin(angle)
+    repulsion = _exact_repulsion if n <= _EXACT_NODES else _grid_repulsion
+    step = np.sqrt(n) / 10 + 1
+    for _ in range(iterations):
+        fx, fy = repulsion(x, y)
+        ex, ey = x[sources] - x[targets], y[sources] - y[targets]
+        dist = np.hypot(ex, ey)
+        ax, ay = ex * dist, ey * dist
+        fx += np.bincount(targets, ax, n) - np.bincount(sources, ax, n)
+        fy += np.bincount(targets, ay, n) - np.bincount(sources, ay, n)
+        length = np.maximum(np.hypot(fx, fy), 1e-9)
+        scale = np.minimum(length, step) / length
+        x += fx * scale
+        y += fy * scale
+        step *= _COOLING
+    return np.stack([x - x[0], y - y[0]], axis=1) if n else np.empty((0, 2))
+
+
+class _Layout:
+    def __init__(self, signature: int, positions: dict[int, tuple[float, float]]):
+        self.signature = signature  # of the graph the positions were computed for
+        self.companies = frozenset(positions)
+        self.positions = positions
+
+
+def _signature(network: dict) -> int:
+    nodes = tuple(sorted(node["id"] for node in network["nodes"]))
+    links = tuple(sorted((link["source"], link["target"]) for link in network["links"]))
+    return hash((nodes, links))
+
+
+def add_layout(network: dict, key: Hashable) -> dict:
+    """``network`` (a ``build_network`` result) with ``x`` / ``y`` pixels, center at 0, 0, on copies of its nodes."""
+    signature = _signature(network)
+    layout = network_layout_cache.get(key)
+    if layout is None or layout.signature != signature:
+        ids = [node["id"] for node in network["nodes"]]
+        index = {company_id: i for i, company_id in enumerate(ids)}
+        sources = np.fromiter((index[link["source"]] for link in network["links"]), dtype=np.int64)
+        targets = np.fromiter((index[link["target"]] for link in network["links"]), dtype=np.int64)
+        levels = np.fromiter((node["level"] for node in network["nodes"]), dtype=np.int64)
+        coords = np.round(force_layout(levels, sources, targets) * _EDGE_PX, 1).tolist()
+        layout = _Layout(signature, dict(zip(ids, map(tuple, coords))))
+        network_layout_cache.set(key, layout)
+    nodes = []
+    for node in network["nodes"]:
+        x, y = layout.positions[node["id"]]
+        nodes.append({**node, "x": x, "y": y})
+    return {**network, "nodes": nodes}
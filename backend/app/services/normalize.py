@@ -0,0 +1,92 @@
+"""Company and person name normalization used for indexed name lookups."""
+
+import re
+import unicodedata
+
+# Trailing legal forms, abbreviated and spelled out, as token sequences
+_LEGAL_FORMS: tuple[tuple[str, ...], ...] = (
+    ("kft",),
+    ("zrt",),
+    ("nyrt",),
+    ("bt",),
+    ("kkt",),
+    ("kht",),
+    ("rt",),
+    ("ev",),
+    ("e", "v"),
+    ("korlatolt", "felelossegu", "tarsasag"),
+    ("zartkoruen", "mukodo", "reszvenytarsasag"),
+    ("nyilvanosan", "mukodo", "reszvenytarsasag"),
+    ("reszvenytarsasag",),
+    ("beteti", "tarsasag"),
+    ("kozkereseti", "tarsasag"),
+    ("egyeni", "vallalkozo"),
+    ("nonprofit",),
+    # status markers: "v.a." végelszámolás, "f.a." felszámolás, "cs.a." csődeljárás alatt
+    ("v", "a"),
+    ("f", "a"),
+    ("cs", "a"),
+    ("felszamolas", "alatt"),
+    ("vegelszamolas", "alatt"),
+)
+
+# Titles that do not tell people apart; "ifj." / "id." do, so they stay
+_PERSON_TITLES = frozenset({"dr", "prof", "phd"})
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def fold_diacritics(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_company_name(name: str | None) -> str:
+    if not name:
+        return ""
+    tokens = _NON_ALNUM.sub(" ", fold_diacritics(name.lower())).split()
+    stripped = True
+    while stripped and len(tokens) > 1:
+        stripped = False
+        for form in _LEGAL_FORMS:
+            n = len(form)
+            if len(tokens) > n and tuple(tokens[-n:]) == form:
+                del tokens[-n:]
+                stripped = True
+                break
+    return " ".join(tokens)
+
+
+def normalize_company_query(q: str | None) -> str:
+    """``normalize_company_name`` for text being typed into a search box.
+
+    A trailing legal form that is not finished yet ("Teszt K", "Teszt Kf",
+    "Minta Korlátolt Fel") is dropped as well, since the stored names have
+    none left to match it.
+    """
+    tokens = normalize_company_name(q).split()
+    partial = max(
+        (
+            n
+            for form in _LEGAL_FORMS
+            for n in range(1, min(len(form), len(tokens) - 1) + 1)
+            if tuple(tokens[-n:-1]) == form[:n - 1] and form[n - 1].startswith(tokens[-1])
+        ),
+        default=0,
+    )
+    return normalize_company_name(" ".join(tokens[:-partial])) if partial else " ".join(tokens)
+
+
+def normalize_person_name(name: str | None) -> str:
+    if not name:
+        return ""
+    tokens = _NON_ALNUM.sub(" ", fold_diacritics(name.lower())).split()
+    return " ".join(token for token in tokens if token not in _PERSON_TITLES)
+
+
+def person_identity_key(nev: str | None, anyja_neve: str | None) -> str:
+    """Name + mother's name, the way the company registry tells people apart.
+
+    Officers recorded without a mother's name only match each other.
+    """
+    return f"{normalize_person_name(nev)}|{normalize_person_name(anyja_neve)}"
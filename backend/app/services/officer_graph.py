@@ -0,0 +1,303 @@
+"""In-memory company–officer graph for relationship queries."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.financial import Officer, Person
+from app.services.network import Connections
+from app.services.session_changes import after_commit, committed_value
+
+logger = logging.getLogger(__name__)
+
+_COMPACT_AFTER = 10_000  # overridden nodes before the arrays are rebuilt in memory
+_MAX_PAIRS = 2_000_000  # gathered pairs per hop; bounds a frontier full of hubs
+_LOAD_BATCH = 100_000
+_CHUNK = 1000
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+class _CSR:
+    """Adjacency of one side: ``values[indptr[i]:indptr[i + 1]]`` are the neighbours of ``ids[i]``."""
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray):
+        order = np.argsort(keys, kind="stable")
+        ids, counts = np.unique(keys[order], return_counts=True)
+        self.ids = ids.astype(np.int32)
+        self.indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.values = values[order].astype(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.indptr.nbytes + self.values.nbytes
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.repeat(self.ids, np.diff(self.indptr)), self.values
+
+    def neighbours(self, node: int) -> np.ndarray:
+        pos = int(np.searchsorted(self.ids, node))
+        if pos < len(self.ids) and self.ids[pos] == node:
+            return self.values[self.indptr[pos]:self.indptr[pos + 1]]
+        return _EMPTY
+
+    def gather(self, nodes: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray, bool]:
+        """``(origin, neighbour)`` pairs for ``nodes``; ``origin`` indexes ``nodes``.
+
+        At most ``limit`` pairs; the last flag tells whether some were cut.
+        """
+        if not len(self.ids) or not len(nodes):
+            return _EMPTY, _EMPTY, False
+        pos = np.searchsorted(self.ids, nodes)
+        pos[pos == len(self.ids)] = 0
+        found = np.flatnonzero(self.ids[pos] == nodes)
+        starts = self.indptr[pos[found]]
+        lengths = self.indptr[pos[found] + 1] - starts
+        ends = np.cumsum(lengths)
+        truncated = bool(ends.size) and ends[-1] > limit
+        if truncated:
+            keep = int(np.searchsorted(ends, limit)) + 1
+            found, starts, lengths = found[:keep], starts[:keep], lengths[:keep].copy()
+            lengths[-1] -= ends[keep - 1] - limit
+            ends = np.cumsum(lengths)
+        total = int(ends[-1]) if ends.size else 0
+        offsets = np.arange(total) + np.repeat(starts - (ends - lengths), lengths)
+        return np.repeat(found, lengths), self.values[offsets], truncated
+
+
+def _gather(csr: _CSR, overrides: dict[int, np.ndarray], nodes: np.ndarray, limit: int):
+    """``_CSR.gather`` with the overridden nodes' lists taken from ``overrides``."""
+    if not overrides:
+        return csr.gather(nodes, limit)
+    overridden = np.isin(nodes, np.fromiter(overrides, dtype=np.int64, count=len(overrides)))
+    origin, values, truncated = csr.gather(np.where(overridden, -1, nodes), limit)
+    origins, lists = [origin], [values]
+    for i in np.flatnonzero(overridden):
+        neighbours = overrides[int(nodes[i])]
+        origins.append(np.full(len(neighbours), i, dtype=np.int64))
+        lists.append(neighbours)
+    return np.concatenate(origins), np.concatenate(lists), truncated
+
+
+class OfficerGraph:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._companies = _CSR(_EMPTY, _EMPTY)
+        self._persons = _CSR(_EMPTY, _EMPTY)
+        self._company_overrides: dict[int, np.ndarray] = {}
+        self._person_overrides: dict[int, np.ndarray] = {}
+        # (company ids, person ids) written while a build is running
+        self._pending: tuple[set[int], set[int]] | None = None
+        self._built_at = 0.0
+        self.ready = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._companies = _CSR(_EMPTY, _EMPTY)
+            self._persons = _CSR(_EMPTY, _EMPTY)
+            self._company_overrides, self._person_overrides = {}, {}
+            self._pending = None
+            self.ready = False
+
+    @property
+    def tracking(self) -> bool:
+        """True while writes have to be recorded (graph ready or being built)."""
+        return self.ready or self._pending is not None
+
+    def build(self, db: Session) -> None:
+        """(Re)load from the database, then re-read the nodes written meanwhile."""
+        with self._lock:
+            self._pending = (set(), set())
+        started = time.monotonic()
+        try:
+            result = db.execute(
+                select(Officer.company_id, Officer.person_id)
+                .where(Officer.person_id.is_not(None))
+                .execution_options(yield_per=_LOAD_BATCH)
+            )
+            # np.array() on Row objects is an order of magnitude slower than on a flat iterator
+            parts = [
+                np.fromiter(chain.from_iterable(part), dtype=np.int32, count=2 * len(part)).reshape(-1, 2)
+                for part in result.partitions()
+            ]
+            edges = np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.int32)
+            companies = _CSR(edges[:, 0], edges[:, 1])
+            persons = _CSR(edges[:, 1], edges[:, 0])
+            with self._lock:
+                touched_companies, touched_persons = set(self._pending[0]), set(self._pending[1])
+            company_overrides = self._load_lists(db, Officer.company_id, Officer.person_id, touched_companies)
+            person_overrides = self._load_lists(db, Officer.person_id, Officer.company_id, touched_persons)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            # Writes committed after the re-read above are still in _pending; they re-run it
+            late_companies, late_persons = self._pending
+            company_overrides.update(
+                self._load_lists(db, Officer.company_id, Officer.person_id, late_companies - touched_companies)
+            )
+            person_overrides.update(
+                self._load_lists(db, Officer.person_id, Officer.company_id, late_persons - touched_persons)
+            )
+            self._companies, self._persons = companies, persons
+            self._company_overrides, self._person_overrides = company_overrides, person_overrides
+            self._pending = None
+            self._built_at = time.monotonic()
+            self.ready = True
+        logger.info("Officer graph built: %d edges in %.1fs", len(edges), time.monotonic() - started)
+
+    @staticmethod
+    def _load_lists(db: Session, key, value, ids: set[int]) -> dict[int, np.ndarray]:
+        lists: dict[int, list[int]] = {node: [] for node in ids}
+        ordered = list(ids)
+        for start in range(0, len(ordered), _CHUNK):
+            chunk = ordered[start:start + _CHUNK]
+            rows = db.execute(select(key, value).where(key.in_(chunk), Officer.person_id.is_not(None)))
+            for node, neighbour in rows:
+                lists[node].append(neighbour)
+        return {node: np.array(values, dtype=np.int32) for node, values in lists.items()}
+
+    def build_in_background(self, session_factory: Callable[[], Session]) -> None:
+        if not self._rebuild_lock.acquire(blocking=False):
+            return
+
+        def run():
+            db = session_factory()
+            try:
+                self.build(db)
+            except Exception:
+                logger.exception("Officer graph build failed; network queries stay on SQL")
+            finally:
+                db.close()
+                self._rebuild_lock.release()
+
+        threading.Thread(target=run, name="officer-graph", daemon=True).start()
+
+    def rebuild_if_due(self, session_factory: Callable[[], Session]) -> None:
+        if self.ready and time.monotonic() - self._built_at >= settings.officer_graph_rebuild_seconds:
+            self.build_in_background(session_factory)
+
+    def apply(self, changes: list[tuple[int, int, int]]) -> None:
+        """Apply committed ``(company_id, person_id, +1 / -1)`` edge changes."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[0].update(company_id for company_id, _, _ in changes)
+                self._pending[1].update(person_id for _, person_id, _ in changes)
+            if not self.ready:
+                return
+            for company_id, person_id, sign in changes:
+                self._patch(self._companies, self._company_overrides, company_id, person_id, sign)
+                self._patch(self._persons, self._person_overrides, person_id, company_id, sign)
+            if len(self._company_overrides) + len(self._person_overrides) > _COMPACT_AFTER:
+                self._compact()
+
+    @staticmethod
+    def _patch(csr: _CSR, overrides: dict[int, np.ndarray], node: int, neighbour: int, sign: int) -> None:
+        current = overrides.get(node)
+        if current is None:
+            current = csr.neighbours(node)
+        if sign > 0:
+            overrides[node] = np.append(current, np.int32(neighbour))
+        else:
+            matches = np.flatnonzero(current == neighbour)
+            if matches.size:
+                overrides[node] = np.delete(current, matches[0])
+
+    def _compact(self) -> None:
+        keys, values = self._companies.edges()
+        if self._company_overrides:
+            overridden = np.fromiter(self._company_overrides, dtype=np.int64, count=len(self._company_overrides))
+            kept = ~np.isin(keys, overridden)
+            keys = np.concatenate([keys[kept], *(np.full(len(v), k, dtype=np.int32) for k, v in self._company_overrides.items())])
+            values = np.concatenate([values[kept], *self._company_overrides.values()])
+        self._companies = _CSR(keys, values)
+        self._persons = _CSR(values, keys)
+        self._company_overrides, self._person_overrides = {}, {}
+
+    def expand(self, db: Session, frontier: list[int]) -> Connections:
+        """``services.network`` expansion step: companies sharing a person with ``frontier``.
+
+        ``cut`` is set on the result when a hop had more than ``_MAX_PAIRS`` pairs.
+        """
+        nodes = np.asarray(frontier, dtype=np.int32)
+        with self._lock:
+            origin, persons, cut = _gather(self._companies, self._company_overrides, nodes, _MAX_PAIRS)
+            sources = nodes[origin]
+            origin, targets, cut2 = _gather(self._persons, self._person_overrides, persons, _MAX_PAIRS)
+        if cut or cut2:
+            logger.warning("Officer graph expansion of %d companies cut at %d pairs", len(frontier), _MAX_PAIRS)
+        sources, via = sources[origin], persons[origin]
+        keep = targets != sources
+        triples = np.unique(np.stack([sources[keep], targets[keep], via[keep]], axis=1), axis=0)
+        names = self._person_names(db, np.unique(triples[:, 2]).tolist())
+        connections = Connections(
+            (source, target, names.get(person_id, "")) for source, target, person_id in triples.tolist()
+        )
+        connections.cut = bool(cut or cut2)
+        return connections
+
+    @staticmethod
+    def _person_names(db: Session, ids: list[int]) -> dict[int, str]:
+        names = {}
+        for start in range(0, len(ids), _CHUNK):
+            chunk = ids[start:start + _CHUNK]
+            names.update(db.execute(select(Person.id, Person.nev).where(Person.id.in_(chunk))).all())
+        return names
+
+    def stats(self) -> dict:
+        with self._lock:
+            edges = len(self._companies.values)
+            nbytes = self._companies.nbytes + self._persons.nbytes
+            nbytes += sum(v.nbytes for v in self._company_overrides.values())
+            nbytes += sum(v.nbytes for v in self._person_overrides.values())
+            return {
+                "ready": self.ready,
+                "edges": edges,
+                "companies": len(self._companies.ids),
+                "persons": len(self._persons.ids),
+                "overridden_nodes": len(self._company_overrides) + len(self._person_overrides),
+                "bytes": nbytes,
+                "bytes_per_million_edges": round(nbytes / edges * 1_000_000) if edges else None,
+            }
+
+
+officer_graph = OfficerGraph()
+
+
+def _officer_writes(session: Session) -> list[tuple[int, int, int]] | None:
+    if not officer_graph.tracking:
+        return None
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Officer) and obj.person_id is not None:
+            changes.append((obj.company_id, obj.person_id, 1))
+    for obj in session.deleted:
+        if isinstance(obj, Officer) and committed_value(obj, "person_id") is not None:
+            changes.append((committed_value(obj, "company_id"), committed_value(obj, "person_id"), -1))
+    for obj in session.dirty:
+        if not isinstance(obj, Officer):
+            continue
+        old = (committed_value(obj, "company_id"), committed_value(obj, "person_id"))
+        new = (obj.company_id, obj.person_id)
+        if old != new:
+            if old[1] is not None:
+                changes.append((*old, -1))
+            if new[1] is not None:
+                changes.append((*new, 1))
+    return changes
+
+
+def _apply_officer_writes(_session: Session, batches: list[list[tuple[int, int, int]]]) -> None:
+    officer_graph.apply([change for batch in batches for change in batch])
+
+
+after_commit("officer_graph_changes", _officer_writes, _apply_officer_writes)
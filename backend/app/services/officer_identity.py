@@ -0,0 +1,100 @@
+"""Person identities behind officer rows."""
+
+from collections.abc import Iterable
+
+from sqlalchemy import bindparam, event, inspect, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.financial import Officer, Person
+from app.services.normalize import person_identity_key
+
+_CHUNK = 1000
+
+
+def _insert_missing(db: Session):
+    """``INSERT`` into persons that skips keys a concurrent writer created first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(Person.__table__).on_conflict_do_nothing(index_elements=["identity_key"])
+    if dialect == "sqlite":
+        return sqlite.insert(Person.__table__).on_conflict_do_nothing(index_elements=["identity_key"])
+    return insert(Person.__table__)
+
+
+def _person_ids(db: Session, keys: list[str]) -> dict[str, int]:
+    found = {}
+    for start in range(0, len(keys), _CHUNK):
+        chunk = keys[start:start + _CHUNK]
+        found.update(db.execute(select(Person.identity_key, Person.id).where(Person.identity_key.in_(chunk))).all())
+    return found
+
+
+def resolve_person_ids(db: Session, names: Iterable[tuple[str, str | None]]) -> dict[str, int]:
+    """Map the identity keys of ``(nev, anyja_neve)`` pairs to person ids, creating missing persons."""
+    wanted: dict[str, tuple[str, str | None]] = {}
+    for nev, anyja_neve in names:
+        wanted.setdefault(person_identity_key(nev, anyja_neve), (nev, anyja_neve))
+    with db.no_autoflush:
+        found = _person_ids(db, list(wanted))
+        missing = [key for key in wanted if key not in found]
+        if missing:
+            db.execute(
+                _insert_missing(db),
+                [{"identity_key": key, "nev": wanted[key][0], "anyja_neve": wanted[key][1]} for key in missing],
+            )
+            found.update(_person_ids(db, missing))
+    return found
+
+
+def backfill_person_ids(db: Session, batch_size: int = 5000) -> int:
+    """Link officers written before ``person_id`` existed to their persons."""
+    officers = Officer.__table__
+    total = 0
+    while True:
+        rows = db.execute(
+            select(Officer.id, Officer.nev, Officer.anyja_neve).where(Officer.person_id.is_(None)).limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        person_ids = resolve_person_ids(db, [(row.nev, row.anyja_neve) for row in rows])
+        db.execute(
+            update(officers).where(officers.c.id == bindparam("row_id")).values(person_id=bindparam("person")),
+            [{"row_id": row.id, "person": person_ids[person_identity_key(row.nev, row.anyja_neve)]} for row in rows],
+        )
+        db.commit()
+        total += len(rows)
+
+
+def other_companies_of_officers(db: Session, company_id: int) -> dict[int, list[tuple[int, str]]]:
+    """``person_id -> [(company id, name), ...]`` of the companies the officers of
+    ``company_id`` also hold positions in, in one indexed query."""
+    persons = select(Officer.person_id).where(Officer.company_id == company_id, Officer.person_id.is_not(None))
+    rows = (
+        db.query(Officer.person_id, Company.id, Company.nev)
+        .join(Company, Company.id == Officer.company_id)
+        .filter(Officer.person_id.in_(persons), Officer.company_id != company_id)
+        .distinct()
+        .order_by(Officer.person_id, Company.nev)
+        .all()
+    )
+    result: dict[int, list[tuple[int, str]]] = {}
+    for person_id, other_id, nev in rows:
+        result.setdefault(person_id, []).append((other_id, nev))
+    return result
+
+
+def _needs_person(officer: Officer) -> bool:
+    attrs = inspect(officer).attrs
+    return officer.person_id is None or attrs.nev.history.has_changes() or attrs.anyja_neve.history.has_changes()
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_person_ids(session: Session, _flush_context, _instances) -> None:
+    officers = [obj for obj in (*session.new, *session.dirty) if isinstance(obj, Officer) and _needs_person(obj)]
+    if not officers:
+        return
+    person_ids = resolve_person_ids(session, [(officer.nev, officer.anyja_neve) for officer in officers])
+    for officer in officers:
+        officer.person_id = person_ids[person_identity_key(officer.nev, officer.anyja_neve)]
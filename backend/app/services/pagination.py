@@ -0,0 +1,85 @@
+"""Keyset (cursor) pagination for company listings."""
+
+import base64
+import json
+from datetime import date
+
+from sqlalchemy import and_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def keyset_order(column: InstrumentedAttribute, descending: bool, id_column: InstrumentedAttribute) -> list:
+    if column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    ordered = column.desc() if descending else column.asc()
+    if column.nullable:
+        ordered = ordered.nulls_last()
+    return [ordered, id_column.desc() if descending else id_column.asc()]
+
+
+def encode_cursor(order_key: str, value, row_id: int) -> str:
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps({"o": order_key, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_key: str, column: InstrumentedAttribute) -> tuple[object, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value, row_id = data["v"], int(data["id"])
+        if data["o"] != order_key:
+            raise InvalidCursor("cursor belongs to a different ordering")
+        if value is not None and column.type.python_type is date:
+            value = date.fromisoformat(value)
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+    return value, row_id
+
+
+def after_cursor(
+    column: InstrumentedAttribute,
+    descending: bool,
+    id_column: InstrumentedAttribute,
+    value,
+    row_id: int,
+) -> ColumnElement[bool]:
+    """Non-NULL rows strictly after ``(value, row_id)`` in ``keyset_order``; see ``rows_after``."""
+    id_after = id_column < row_id if descending else id_column > row_id
+    if column is id_column:
+        return id_after
+    if value is None:
+        # Already inside the trailing NULL block
+        return and_(column.is_(None), id_after)
+    key, last = tuple_(column, id_column), tuple_(value, row_id)
+    return key < last if descending else key > last
+
+
+def rows_after(
+    query,
+    column: InstrumentedAttribute,
+    descending: bool,
+    id_column: InstrumentedAttribute,
+    value,
+    row_id: int,
+    limit: int,
+) -> list:
+    """Up to ``limit`` rows of ``query`` (ordered by ``keyset_order``) after ``(value, row_id)``.
+
+    ``after_cursor`` leaves out the trailing NULL block of a nullable column:
+    ``OR column IS NULL`` would turn the index range into a filtered scan
+    from the start of the index. The NULL block is read with a second
+    statement once the range runs out.
+    """
+    rows = query.filter(after_cursor(column, descending, id_column, value, row_id)).limit(limit).all()
+    if value is not None and column is not id_column and column.nullable and len(rows) < limit:
+        rows += query.filter(column.is_(None)).limit(limit - len(rows)).all()
+    return rows
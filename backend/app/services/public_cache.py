@@ -0,0 +1,66 @@
+"""Response caches for the public company search and NAV lookup endpoints."""
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.company import Company
+from app.services.cache import TTLCache
+from app.services.company_search import classify_query
+from app.services.normalize import fold_diacritics, normalize_company_query
+from app.services.session_changes import after_commit, touched_values
+
+public_search_cache = TTLCache(
+    maxsize=settings.public_search_cache_size,
+    ttl=settings.public_search_cache_ttl_seconds,
+    name="public_search",
+)
+nav_lookup_cache = TTLCache(
+    maxsize=settings.nav_lookup_cache_size,
+    ttl=settings.nav_lookup_cache_ttl_seconds,
+    name="nav_lookup",
+)
+
+
+def public_search_key(q: str) -> tuple[str, ...]:
+    q = q.strip()
+    kind, value = classify_query(q)
+    if kind != "name":
+        return kind, value, q
+    normalized = normalize_company_query(q) or " ".join(fold_diacritics(q.lower()).split())
+    # Digits are also matched against tax and registry numbers as typed ("01 09" vs "01-09")
+    return (kind, normalized, q) if any(ch.isdigit() for ch in q) else (kind, normalized)
+
+
+def nav_lookup_key(adoszam: str) -> str:
+    return adoszam.strip().replace("-", "").replace(" ", "")[:8]
+
+
+def invalidate_public_caches() -> None:
+    public_search_cache.clear()
+    nav_lookup_cache.clear()
+
+
+def _companies_written(session: Session) -> bool:
+    return any(isinstance(obj, Company) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+def _written_tax_numbers(session: Session) -> set[str]:
+    return {
+        nav_lookup_key(adoszam)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Company)
+        for adoszam in touched_values(obj, "adoszam")
+    }
+
+
+def _clear_public_search(_session: Session, _batches: list[bool]) -> None:
+    public_search_cache.clear()
+
+
+def _drop_nav_lookups(_session: Session, batches: list[set[str]]) -> None:
+    for key in set().union(*batches):
+        nav_lookup_cache.pop(key)
+
+
+after_commit("public_search", _companies_written, _clear_public_search)
+after_commit("nav_lookup", _written_tax_numbers, _drop_nav_lookups)
@@ -0,0 +1,45 @@
+"""ORM writes collected per session and applied once the transaction commits."""
+
+from collections.abc import Callable
+from typing import TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def committed_value(obj, attr: str):
+    """``attr`` as last loaded from the database, before the flushed change."""
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+
+def touched_values(obj, attr: str) -> list:
+    """``attr`` before and after the flushed change, without ``None`` and repeats."""
+    return [value for value in dict.fromkeys((committed_value(obj, attr), getattr(obj, attr))) if value is not None]
+
+
+def after_commit(key: str, collect: Callable[[Session], T | None], apply: Callable[[Session, list[T]], None]) -> None:
+    """Call ``collect`` after every flush and ``apply`` with its non-empty results after commit.
+
+    The results wait in ``session.info[key]`` and are dropped on rollback.
+    Listeners run in registration order, i.e. in the order of the modules'
+    imports.
+    """
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session: Session, _flush_context) -> None:
+        result = collect(session)
+        if result:
+            session.info.setdefault(key, []).append(result)
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session: Session) -> None:
+        batches = session.info.pop(key, None)
+        if batches:
+            apply(session, batches)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session: Session) -> None:
+        session.info.pop(key, None)
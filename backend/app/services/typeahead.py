@@ -0,0 +1,327 @@
+"""In-process prefix index for the public typeahead (``GET /companies/public``)."""
+
+import logging
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.company import Company
+from app.services.company_search import classify_query
+from app.services.normalize import fold_diacritics, normalize_company_name, normalize_company_query
+from app.services.session_changes import after_commit
+
+logger = logging.getLogger(__name__)
+
+_OFFSET_BITS = 16
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+_MAX_WORDS = 4  # later words indexed per name
+_FULL_REBUILD_ROWS = 5000  # larger deltas rebuild the index instead of patching it
+# updated_at is the writing transaction's start time, so rows can commit "in the past"
+_REFRESH_OVERLAP = timedelta(minutes=1)
+_NON_DIGIT = re.compile(r"\D")
+_IDENT_LIKE = re.compile(r"[\d\s-]+")
+
+# (id, nev, nev_normalized, adoszam, cegjegyzekszam, szekhely, statusz, cegforma)
+CompanyRecord = tuple[int, str, str, str | None, str | None, str | None, str, str | None]
+
+_RECORD_COLUMNS = (
+    Company.id, Company.nev, Company.nev_normalized, Company.adoszam, Company.cegjegyzekszam,
+    Company.szekhely, Company.statusz, Company.cegforma,
+)
+
+
+def _digits(value: str | None) -> str:
+    return _NON_DIGIT.sub("", value) if value else ""
+
+
+_INTERNED: dict[str, str] = {}
+
+
+def _intern(value: str | None) -> str | None:
+    # statusz / cegforma have a handful of distinct values
+    return None if value is None else _INTERNED.setdefault(value, value)
+
+
+class _Snapshot:
+    """The arrays themselves; mutated only under ``PrefixIndex._lock``."""
+
+    def __init__(self):
+        self.slots: dict[int, int] = {}  # company id -> slot
+        self.ids = array("q")
+        self.norm: list[str] = []
+        self.digits: list[tuple[str, str]] = []  # (tax digits, registry digits)
+        self.rows: list[tuple | None] = []  # (nev, szekhely, statusz, cegforma)
+        self.names = array("q")  # slot << _OFFSET_BITS
+        self.words = array("q")  # slot << _OFFSET_BITS | char offset of the word
+        self.idents = array("q")  # slot << 1 | 0 tax / 1 registry
+
+    def name_key(self, entry: int) -> str:
+        return self.norm[entry >> _OFFSET_BITS][entry & _OFFSET_MASK:]
+
+    def ident_key(self, entry: int) -> str:
+        return self.digits[entry >> 1][entry & 1]
+
+    def _append(self, record: CompanyRecord) -> tuple[int, list[int], list[int], list[int]]:
+        company_id, nev, norm, adoszam, cegjegyzekszam, szekhely, statusz, cegforma = record
+        norm = norm or normalize_company_name(nev)
+        slot = len(self.ids)
+        self.slots[company_id] = slot
+        self.ids.append(company_id)
+        self.norm.append(norm)
+        self.digits.append((_digits(adoszam), _digits(cegjegyzekszam)))
+        self.rows.append((nev, szekhely, _intern(statusz), _intern(cegforma)))
+        return slot, *self._entries(slot)
+
+    def _entries(self, slot: int) -> tuple[list[int], list[int], list[int]]:
+        norm = self.norm[slot]
+        names = [slot << _OFFSET_BITS] if norm else []
+        offsets = [m.end() for m in re.finditer(" ", norm)][:_MAX_WORDS]
+        words = [slot << _OFFSET_BITS | offset for offset in offsets if offset <= _OFFSET_MASK]
+        idents = [slot << 1 | kind for kind, digits in enumerate(self.digits[slot]) if digits]
+        return names, words, idents
+
+    def _arrays(self) -> tuple[tuple[array, Callable], ...]:
+        return (self.names, self.name_key), (self.words, self.name_key), (self.idents, self.ident_key)
+
+    def load(self, records: Iterable[CompanyRecord]) -> None:
+        entries: tuple[list[int], list[int], list[int]] = ([], [], [])
+        for record in records:
+            _, *new = self._append(record)
+            for bucket, items in zip(entries, new):
+                bucket.extend(items)
+        for (target, key), items in zip(self._arrays(), entries):
+            target.extend(sorted(items, key=key))
+
+    def upsert(self, record: CompanyRecord) -> None:
+        slot = self.slots.get(record[0])
+        if slot is not None:
+            current = (self.ids[slot], self.rows[slot][0], self.norm[slot], *self.digits[slot])
+            wanted = (record[0], record[1], record[2] or normalize_company_name(record[1]),
+                      _digits(record[3]), _digits(record[4]))
+            if current == wanted:
+                self.rows[slot] = (record[1], record[5], _intern(record[6]), _intern(record[7]))
+                return
+            self.remove(record[0])
+        _, *new = self._append(record)
+        for (target, key), items in zip(self._arrays(), new):
+            for entry in items:
+                insort(target, entry, key=key)
+
+    def remove(self, company_id: int) -> None:
+        slot = self.slots.pop(company_id, None)
+        if slot is None:
+            return
+        for (target, key), items in zip(self._arrays(), self._entries(slot)):
+            for entry in items:
+                i = bisect_left(target, key(entry), key=key)
+                while target[i] != entry:
+                    i += 1
+                del target[i]
+        # The slot stays allocated until the next full build
+        self.norm[slot] = ""
+        self.digits[slot] = ("", "")
+        self.rows[slot] = None
+
+    @staticmethod
+    def _prefix_range(target: array, key: Callable, prefix: str) -> Iterator[int]:
+        i = bisect_left(target, prefix, key=key)
+        while i < len(target) and key(target[i]).startswith(prefix):
+            yield target[i]
+            i += 1
+
+    def _probes(self, q: str) -> Iterator[int]:
+        """Matching slots, best first: identifiers, whole names, later words."""
+        kind, value = classify_query(q)
+        if kind != "name":
+            # Tax numbers only match tax numbers, registry numbers registry numbers
+            wanted = 0 if kind == "adoszam" else 1
+            for entry in self._prefix_range(self.idents, self.ident_key, _digits(value)):
+                if entry & 1 == wanted:
+                    yield entry >> 1
+            return
+        if _IDENT_LIKE.fullmatch(q) and len(_digits(q)) >= 2:
+            for entry in self._prefix_range(self.idents, self.ident_key, _digits(q)):
+                yield entry >> 1
+        normalized = normalize_company_query(q) or fold_diacritics(q.lower())
+        if normalized:
+            for target in (self.names, self.words):
+                for entry in self._prefix_range(target, self.name_key, normalized):
+                    yield entry >> _OFFSET_BITS
+
+    def search(self, q: str, limit: int) -> list[dict]:
+        found: dict[int, None] = {}
+        for slot in self._probes(q.strip()):
+            found.setdefault(slot)
+            if len(found) >= limit:
+                break
+        result = []
+        for slot in found:
+            nev, szekhely, statusz, cegforma = self.rows[slot]
+            result.append({
+                "id": self.ids[slot], "nev": nev, "szekhely": szekhely,
+                "statusz": statusz, "cegforma": cegforma,
+            })
+        return result
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._data = _Snapshot()
+        self._pending: dict[int, CompanyRecord | None] | None = None
+        self._last_refresh = 0.0
+        self._built_at = 0.0
+        self._building = False
+        self.watermark: datetime | None = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._data.slots)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._built_at = 0.0
+            self._data = _Snapshot()
+            self._pending = None
+            self.watermark = None
+            self.ready = False
+
+    @property
+    def tracking(self) -> bool:
+        """True while writes have to be recorded (index ready or being built)."""
+        return self.ready or self._pending is not None
+
+    def build(self, db: Session) -> None:
+        """(Re)build from the database, then replay writes committed meanwhile."""
+        with self._lock:
+            self._pending = {}
+        started = time.monotonic()
+        data = _Snapshot()
+        watermark = None
+
+        def records() -> Iterator[CompanyRecord]:
+            nonlocal watermark
+            query = db.query(*_RECORD_COLUMNS, Company.updated_at).execution_options(yield_per=10_000)
+            for *record, updated_at in query:
+                if updated_at is not None and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+                yield tuple(record)
+
+        try:
+            data.load(records())
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for company_id, record in self._pending.items():
+                if record is None:
+                    data.remove(company_id)
+                else:
+                    data.upsert(record)
+            self._data = data
+            self._pending = None
+            self.watermark = watermark
+            self._last_refresh = self._built_at = time.monotonic()
+            self.ready = True
+        logger.info("Typeahead index built: %d companies in %.1fs", len(data.slots), time.monotonic() - started)
+
+    def build_in_background(self, session_factory: Callable[[], Session]) -> threading.Thread | None:
+        """Start a build thread unless one is running; the current arrays serve until it swaps them."""
+        with self._lock:
+            if self._building:
+                return None
+            self._building = True
+
+        def run():
+            db = session_factory()
+            try:
+                self.build(db)
+            except Exception:
+                logger.exception("Typeahead index build failed; /companies/public keeps the previous index")
+            finally:
+                db.close()
+                self._building = False
+
+        thread = threading.Thread(target=run, name="typeahead-index", daemon=True)
+        thread.start()
+        return thread
+
+    def apply(self, changes: dict[int, CompanyRecord | None]) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.update(changes)
+            if self.ready:
+                for company_id, record in changes.items():
+                    if record is None:
+                        self._data.remove(company_id)
+                    else:
+                        self._data.upsert(record)
+
+    def refresh_if_due(self, db: Session) -> threading.Thread | None:
+        """Pick up companies written by other processes since the last refresh.
+
+        Returns the background rebuild thread when one was started.
+        """
+        if not self.ready or time.monotonic() - self._last_refresh < settings.typeahead_refresh_seconds:
+            return None
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            self._last_refresh = time.monotonic()
+            bind = db.get_bind()
+            if self._last_refresh - self._built_at >= settings.typeahead_rebuild_seconds:
+                return self.build_in_background(lambda: Session(bind))
+            query = db.query(*_RECORD_COLUMNS, Company.updated_at)
+            if self.watermark is not None:
+                query = query.filter(Company.updated_at >= self.watermark - _REFRESH_OVERLAP)
+            rows = query.limit(_FULL_REBUILD_ROWS + 1).all()
+            if len(rows) > _FULL_REBUILD_ROWS:
+                return self.build_in_background(lambda: Session(bind))
+            with self._lock:
+                for *record, updated_at in rows:
+                    self._data.upsert(tuple(record))
+                    if updated_at is not None and (self.watermark is None or updated_at > self.watermark):
+                        self.watermark = updated_at
+            return None
+        finally:
+            self._refresh_lock.release()
+
+    def search(self, q: str, limit: int = 10) -> list[dict]:
+        with self._lock:
+            return self._data.search(q, limit)
+
+
+typeahead_index = PrefixIndex()
+
+
+def _record_of(company: Company) -> CompanyRecord:
+    return (
+        company.id, company.nev, company.nev_normalized, company.adoszam, company.cegjegyzekszam,
+        company.szekhely, company.statusz, company.cegforma,
+    )
+
+
+def _company_writes(session: Session) -> dict[int, CompanyRecord | None] | None:
+    if not typeahead_index.tracking:
+        return None
+    return {
+        obj.id: None if obj in session.deleted else _record_of(obj)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Company)
+    }
+
+
+def _apply_company_writes(_session: Session, batches: list[dict[int, CompanyRecord | None]]) -> None:
+    typeahead_index.apply({company_id: record for batch in batches for company_id, record in batch.items()})
+
+
+after_commit("typeahead_changes", _company_writes, _apply_company_writes)
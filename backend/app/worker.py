@@ -0,0 +1,23 @@
+"""Celery application for background jobs."""
+
+from celery import Celery
+
+from app.config import settings
+from app.services.export_jobs import purge_expired_exports, run_export_job
+
+celery_app = Celery(
+    "cegverzum",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend,
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+)
+
+
+@celery_app.task(name="exports.run")
+def run_export(job_id: int) -> None:
+    run_export_job(job_id)
+    purge_expired_exports()
@@ -0,0 +1,98 @@
+"""Synthetic data + timing helpers shared by the benchmarks in this directory."""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from app.database import Base, create_missing_indexes
+from app.models.company import Company
+from app.services.normalize import normalize_company_name
+
+_WORDS = [
+    "Budapesti", "Alföldi", "Dunántúli", "Pannon", "Tisza", "Mátra", "Balaton", "Hungária",
+    "Informatikai", "Építőipari", "Kereskedelmi", "Szolgáltató", "Logisztikai", "Agrár",
+    "Mérnöki", "Energetikai", "Tanácsadó", "Ingatlan", "Vendéglátó", "Gépészeti",
+]
+_FORMS = ["Kft.", "Zrt.", "Bt.", "Nyrt.", "Kkt."]
+_STATUSES = ["aktív"] * 8 + ["megszűnt", "felszámolás alatt"]
+
+
+def parse_args(description: str, default_sizes: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--url", default=None, help="Scratch database URL, its tables are dropped afterwards (default: temporary SQLite file)")
+    parser.add_argument("--sizes", default=default_sizes, help="Comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    return args
+
+
+def scratch_engine(url: str | None) -> Engine:
+    if url is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="cegverzum_bench_")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    import app.models  # noqa: F401 — register every table on Base.metadata
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    return engine
+
+
+def drop_scratch(engine: Engine) -> None:
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    path = engine.url.database
+    if engine.dialect.name == "sqlite" and path and os.path.basename(path).startswith("cegverzum_bench_"):
+        os.remove(path)
+
+
+def company_rows(n: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        name = " ".join(rng.sample(_WORDS, 2)) + f" {i % 997} " + rng.choice(_FORMS)
+        rows.append({
+            "id": i + 1,
+            "nev": name,
+            "nev_normalized": normalize_company_name(name),
+            "adoszam": f"{10000000 + i:08d}-{rng.randint(1, 5)}-{rng.randint(1, 44):02d}",
+            "cegjegyzekszam": f"{1 + i // 1_000_000:02d}-09-{i % 1_000_000:06d}",
+            "szekhely": f"{rng.randint(1000, 9999)} Település {rng.randint(1, 300)}",
+            "teaor_kod": f"{rng.randint(1, 99):02d}{rng.randint(0, 99):02d}",
+            "statusz": rng.choice(_STATUSES),
+            "cegforma": rng.choice(_FORMS),
+            "letszam_kategoria": rng.choice(["1-4", "5-9", "10-49", "50-249", None]),
+            "felszamolas": rng.random() < 0.03,
+            "alapitas_datuma": None if rng.random() < 0.05 else date(1990, 1, 1) + timedelta(days=rng.randint(0, 12_000)),
+        })
+    return rows
+
+
+def load_companies(engine: Engine, n: int, batch: int = 10_000) -> None:
+    rows = company_rows(n)
+    with engine.begin() as conn:
+        for start in range(0, n, batch):
+            conn.execute(insert(Company), rows[start:start + batch])
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE companies")
+
+
+def timed(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return (median, max) wall time of ``fn`` in milliseconds after one warm-up call."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
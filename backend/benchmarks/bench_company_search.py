@@ -0,0 +1,42 @@
+"""Company search latency at increasing table sizes.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_company_search --sizes 10000,100000,1000000
+    python -m benchmarks.bench_company_search --url postgresql://.../cegverzum_bench
+"""
+
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.services.company_search import apply_filters
+from benchmarks._synthetic import drop_scratch, load_companies, parse_args, scratch_engine, timed
+
+QUERIES = {
+    "rare name": "Hungária Mérnöki 13",
+    "common name": "Budapesti",
+    "tax number": "10004242",
+    "registry number": "01-09-004242",
+}
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "10000,100000,1000000")
+    print(f"{'rows':>10}  {'query':<16} {'list ms':>9} {'count ms':>9}")
+    for size in args.sizes:
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        with Session(engine) as db:
+            for label, q in QUERIES.items():
+                params = {"q": q}
+                list_ms, _ = timed(
+                    lambda: apply_filters(db.query(Company), params).order_by(Company.nev).limit(20).all(),
+                    args.repeat,
+                )
+                count_ms, _ = timed(lambda: apply_filters(db.query(Company), params).count(), args.repeat)
+                print(f"{size:>10}  {label:<16} {list_ms:>9.2f} {count_ms:>9.2f}")
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
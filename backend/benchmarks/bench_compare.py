@@ -0,0 +1,100 @@
+"""Company comparison: per-company queries vs. two set-based queries.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_compare --sizes 10000,100000
+    python -m benchmarks.bench_compare --url postgresql://.../cegverzum_bench
+"""
+
+import random
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.financial import FinancialReport
+from app.schemas.financial_analysis import CompanyCompareItem
+from app.services.financial_metrics import build_yearly_metrics, load_comparison, safe_avg
+from benchmarks._synthetic import drop_scratch, load_companies, parse_args, scratch_engine, timed
+from benchmarks.bench_network import _count_statements
+
+
+def _ratio(rng: random.Random, low: float, high: float) -> float | None:
+    return None if rng.random() < 0.1 else rng.uniform(low, high)
+
+
+def load_reports(engine, companies: int, seed: int = 5) -> None:
+    rng = random.Random(seed)
+    rows = []
+    for company_id in range(1, companies + 1):
+        first = rng.randint(2012, 2018)
+        for ev in range(first, first + rng.randint(3, 8)):
+            rows.append({
+                "company_id": company_id,
+                "ev": ev,
+                "netto_arbevetel": rng.uniform(1e4, 1e7),
+                "adozott_eredmeny": rng.uniform(-1e5, 1e6),
+                "arbevetel_aranyos_eredmeny": _ratio(rng, -0.2, 0.3),
+                "roe": _ratio(rng, -0.5, 0.8),
+                "eladosodottsag_foka": _ratio(rng, 0, 1),
+                "likviditasi_gyorsrata": _ratio(rng, 0.2, 4),
+            })
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 10_000):
+            conn.execute(insert(FinancialReport), rows[start:start + 10_000])
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE financial_reports")
+
+
+def per_company(engine, ids: list[int]) -> list[CompanyCompareItem]:
+    with Session(engine) as db:
+        items = []
+        for cid in ids:
+            company = db.get(Company, cid)
+            reports = (
+                db.query(FinancialReport)
+                .filter(FinancialReport.company_id == cid)
+                .order_by(FinancialReport.ev)
+                .all()
+            )
+            items.append(
+                CompanyCompareItem(
+                    company_id=company.id,
+                    company_name=company.nev,
+                    yearly_metrics=build_yearly_metrics(reports),
+                    avg_profit_margin=safe_avg([r.arbevetel_aranyos_eredmeny for r in reports]),
+                    avg_roe=safe_avg([r.roe for r in reports]),
+                    avg_debt_ratio=safe_avg([r.eladosodottsag_foka for r in reports]),
+                    avg_liquidity=safe_avg([r.likviditasi_gyorsrata for r in reports]),
+                )
+            )
+        return items
+
+
+def set_based(engine, ids: list[int]) -> list[CompanyCompareItem]:
+    with Session(engine) as db:
+        items = load_comparison(db, ids)
+        return [items[cid] for cid in ids]
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "10000,100000")
+    print(f"{'companies':>10}  {'ids':>4}  {'variant':<12} {'stmts':>6} {'median':>10} {'max':>10}")
+    for size in args.sizes:
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        load_reports(engine, size)
+        rng = random.Random(size)
+        for count in (5, 50):
+            ids = rng.sample(range(1, size + 1), count)
+            assert per_company(engine, ids) == set_based(engine, ids)
+            for name, variant in (("per company", per_company), ("set-based", set_based)):
+                fn = lambda variant=variant: variant(engine, ids)
+                statements = _count_statements(engine, fn)
+                median, worst = timed(fn, args.repeat)
+                print(f"{size:>10}  {count:>4}  {name:<12} {statements:>6} {median:>8.1f}ms {worst:>8.1f}ms")
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Marketing export: one big IN + in-memory CSV vs chunked, streamed CSV.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_marketing_export --ids 1000,10000,50000
+    python -m benchmarks.bench_marketing_export --url postgresql://.../cegverzum_bench
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+import tracemalloc
+
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.services.export import MARKETING_EXPORT_COLUMNS, iter_csv, stream_rows_by_ids
+from benchmarks._synthetic import drop_scratch, load_companies, scratch_engine
+
+
+def _in_memory(db: Session, ids: list[int]) -> list[str]:
+    """The previous implementation: one IN over every id, whole file in a StringIO."""
+    rows = db.query(Company).filter(Company.id.in_(ids)).all()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([col[0] for col in MARKETING_EXPORT_COLUMNS])
+    for row in rows:
+        writer.writerow([getattr(row, col[1], "") or "" for col in MARKETING_EXPORT_COLUMNS])
+    return [output.getvalue()]
+
+
+def _streamed(db: Session, ids: list[int]):
+    return iter_csv(stream_rows_by_ids(db, ids, MARKETING_EXPORT_COLUMNS), MARKETING_EXPORT_COLUMNS)
+
+
+def _measure(db: Session, produce, ids: list[int]) -> tuple[float, float, float]:
+    db.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    for _chunk in produce(db, ids):
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first * 1000, total * 1000, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--ids", default="1000,10000,50000")
+    args = parser.parse_args()
+
+    engine = scratch_engine(args.url)
+    load_companies(engine, args.rows)
+    rng = random.Random(7)
+    print(f"{'ids':>7}  {'mode':<10} {'first ms':>9} {'total ms':>9} {'peak MB':>8}")
+    with Session(engine) as db:
+        for n in (int(x) for x in args.ids.split(",")):
+            ids = rng.sample(range(1, args.rows + 1), n)
+            for label, produce in (("in-memory", _in_memory), ("streamed", _streamed)):
+                first, total, peak = _measure(db, produce, ids)
+                print(f"{n:>7}  {label:<10} {first:>9.1f} {total:>9.1f} {peak:>8.1f}")
+    drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Network graph build: per-officer queries vs. one query per BFS level.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_network --sizes 10000,100000
+    python -m benchmarks.bench_network --url postgresql://.../cegverzum_bench
+"""
+
+import random
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.financial import Officer, Person
+from app.services.network import build_network
+from benchmarks._synthetic import drop_scratch, load_companies, parse_args, scratch_engine, timed
+
+_REUSE = 0.3
+
+
+def load_officers(engine, companies: int, seed: int = 11) -> tuple[int, int]:
+    """Insert persons and officers; return a company of the busiest person and
+    one of a person with 2-5 positions."""
+    rng = random.Random(seed)
+    positions: list[int] = []  # person id per position, for preferential picks
+    officers = []
+    persons = 0
+    for company_id in range(1, companies + 1):
+        for _ in range(rng.randint(1, 4)):
+            if positions and rng.random() < _REUSE:
+                person_id = rng.choice(positions)
+            else:
+                persons += 1
+                person_id = persons
+            positions.append(person_id)
+            officers.append({"company_id": company_id, "nev": f"Személy {person_id}", "person_id": person_id})
+    with engine.begin() as conn:
+        conn.execute(insert(Person), [{"id": i, "identity_key": f"szemely {i}|", "nev": f"Személy {i}"} for i in range(1, persons + 1)])
+        for start in range(0, len(officers), 10_000):
+            conn.execute(insert(Officer), officers[start:start + 10_000])
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE officers")
+    degree: dict[int, int] = {}
+    for person_id in positions:
+        degree[person_id] = degree.get(person_id, 0) + 1
+    busiest = max(degree, key=degree.get)
+    typical = rng.choice([person_id for person_id, count in degree.items() if 2 <= count <= 5])
+    by_person = {officer["person_id"]: officer["company_id"] for officer in officers}
+    return by_person[busiest], by_person[typical]
+
+
+def per_officer_network(db: Session, company_id: int) -> int:
+    """The former traversal: queries per officer and per matched company, 2 levels."""
+    nodes = {company_id}
+    for officer in db.query(Officer).filter(Officer.company_id == company_id).all():
+        for other in db.query(Officer).filter(Officer.person_id == officer.person_id, Officer.company_id != company_id):
+            other_company = db.get(Company, other.company_id)
+            nodes.add(other_company.id)
+            for l2 in db.query(Officer).filter(Officer.company_id == other_company.id).all():
+                for l2_other in db.query(Officer).filter(
+                    Officer.person_id == l2.person_id,
+                    Officer.company_id != other_company.id,
+                    Officer.company_id != company_id,
+                ):
+                    nodes.add(db.get(Company, l2_other.company_id).id)
+    return len(nodes)
+
+
+def _count_statements(engine, fn) -> int:
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return len(statements)
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "10000,100000")
+    print(f"{'companies':>10}  {'center':>7}  {'variant':<22} {'nodes':>6} {'stmts':>6} {'median':>10} {'max':>10}")
+    for i, size in enumerate(args.sizes):
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        hub, typical = load_officers(engine, size)
+        centers = [("hub", hub), ("typical", typical)]
+        with Session(engine) as db:
+            for label, center in centers:
+                variants = [
+                    (f"per level, depth {depth}", lambda depth=depth: len(build_network(db, center, depth)["nodes"]))
+                    for depth in (2, 3)
+                ]
+                if i == 0 or label == "typical":
+                    variants.insert(0, ("per officer, depth 2", lambda: per_officer_network(db, center)))
+                for name, fn in variants:
+                    nodes = fn()
+                    statements = _count_statements(engine, fn)
+                    median, worst = timed(fn, args.repeat)
+                    print(f"{size:>10}  {label:>7}  {name:<22} {nodes:>6} {statements:>6} {median:>8.1f}ms {worst:>8.1f}ms")
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
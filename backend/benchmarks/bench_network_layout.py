@@ -0,0 +1,39 @@
+"""Server-side network layout: all-pairs vs. grid (Barnes–Hut) repulsion.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_network_layout --sizes 300,1000,2000
+"""
+
+import numpy as np
+
+from app.services import network_layout
+from app.services.network_layout import _exact_repulsion, _grid_repulsion, force_layout
+from benchmarks._synthetic import parse_args, timed
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "300,1000,2000")
+    print(f"{'nodes':>6} {'links':>6} {'exact':>10} {'grid':>10} {'error':>7}")
+    exact_limit = network_layout._EXACT_NODES
+    for size in args.sizes:
+        rng = np.random.default_rng(size)
+        links = int(2.5 * size)
+        sources, targets = rng.integers(0, size, links), rng.integers(0, size, links)
+        levels = np.minimum(rng.geometric(0.5, size), 3)
+        levels[0] = 0
+        try:
+            network_layout._EXACT_NODES = size
+            exact_ms, _ = timed(lambda: force_layout(levels, sources, targets), args.repeat)
+            network_layout._EXACT_NODES = 0
+            grid_ms, _ = timed(lambda: force_layout(levels, sources, targets), args.repeat)
+        finally:
+            network_layout._EXACT_NODES = exact_limit
+        x, y = force_layout(levels, sources, targets).T
+        exact, grid = np.stack(_exact_repulsion(x, y)), np.stack(_grid_repulsion(x, y))
+        error = np.median(np.hypot(*(grid - exact)) / np.hypot(*exact))
+        print(f"{size:>6} {links:>6} {exact_ms:>8.0f}ms {grid_ms:>8.0f}ms {error:>7.2%}")
+
+
+if __name__ == "__main__":
+    main()
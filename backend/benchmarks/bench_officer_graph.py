@@ -0,0 +1,53 @@
+"""In-memory officer graph: build time, memory per million edges, traversal latency.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_officer_graph --sizes 100000,1000000
+    python -m benchmarks.bench_officer_graph --url postgresql://.../cegverzum_bench
+"""
+
+import time
+
+from sqlalchemy.orm import Session
+
+from app.services.network import MAX_EDGES, MAX_NODES, build_network, sql_expand
+from app.services.officer_graph import OfficerGraph
+from benchmarks._synthetic import drop_scratch, load_companies, parse_args, scratch_engine, timed
+from benchmarks.bench_network import load_officers
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "100000,1000000")
+    print(
+        f"{'companies':>10} {'edges':>9} {'build s':>8} {'MB':>6} {'MB/M edges':>11}  "
+        f"{'center':>7} {'depth':>5} {'nodes':>6} {'graph':>9} {'sql':>9}"
+    )
+    for size in args.sizes:
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        hub, typical = load_officers(engine, size)
+        with Session(engine) as db:
+            graph = OfficerGraph()
+            start = time.perf_counter()
+            graph.build(db)
+            build_s = time.perf_counter() - start
+            stats = graph.stats()
+            prefix = (
+                f"{size:>10} {stats['edges']:>9} {build_s:>8.1f} {stats['bytes'] / 2**20:>6.1f}"
+                f" {stats['bytes_per_million_edges'] / 2**20:>11.1f}"
+            )
+            for label, center in (("hub", hub), ("typical", typical)):
+                for depth in (2, 3):
+                    def run(expand):
+                        return build_network(db, center, depth, MAX_NODES, MAX_EDGES, expand)
+
+                    nodes = len(run(graph.expand)["nodes"])
+                    graph_ms, _ = timed(lambda: run(graph.expand), args.repeat)
+                    sql_ms, _ = timed(lambda: run(sql_expand), args.repeat)
+                    print(f"{prefix}  {label:>7} {depth:>5} {nodes:>6} {graph_ms:>7.1f}ms {sql_ms:>7.1f}ms")
+                    prefix = " " * len(prefix)
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Offset vs keyset (cursor) pagination latency for deep pages.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_pagination --sizes 200000
+    python -m benchmarks.bench_pagination --url postgresql://.../cegverzum_bench
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.routers.companies import _cursor_for, _fetch_page
+from app.services.company_search import ORDER_BY_MAP
+from benchmarks._synthetic import drop_scratch, load_companies, parse_args, scratch_engine, timed
+
+PAGE_SIZE = 20
+PAGES = (1, 5000)
+
+
+def cursor_plan(engine, fn) -> str:
+    """The access path of the last statement ``fn`` runs: index scan or sort."""
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    sqlite = engine.dialect.name == "sqlite"
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters).all()
+    if sqlite:
+        return "; ".join(row[-1] for row in rows)
+    # Limit on top; the node under it scans an index in order or sorts
+    return rows[1][0].split("(cost")[0].strip(" ->")
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "200000")
+    print(f"{'rows':>8}  {'order_by':<14} {'page':>5} {'offset ms':>10} {'cursor ms':>10}  cursor plan")
+    for size in args.sizes:
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        with Session(engine) as db:
+            for order_by in [None, *ORDER_BY_MAP]:
+                for page in PAGES:
+                    skip = (page - 1) * PAGE_SIZE
+                    if skip >= size:
+                        continue
+                    cursor = None
+                    if skip:
+                        # Cursor pointing at the last row of the previous page
+                        prev = _fetch_page(db.query(Company), order_by, skip - 1, 1, None)[0]
+                        cursor = _cursor_for(order_by, prev)
+                    offset_ms, _ = timed(lambda: _fetch_page(db.query(Company), order_by, skip, PAGE_SIZE, None), args.repeat)
+                    fetch = lambda: _fetch_page(db.query(Company), order_by, 0, PAGE_SIZE, cursor)
+                    cursor_ms, _ = timed(fetch, args.repeat)
+                    plan = cursor_plan(engine, fetch)
+                    print(f"{size:>8}  {order_by or 'id':<14} {page:>5} {offset_ms:>10.2f} {cursor_ms:>10.2f}  {plan}")
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
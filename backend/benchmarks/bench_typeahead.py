@@ -0,0 +1,75 @@
+"""Per-keystroke typeahead latency: in-memory prefix index vs. SQL.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_typeahead --sizes 10000,100000,1000000
+    python -m benchmarks.bench_typeahead --url postgresql://.../cegverzum_bench
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.services.company_search import apply_filters
+from app.services.typeahead import PrefixIndex
+from benchmarks._synthetic import company_rows, drop_scratch, load_companies, parse_args, scratch_engine
+
+
+def _keystrokes(rows: list[dict], count: int) -> list[str]:
+    rng = random.Random(7)
+    queries = []
+    for row in rng.sample(rows, min(count, len(rows))):
+        for value in (row["nev"][:16], row["adoszam"][:8], row["cegjegyzekszam"]):
+            queries += [value[:n] for n in range(2, len(value) + 1)]
+    return queries
+
+
+def _percentiles(fn, queries: list[str]) -> tuple[float, float]:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[98]
+
+
+def main() -> None:
+    args = parse_args(__doc__.splitlines()[0], "10000,100000,500000")
+    args.repeat = max(args.repeat, 50)
+    print(f"{'rows':>10}  {'build s':>8} {'index MB':>9}  {'index p50':>10} {'index p99':>10}  {'sql p50':>9} {'sql p99':>9}")
+    for size in args.sizes:
+        engine = scratch_engine(args.url)
+        load_companies(engine, size)
+        queries = _keystrokes(company_rows(size), args.repeat)
+        with Session(engine) as db:
+            index = PrefixIndex()
+            start = time.perf_counter()
+            index.build(db)
+            build_s = time.perf_counter() - start
+            # Second build under tracemalloc: memory still held once the build returns
+            tracemalloc.start()
+            traced = PrefixIndex()
+            traced.build(db)
+            held_mb = tracemalloc.get_traced_memory()[0] / 2**20
+            tracemalloc.stop()
+            del traced
+
+            index_p50, index_p99 = _percentiles(index.search, queries)
+            sql_p50, sql_p99 = _percentiles(
+                lambda q: apply_filters(db.query(Company), {"q": q}).order_by(Company.nev).limit(10).all(),
+                queries[::5],
+            )
+        print(
+            f"{size:>10}  {build_s:>8.1f} {held_mb:>9.0f}  {index_p50:>8.3f}ms {index_p99:>8.3f}ms"
+            f"  {sql_p50:>7.2f}ms {sql_p99:>7.2f}ms"
+        )
+        drop_scratch(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""One-off data maintenance tasks.
+
+Usage (from ``backend/``)::
+
+    python maintenance.py migrate-schema
+    python maintenance.py backfill-names
+    python maintenance.py backfill-persons
+    python maintenance.py compute-clusters
+    python maintenance.py refresh-benchmarks
+    python maintenance.py purge-exports
+"""
+import argparse
+
+import app.models  # noqa: F401 — ensure all models are loaded
+from app.database import Base, SessionLocal, add_missing_columns, create_missing_indexes, engine
+from app.services.company_clusters import compute_clusters
+from app.services.company_search import backfill_normalized_names
+from app.services.export_jobs import purge_expired_exports
+from app.services.industry_benchmarks import refresh_industry_benchmarks
+from app.services.officer_identity import backfill_person_ids
+
+
+def migrate_schema(_db) -> None:
+    # Tables, columns and indexes are brought up to date in main() before every command
+    print("schema up to date")
+
+
+def backfill_names(db) -> None:
+    count = backfill_normalized_names(db)
+    print(f"nev_normalized filled for {count} companies")
+
+
+def backfill_persons(db) -> None:
+    count = backfill_person_ids(db)
+    print(f"person_id filled for {count} officers")
+
+
+def compute_company_clusters(db) -> None:
+    count = compute_clusters(db)
+    print(f"cluster stored for {count} companies")
+
+
+def refresh_benchmarks(db) -> None:
+    count = refresh_industry_benchmarks(db)
+    print(f"industry benchmarks stored for {count} TEÁOR code / year pairs")
+
+
+def purge_exports(db) -> None:
+    count = purge_expired_exports(lambda: db)
+    print(f"{count} expired export jobs deleted")
+
+
+COMMANDS = {
+    "migrate-schema": migrate_schema,
+    "backfill-names": backfill_names,
+    "backfill-persons": backfill_persons,
+    "compute-clusters": compute_company_clusters,
+    "refresh-benchmarks": refresh_benchmarks,
+    "purge-exports": purge_exports,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    db = SessionLocal()
+    try:
+        COMMANDS[args.command](db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
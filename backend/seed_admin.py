@@ -5,6 +5,7 @@ from app.database import engine, SessionLocal, Base
 from app.models.user import User
 from app.models.company import Company
 from app.models.financial import FinancialReport, Officer
+import app.services.officer_identity  # noqa: F401 — links officers to persons on flush
 from app.models.module import Module, UserModule
 from app.models.notification import Notification
 from app.models.watchlist import WatchlistItem  # noqa: F401 — ensure table is created
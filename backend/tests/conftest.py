@@ -4,22 +4,39 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.auth import hash_password, create_access_token
+from app.config import settings
 from app.database import Base, get_db
 from app.main import app
 from app.models.company import Company
 from app.models.user import User
+from app.services.company_count import invalidate_counts
+from app.services.network_cache import network_cache
+from app.services.network_layout import network_layout_cache
+from app.services.officer_graph import officer_graph
+from app.services.public_cache import invalidate_public_caches
+from app.services.typeahead import typeahead_index
 
 SQLITE_URL = "sqlite:///./test.db"
 
 engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
 TestSession = sessionmaker(bind=engine)
 
+# Tests that exercise the typeahead index or the officer graph build them explicitly
+settings.typeahead_index_enabled = False
+settings.officer_graph_enabled = False
+
 
 @pytest.fixture(autouse=True)
 def setup_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    invalidate_counts()
+    invalidate_public_caches()
+    typeahead_index.reset()
+    officer_graph.reset()
+    network_cache.clear()
+    network_layout_cache.clear()
 
 
 @pytest.fixture
@@ -40,3 +40,25 @@ def test_non_admin_cannot_access(client, auth_headers):
 def test_unauthenticated_cannot_access(client):
     resp = client.get("/admin/partners")
     assert resp.status_code == 401
+
+
+def test_cache_stats(client, admin_headers, auth_headers, sample_company):
+    for _ in range(2):
+        client.get("/companies/public", params={"q": "Teszt"})
+
+    resp = client.get("/admin/cache-stats", headers=admin_headers)
+    assert resp.status_code == 200
+    stats = resp.json()
+    assert {"public_search", "nav_lookup", "company_count", "network", "network_layout"} <= stats.keys()
+    assert "invalidations" in stats["network"]
+    assert stats["public_search"]["hits"] >= 1
+    assert stats["public_search"]["size"] == 1
+
+    assert client.get("/admin/cache-stats", headers=auth_headers).status_code == 403
+
+
+def test_officer_graph_stats(client, admin_headers, auth_headers):
+    resp = client.get("/admin/officer-graph-stats", headers=admin_headers)
+    assert resp.status_code == 200
+    assert resp.json()["ready"] is False
+    assert client.get("/admin/officer-graph-stats", headers=auth_headers).status_code == 403
@@ -1,3 +1,6 @@
+from datetime import date
+
+
 def test_root(client):
     resp = client.get("/")
     assert resp.status_code == 200
@@ -32,6 +35,62 @@ def test_count_companies(client, auth_headers, sample_company):
     resp = client.get("/companies/count", headers=auth_headers)
     assert resp.status_code == 200
     assert resp.json()["count"] == 1
+    assert resp.json()["is_estimate"] is False
+
+
+def test_count_is_cached_until_companies_change(client, auth_headers, sample_company, db):
+    from sqlalchemy import insert
+
+    from app.models.company import Company
+
+    assert client.get("/companies/count", params={"q": "Teszt"}, headers=auth_headers).json()["count"] == 1
+
+    # A write that bypasses the ORM is not seen until invalidation...
+    db.execute(insert(Company).values(nev="Teszt Másik Kft.", nev_normalized="teszt masik"))
+    db.commit()
+    assert client.get("/companies/count", params={"q": " TESZT "}, headers=auth_headers).json()["count"] == 1
+    # ...unless an exact count is requested
+    resp = client.get("/companies/count", params={"q": "Teszt", "exact": True}, headers=auth_headers)
+    assert resp.json() == {"count": 2, "is_estimate": False}
+
+    # ORM writes invalidate the cache
+    db.add(Company(nev="Teszt Harmadik Kft."))
+    db.commit()
+    assert client.get("/companies/count", params={"q": "Teszt"}, headers=auth_headers).json()["count"] == 3
+
+
+def test_count_cache_follows_commits_of_other_sessions(client, auth_headers, sample_company):
+    from app.models.company import Company
+    from app.services.cache import cache_stats
+    from app.services.company_count import count_filtered, invalidate_counts
+    from tests.conftest import TestSession
+
+    assert client.get("/companies/count", headers=auth_headers).json()["count"] == 1
+
+    with TestSession() as other:
+        other.add(Company(nev="Visszavont Kft."))
+        other.flush()
+        other.rollback()
+    # A rolled back flush leaves the cached count alone
+    assert cache_stats()["company_count"]["size"] == 1
+
+    with TestSession() as other:
+        other.add(Company(nev="Másik Kft."))
+        other.commit()
+    assert client.get("/companies/count", headers=auth_headers).json()["count"] == 2
+
+    class _CountDuringCommit:
+        def order_by(self, *_):
+            return self
+
+        def count(self):
+            invalidate_counts()  # another session commits while the count runs
+            return 2
+
+    with TestSession() as other:
+        assert count_filtered(other, _CountDuringCommit(), {}, exact=True) == (2, False)
+    # The count may predate that commit, so it is not cached
+    assert cache_stats()["company_count"]["size"] == 0
 
 
 def test_get_company(client, auth_headers, sample_company):
@@ -44,3 +103,1017 @@ def test_get_company(client, auth_headers, sample_company):
 def test_get_company_not_found(client, auth_headers):
     resp = client.get("/companies/9999", headers=auth_headers)
     assert resp.status_code == 404
+
+
+def test_public_search_matches_identifiers(client, sample_company):
+    resp = client.get("/companies/public", params={"q": "01-09-1234"})
+    assert resp.status_code == 200
+    assert [c["nev"] for c in resp.json()] == ["Teszt Kft."]
+
+    resp = client.get("/companies/public", params={"q": "teszt"})
+    assert len(resp.json()) == 1
+
+
+def test_public_search_is_cached_until_companies_change(client, sample_company, db):
+    from app.services.public_cache import public_search_cache
+
+    hits = public_search_cache.hits
+    assert len(client.get("/companies/public", params={"q": "Teszt Kft."}).json()) == 1
+    assert len(client.get("/companies/public", params={"q": "teszt"}).json()) == 1
+    assert public_search_cache.hits == hits + 1
+
+    sample_company.nev = "Átnevezett Kft."
+    db.commit()
+    assert client.get("/companies/public", params={"q": "teszt"}).json() == []
+
+
+def test_public_search_keys_identifiers_as_typed(client, sample_company):
+    from app.services.public_cache import public_search_key
+
+    assert public_search_key("01 09") != public_search_key("01-09")
+    assert public_search_key(" 01-09 ") == public_search_key("01-09")
+    assert public_search_key("Teszt Kft.") == public_search_key("teszt")
+
+    assert [c["nev"] for c in client.get("/companies/public", params={"q": "01-09"}).json()] == ["Teszt Kft."]
+    assert client.get("/companies/public", params={"q": "01 09"}).json() == []
+
+
+def test_public_search_cache_follows_commits_of_other_sessions(client, sample_company):
+    from app.models.company import Company
+    from app.services.public_cache import public_search_cache
+    from tests.conftest import TestSession
+
+    assert len(client.get("/companies/public", params={"q": "teszt"}).json()) == 1
+
+    with TestSession() as other:
+        other.add(Company(nev="Teszt Bt."))
+        other.flush()
+        other.rollback()
+    # A rolled back flush leaves the cached results alone
+    assert len(public_search_cache) == 1
+
+    with TestSession() as other:
+        other.add(Company(nev="Teszt Bt."))
+        other.commit()
+    assert len(client.get("/companies/public", params={"q": "teszt"}).json()) == 2
+
+
+def test_public_search_uses_prefix_index(client, sample_company, db):
+    from app.models.company import Company
+    from app.services.typeahead import typeahead_index
+
+    db.add_all([
+        Company(nev="Budapesti Informatikai Kft.", adoszam="23456789-2-42", cegjegyzekszam="01-09-223344"),
+        Company(nev="Építő Budapest Zrt.", statusz="megszűnt"),
+    ])
+    db.commit()
+    typeahead_index.build(db)
+    assert typeahead_index.ready and len(typeahead_index) == 3
+
+    def names(q):
+        resp = client.get("/companies/public", params={"q": q})
+        assert resp.status_code == 200
+        return [c["nev"] for c in resp.json()]
+
+    # whole-name matches rank before later-word matches
+    assert names("budapest") == ["Budapesti Informatikai Kft.", "Építő Budapest Zrt."]
+    assert names("Informatikai") == ["Budapesti Informatikai Kft."]
+    assert names("epito bud") == ["Építő Budapest Zrt."]
+    assert names("teszt kft") == ["Teszt Kft."]
+    assert names("23456789") == ["Budapesti Informatikai Kft."]
+    assert names("01-09-2233") == ["Budapesti Informatikai Kft."]
+    assert names("01-09-123456") == ["Teszt Kft."]
+    assert names("formatikai") == []
+
+    resp = client.get("/companies/public", params={"q": "Építő"})
+    assert resp.json()[0]["statusz"] == "megszűnt"
+
+
+def test_prefix_index_follows_company_writes(client, sample_company, db, monkeypatch):
+    from sqlalchemy import insert
+
+    from app.config import settings
+    from app.models.company import Company
+    from app.services.typeahead import typeahead_index
+
+    typeahead_index.build(db)
+    added = Company(nev="Új Cég Kft.", adoszam="34567890-2-13")
+    db.add(added)
+    db.commit()
+    assert [c["nev"] for c in typeahead_index.search("uj ceg")] == ["Új Cég Kft."]
+
+    sample_company.nev = "Átnevezett Kft."
+    db.commit()
+    assert typeahead_index.search("teszt") == []
+    assert [c["id"] for c in typeahead_index.search("atnevezett")] == [sample_company.id]
+    assert [c["id"] for c in typeahead_index.search("12345678")] == [sample_company.id]
+
+    db.delete(added)
+    db.rollback()
+    db.delete(added)
+    db.commit()
+    assert typeahead_index.search("uj ceg") == []
+
+    # Written by another process: only visible after the periodic refresh
+    db.execute(insert(Company), [{"nev": "Kívülről Bt.", "nev_normalized": "kivulrol", "statusz": "aktív"}])
+    db.commit()
+    assert typeahead_index.search("kivul") == []
+    monkeypatch.setattr(settings, "typeahead_refresh_seconds", 0)
+    typeahead_index.refresh_if_due(db)
+    assert [c["nev"] for c in typeahead_index.search("kivul")] == ["Kívülről Bt."]
+
+
+def test_prefix_index_while_typing_a_legal_form(client, sample_company, db):
+    from app.services.typeahead import typeahead_index
+
+    typeahead_index.build(db)
+    for q in ("Teszt", "Teszt ", "Teszt K", "Teszt Kf", "Teszt Kft", "Teszt Kft."):
+        assert [c["id"] for c in typeahead_index.search(q, limit=10)] == [sample_company.id], q
+        assert [c["id"] for c in client.get("/companies/public", params={"q": q}).json()] == [sample_company.id], q
+
+
+def test_prefix_index_rebuilds_in_background(sample_company, db, monkeypatch):
+    from sqlalchemy import delete, insert
+
+    from app.config import settings
+    from app.models.company import Company
+    from app.services import typeahead
+    from app.services.typeahead import typeahead_index
+
+    typeahead_index.build(db)
+    monkeypatch.setattr(settings, "typeahead_refresh_seconds", 0)
+    monkeypatch.setattr(typeahead, "_FULL_REBUILD_ROWS", 1)
+    db.execute(insert(Company), [
+        {"nev": f"Tömeges {i} Kft.", "nev_normalized": f"tomeges {i}", "statusz": "aktív"} for i in range(3)
+    ])
+    db.commit()
+
+    # Too many rows to patch: the request only starts the rebuild, the old arrays keep serving
+    thread = typeahead_index.refresh_if_due(db)
+    assert thread is not None
+    thread.join()
+    assert len(typeahead_index.search("tomeges")) == 3
+
+    # Deleted by another process: gone after the periodic full rebuild
+    monkeypatch.setattr(typeahead, "_FULL_REBUILD_ROWS", 5000)
+    db.execute(delete(Company).where(Company.id == sample_company.id))
+    db.commit()
+    typeahead_index.refresh_if_due(db)
+    assert [c["id"] for c in typeahead_index.search("teszt")] == [sample_company.id]
+    monkeypatch.setattr(settings, "typeahead_rebuild_seconds", 0)
+    typeahead_index.refresh_if_due(db).join()
+    assert typeahead_index.search("teszt") == []
+
+
+def test_normalize_company_name():
+    from app.services.normalize import normalize_company_name, normalize_company_query
+
+    assert normalize_company_name("Budapesti Informatikai Kft.") == "budapesti informatikai"
+    assert normalize_company_name("ÉPÍTŐ-IPARI Zrt. v.a.") == "epito ipari"
+    assert normalize_company_name("Minta Korlátolt Felelősségű Társaság") == "minta"
+    assert normalize_company_name("Kft.") == "kft"
+    assert normalize_company_query("Minta Korlátolt Fel") == "minta"
+    assert normalize_company_query("Teszt Kft. v") == "teszt"
+    assert normalize_company_query("Kf") == "kf"
+
+
+def test_search_is_accent_and_legal_form_insensitive(client, auth_headers, db):
+    from app.models.company import Company
+
+    db.add(Company(nev="Budapesti Informatikai Kft.", adoszam="33333333-2-41"))
+    db.add(Company(nev="Debreceni Építőipari Zrt.", adoszam="44444444-2-09"))
+    db.commit()
+
+    for q in ("budapesti informatikai", "Budapesti Informatikai Kft", "BUDAPESTI INFORMATIKAI"):
+        resp = client.get("/companies/", params={"q": q}, headers=auth_headers)
+        assert [c["nev"] for c in resp.json()] == ["Budapesti Informatikai Kft."]
+
+    resp = client.get("/companies/", params={"q": "epitoipari"}, headers=auth_headers)
+    assert [c["nev"] for c in resp.json()] == ["Debreceni Építőipari Zrt."]
+
+
+def test_search_with_unfinished_legal_form(client, auth_headers, sample_company):
+    for q in ("Teszt", "Teszt K", "Teszt Kf", "Teszt Kft"):
+        resp = client.get("/companies/", params={"q": q}, headers=auth_headers)
+        assert [c["id"] for c in resp.json()] == [sample_company.id], q
+        assert [c["id"] for c in client.get("/companies/public", params={"q": q}).json()] == [sample_company.id], q
+
+
+def test_nev_normalized_follows_updates(db, sample_company):
+    sample_company.nev = "Átnevezett Bt."
+    db.commit()
+    db.refresh(sample_company)
+    assert sample_company.nev_normalized == "atnevezett"
+
+
+def test_chat_resolver_uses_normalized_names(db):
+    from app.models.company import Company
+    from app.services.chat_service import find_company_context
+
+    db.add(Company(nev="Budapesti Informatikai Kft.", adoszam="33333333-2-41"))
+    db.add(Company(nev="Budapesti Informatikai Szolgáltató Bt.", adoszam="55555555-2-41"))
+    db.commit()
+
+    company, _ = find_company_context("Mit tudsz a budapesti informatikai kft-ről?", db)
+    assert company.nev == "Budapesti Informatikai Kft."
+
+    company, _ = find_company_context('Mi a helyzet a "Budapesti Informatikai Szolgáltató" céggel?', db)
+    assert company.nev == "Budapesti Informatikai Szolgáltató Bt."
+
+
+def test_chat_resolver_ranks_before_limiting(db):
+    from app.models.company import Company
+    from app.services.company_search import find_by_names
+
+    # More short prefix matches than a fixed candidate window would hold
+    db.add_all(Company(nev=f"Alfa {i} Bt.", adoszam=f"7{i:07d}-2-41", statusz="megszűnt") for i in range(60))
+    db.add(Company(nev="Alfa Építő Kft.", adoszam="79999999-2-41", statusz="megszűnt"))
+    db.add(Company(nev="Alfa Építő Zrt.", adoszam="79999998-2-41"))
+    db.commit()
+
+    assert find_by_names(db, ["Alfa Építő"]).nev == "Alfa Építő Zrt."
+    # 60 shorter prefix matches, but only one active company
+    assert find_by_names(db, ["Alfa"]).nev == "Alfa Építő Zrt."
+
+
+def _officer_graph(db):
+    from app.models.company import Company
+    from app.models.financial import Officer
+
+    companies = [Company(nev=f"Halo {i} Kft.", adoszam=f"6000000{i}-2-41") for i in range(4)]
+    db.add_all(companies)
+    db.commit()
+    db.add_all([
+        Officer(company_id=companies[0].id, nev="Dr. Kovács János", anyja_neve="Nagy Mária"),
+        Officer(company_id=companies[1].id, nev="Kovács  János", anyja_neve="Nagy Maria"),
+        # Same name, different mother: another person
+        Officer(company_id=companies[2].id, nev="Kovács János", anyja_neve="Tóth Éva"),
+        Officer(company_id=companies[1].id, nev="Szabó Anna", anyja_neve="Kiss Ilona"),
+        Officer(company_id=companies[3].id, nev="Szabó Anna", anyja_neve="Kiss Ilona"),
+    ])
+    db.commit()
+    return companies
+
+
+def test_officers_share_person_identity(client, auth_headers, db):
+    from app.models.financial import Officer, Person
+
+    companies = _officer_graph(db)
+    officers = db.query(Officer).order_by(Officer.id).all()
+    assert officers[0].person_id == officers[1].person_id
+    assert officers[2].person_id != officers[0].person_id
+    assert officers[3].person_id == officers[4].person_id
+    assert db.query(Person).count() == 3
+
+    officers[2].anyja_neve = "Nagy Mária"
+    db.commit()
+    assert officers[2].person_id == officers[0].person_id
+
+    resp = client.get(f"/companies/{companies[1].id}/officers", headers=auth_headers)
+    assert {o["person_id"] for o in resp.json()} == {officers[0].person_id, officers[3].person_id}
+
+
+def test_network_links_persons_not_names(client, auth_headers, db):
+    companies = _officer_graph(db)
+    resp = client.get(f"/companies/{companies[0].id}/network", headers=auth_headers)
+    body = resp.json()
+    # 0 -(Kovács, Nagy Mária)- 1 -(Szabó Anna)- 3; the other Kovács János (2) is not linked
+    assert {n["id"] for n in body["nodes"]} == {companies[0].id, companies[1].id, companies[3].id}
+    assert len(body["links"]) == 2
+
+
+def _officer_chain(db, length):
+    """Companies 0..length-1 where neighbours share one person."""
+    from app.models.company import Company
+    from app.models.financial import Officer
+
+    companies = [Company(nev=f"Lanc {i:02d} Kft.") for i in range(length)]
+    db.add_all(companies)
+    db.commit()
+    for i in range(length - 1):
+        for company in companies[i:i + 2]:
+            db.add(Officer(company_id=company.id, nev=f"Tag {i}", anyja_neve="Anya"))
+    db.commit()
+    return [c.id for c in companies]
+
+
+def test_network_depth_and_statement_count(client, auth_headers, db):
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    ids = _officer_chain(db, 6)
+    statements = []
+    counter = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        resp = client.get(f"/companies/{ids[0]}/network", params={"depth": 4}, headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    body = resp.json()
+    assert [(n["id"], n["level"]) for n in body["nodes"]] == [(ids[i], i) for i in range(5)]
+    assert [(link["source"], link["target"], link["officers"]) for link in body["links"]] == [
+        (ids[i], ids[i + 1], [f"Tag {i}"]) for i in range(4)
+    ]
+    assert body["truncated"] is False
+    # user + center + (expansion + nodes) per level + cluster
+    assert len(statements) <= 2 + 2 * 4 + 1
+
+    resp = client.get(f"/companies/{ids[2]}/network", params={"depth": 1}, headers=auth_headers)
+    assert {n["id"] for n in resp.json()["nodes"]} == {ids[1], ids[2], ids[3]}
+    assert client.get(f"/companies/{ids[0]}/network", params={"depth": 9}, headers=auth_headers).status_code == 422
+    assert client.get("/companies/999999/network", headers=auth_headers).status_code == 404
+
+
+def test_network_caps(client, auth_headers, db):
+    from app.models.company import Company
+    from app.models.financial import Officer
+
+    hub = Company(nev="Holding Zrt.")
+    members = [Company(nev=f"Leany {i} Kft.") for i in range(10)]
+    db.add_all([hub, *members])
+    db.commit()
+    for company in (hub, *members):
+        db.add(Officer(company_id=company.id, nev="Fo Nok", anyja_neve="Anya"))
+    db.commit()
+
+    body = client.get(f"/companies/{hub.id}/network", params={"max_nodes": 4}, headers=auth_headers).json()
+    assert len(body["nodes"]) == 4
+    assert body["truncated"] is True
+    node_ids = {n["id"] for n in body["nodes"]}
+    assert all(link["source"] in node_ids and link["target"] in node_ids for link in body["links"])
+
+    body = client.get(f"/companies/{hub.id}/network", params={"max_edges": 3}, headers=auth_headers).json()
+    assert len(body["links"]) == 3
+    assert body["truncated"] is True
+
+    body = client.get(f"/companies/{hub.id}/network", headers=auth_headers).json()
+    # 10 spokes plus the 45 links among the members found when level 1 is expanded
+    assert (len(body["nodes"]), len(body["links"]), body["truncated"]) == (11, 55, False)
+
+
+def _graph_shape(network):
+    nodes = sorted((n["id"], n["level"]) for n in network["nodes"])
+    links = sorted((link["source"], link["target"], tuple(sorted(link["officers"]))) for link in network["links"])
+    return nodes, links, network["truncated"]
+
+
+def test_officer_graph_matches_sql_expansion(db):
+    from app.services.network import build_network, sql_expand
+    from app.services.officer_graph import OfficerGraph
+
+    chain = _officer_chain(db, 6)
+    hub = [c.id for c in _officer_graph(db)]
+    graph = OfficerGraph()
+    graph.build(db)
+    for center in (chain[0], chain[3], hub[0], hub[1]):
+        for depth, max_nodes in ((1, 300), (3, 300), (4, 3)):
+            assert _graph_shape(build_network(db, center, depth, max_nodes, expand=graph.expand)) == _graph_shape(
+                build_network(db, center, depth, max_nodes, expand=sql_expand)
+            )
+
+    stats = graph.stats()
+    assert (stats["edges"], stats["persons"]) == (15, 8)
+    assert stats["bytes_per_million_edges"] > 0
+
+
+def test_officer_graph_cut_marks_truncated(db, monkeypatch):
+    from app.services import officer_graph as graph_module
+    from app.services.network import build_network, shortest_paths
+    from app.services.officer_graph import OfficerGraph
+
+    hub = [c.id for c in _officer_graph(db)]
+    graph = OfficerGraph()
+    graph.build(db)
+    assert build_network(db, hub[0], 2, expand=graph.expand)["truncated"] is False
+
+    monkeypatch.setattr(graph_module, "_MAX_PAIRS", 3)
+    assert build_network(db, hub[0], 2, expand=graph.expand)["truncated"] is True
+    assert shortest_paths(db, hub[0], hub[-1], expand=graph.expand)["exhausted"] is True
+
+
+def test_officer_graph_follows_officer_writes(client, auth_headers, db, monkeypatch):
+    from app.models.company import Company
+    from app.models.financial import Officer
+    from app.services import officer_graph as graph_module
+    from app.services.network_cache import network_cache
+    from app.services.officer_graph import officer_graph
+
+    monkeypatch.setattr(graph_module, "_COMPACT_AFTER", 4)
+    ids = _officer_chain(db, 3)
+    officer_graph.build(db)
+
+    def neighbours(company_id):
+        resp = client.get(f"/companies/{company_id}/network", params={"depth": 1}, headers=auth_headers)
+        return {n["id"] for n in resp.json()["nodes"]} - {company_id}
+
+    assert neighbours(ids[0]) == {ids[1]}
+    newcomer = Company(nev="Uj Kft.")
+    db.add(newcomer)
+    db.commit()
+    officer = Officer(company_id=newcomer.id, nev="Tag 0", anyja_neve="Anya")
+    db.add(officer)
+    db.commit()
+    assert neighbours(ids[0]) == {ids[1], newcomer.id}
+
+    officer.anyja_neve = "Masik Anya"  # now a different person
+    db.commit()
+    assert neighbours(ids[0]) == {ids[1]}
+
+    db.query(Officer).filter(Officer.company_id == ids[2]).delete()
+    db.commit()  # bulk delete: not tracked until the next rebuild
+    network_cache.clear()  # nor by the result cache, until its TTL
+    assert neighbours(ids[1]) == {ids[0], ids[2]}
+    officer_graph.build(db)
+    network_cache.clear()
+    assert neighbours(ids[1]) == {ids[0]}
+
+    for other in db.query(Officer).filter(Officer.company_id == ids[1]).all():
+        db.delete(other)
+    db.commit()
+    assert neighbours(ids[0]) == set()
+    assert officer_graph.stats()["overridden_nodes"] <= 4
+
+
+def test_network_cache_invalidation(client, auth_headers, db):
+    from app.models.company import Company
+    from app.models.financial import Officer
+    from app.services.network_cache import network_cache
+
+    ids = _officer_chain(db, 5)
+
+    def node_ids(company_id, depth):
+        resp = client.get(f"/companies/{company_id}/network", params={"depth": depth}, headers=auth_headers)
+        return {n["id"] for n in resp.json()["nodes"]}
+
+    assert node_ids(ids[0], 2) == set(ids[:3])
+    assert node_ids(ids[4], 1) == set(ids[3:])
+    misses, hits, invalidations = network_cache.misses, network_cache.hits, network_cache.invalidations
+    assert node_ids(ids[0], 2) == set(ids[:3])
+    assert (network_cache.misses, network_cache.hits) == (misses, hits + 1)
+
+    # A new company joins through the person of 1-2: neither it nor its
+    # company is in the first graph yet, the person's companies are
+    newcomer = Company(nev="Uj Kft.")
+    db.add(newcomer)
+    db.commit()
+    db.add(Officer(company_id=newcomer.id, nev="Tag 1", anyja_neve="Anya"))
+    db.commit()
+    assert len(network_cache) == 1  # the graph of 4 is untouched
+    assert node_ids(ids[0], 2) == {*ids[:3], newcomer.id}
+
+    db.get(Company, ids[3]).nev = "Atnevezett Kft."
+    db.commit()
+    assert len(network_cache) == 1
+    resp = client.get(f"/companies/{ids[4]}/network", params={"depth": 1}, headers=auth_headers).json()
+    assert "Atnevezett Kft." in {n["nev"] for n in resp["nodes"]}
+    assert network_cache.stats()["invalidations"] == invalidations + 2
+
+
+def test_network_layout(client, auth_headers, db):
+    import math
+
+    from app.models.financial import Officer
+    from app.services.network_layout import network_layout_cache
+
+    ids = _officer_chain(db, 5)
+    params = {"depth": 4, "layout": "true"}
+    body = client.get(f"/companies/{ids[0]}/network", params=params, headers=auth_headers).json()
+    xy = {n["id"]: (n["x"], n["y"]) for n in body["nodes"]}
+    assert xy[ids[0]] == (0, 0)
+    assert all(math.isfinite(v) for pos in xy.values() for v in pos)
+    assert math.dist(xy[ids[0]], xy[ids[1]]) < math.dist(xy[ids[0]], xy[ids[4]])
+    assert "x" not in client.get(f"/companies/{ids[0]}/network", headers=auth_headers).json()["nodes"][0]
+
+    hits = network_layout_cache.hits
+    again = client.get(f"/companies/{ids[0]}/network", params=params, headers=auth_headers).json()
+    assert network_layout_cache.hits == hits + 1
+    assert {n["id"]: (n["x"], n["y"]) for n in again["nodes"]} == xy
+
+    # An officer change of a node drops the layouts containing it
+    client.get(f"/companies/{ids[3]}/network", params={"depth": 1, "layout": "true"}, headers=auth_headers)
+    assert len(network_layout_cache) == 2
+    db.add(Officer(company_id=ids[4], nev="Uj Tag", anyja_neve="Anya"))
+    db.commit()
+    assert len(network_layout_cache) == 0
+
+
+def test_force_layout_grid_approximation():
+    import numpy as np
+
+    from app.services.network_layout import _exact_repulsion, _grid_repulsion, force_layout
+
+    rng = np.random.default_rng(3)
+    x, y = rng.normal(size=(2, 2000)) * 20
+    exact, grid = np.stack(_exact_repulsion(x, y)), np.stack(_grid_repulsion(x, y))
+    assert np.median(np.hypot(*(grid - exact)) / np.hypot(*exact)) < 0.01
+
+    n = 800  # above the exact all-pairs limit
+    sources, targets = rng.integers(0, n, 2000), rng.integers(0, n, 2000)
+    levels = rng.integers(0, 4, n)
+    levels[0] = 0
+    coords = force_layout(levels, sources, targets, iterations=10)
+    assert coords.shape == (n, 2) and np.isfinite(coords).all()
+    assert (coords[0] == 0).all()
+    assert np.array_equal(coords, force_layout(levels, sources, targets, iterations=10))
+
+
+def test_network_export_formats(client, auth_headers, db, monkeypatch):
+    import json
+    import xml.etree.ElementTree as ET
+
+    from app.services import export, network_export
+
+    ids = _officer_chain(db, 6)
+    url = f"/companies/{ids[0]}/network/export"
+
+    resp = client.get(url, params={"depth": 5}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/graphml+xml")
+    ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+    graph = ET.fromstring(resp.content).find("g:graph", ns)
+    assert [n.get("id") for n in graph.findall("g:node", ns)] == [f"c{i}" for i in ids]
+    edges = graph.findall("g:edge", ns)
+    assert [(e.get("source"), e.get("target")) for e in edges] == [(f"c{ids[i]}", f"c{ids[i + 1]}") for i in range(5)]
+    assert edges[0].find("g:data[@key='officers']", ns).text == "Tag 0"
+
+    monkeypatch.setattr(network_export, "_CHUNK_BYTES", 64)
+    monkeypatch.setattr(network_export, "_SPOOL_BYTES", 64)  # edges spill to disk
+    resp = client.get(url, params={"format": "gexf", "depth": 5}, headers=auth_headers)
+    ns = {"x": "http://gexf.net/1.3"}
+    graph = ET.fromstring(resp.content).find("x:graph", ns)
+    assert [n.get("label") for n in graph.findall("x:nodes/x:node", ns)] == [f"Lanc {i:02d} Kft." for i in range(6)]
+    assert len(graph.findall("x:edges/x:edge", ns)) == 5
+
+    resp = client.get(url, params={"format": "ndjson", "depth": 5, "max_nodes": 3}, headers=auth_headers)
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["type"] for line in lines] == ["node", "node", "edge", "node", "edge", "summary"]
+    assert lines[-1] == {"type": "summary", "nodes": 3, "edges": 2, "truncated": True}
+
+    monkeypatch.setitem(export.EXPORT_ROW_LIMITS, "free", 2)
+    resp = client.get(url, params={"format": "ndjson", "depth": 5}, headers=auth_headers)
+    assert resp.text.splitlines()[-1] == json.dumps({"type": "summary", "nodes": 2, "edges": 1, "truncated": True})
+
+    assert client.get(url, params={"format": "dot"}, headers=auth_headers).status_code == 422
+    assert client.get("/companies/999999/network/export", headers=auth_headers).status_code == 404
+
+
+def test_connection_path(client, auth_headers, db):
+    from app.models.company import Company
+    from app.models.financial import Officer
+    from app.services.network import shortest_paths, sql_expand
+    from app.services.officer_graph import OfficerGraph
+
+    ids = _officer_chain(db, 6)
+    detour = Company(nev="Kerulo Kft.")
+    db.add(detour)
+    db.commit()
+    db.add_all([
+        Officer(company_id=ids[0], nev="Kerulo Egy", anyja_neve="Anya"),
+        Officer(company_id=detour.id, nev="Kerulo Egy", anyja_neve="Anya"),
+        Officer(company_id=detour.id, nev="Kerulo Ketto", anyja_neve="Anya"),
+        Officer(company_id=ids[2], nev="Kerulo Ketto", anyja_neve="Anya"),
+    ])
+    db.commit()
+
+    def path(source, target, **params):
+        resp = client.get(f"/companies/{source}/path/{target}", params=params, headers=auth_headers)
+        assert resp.status_code == 200
+        return resp.json()
+
+    body = path(ids[5], ids[0], max_length=5)
+    assert body["length"] == 5 and body["exhausted"] is False
+    assert {"companies": ids[::-1], "officers": [[f"Tag {i}"] for i in range(4, -1, -1)]} in body["paths"]
+    assert len(body["paths"]) == 2  # and the one through the detour
+    assert {n["id"] for n in body["nodes"] if n["is_center"]} == {ids[0], ids[5]}
+
+    body = path(ids[0], ids[3])
+    assert body["length"] == 3
+    assert sorted(p["companies"] for p in body["paths"]) == [
+        [ids[0], ids[1], ids[2], ids[3]],
+        [ids[0], detour.id, ids[2], ids[3]],
+    ]
+    assert path(ids[0], ids[3], max_paths=1)["truncated"] is True
+
+    assert path(ids[0], ids[5], max_length=4)["length"] is None
+    body = path(ids[0], ids[5], max_visits=3)
+    assert (body["length"], body["exhausted"]) == (None, True)
+    assert path(ids[1], ids[1])["length"] == 0
+    assert client.get(f"/companies/{ids[0]}/path/999999", headers=auth_headers).status_code == 404
+    assert client.get(f"/companies/{ids[0]}/path/{ids[1]}", params={"max_length": 99}, headers=auth_headers).status_code == 422
+
+    graph = OfficerGraph()
+    graph.build(db)
+    for source, target in ((ids[0], ids[5]), (ids[4], detour.id), (detour.id, ids[1])):
+        assert shortest_paths(db, source, target, 6, expand=graph.expand) == shortest_paths(
+            db, source, target, 6, expand=sql_expand
+        )
+
+
+def test_compute_company_clusters(client, auth_headers, db):
+    from datetime import datetime
+
+    from app.models.company_cluster import CompanyCluster
+    from app.services.company_clusters import compute_clusters
+
+    companies = _officer_graph(db)
+    chain = _officer_chain(db, 3)
+    companies[3].felszamolas = True
+    db.commit()
+    assert compute_clusters(db) == 6
+
+    clusters = {row.company_id: row for row in db.query(CompanyCluster)}
+    assert companies[2].id not in clusters  # the other Kovács János: alone
+    group = [clusters[companies[i].id] for i in (0, 1, 3)]
+    assert {(c.cluster_id, c.cluster_size, c.negative_count) for c in group} == {(companies[0].id, 3, 1)}
+    assert {(clusters[i].cluster_id, clusters[i].cluster_size, clusters[i].negative_count) for i in chain} == {(chain[0], 3, 0)}
+
+    body = client.get(f"/risk/{companies[1].id}", headers=auth_headers).json()
+    assert (body["cluster"]["cluster_size"], body["cluster"]["negative_count"]) == (3, 1)
+    assert client.get(f"/risk/{companies[2].id}", headers=auth_headers).json()["cluster"] is None
+    body = client.get(f"/companies/{companies[1].id}/profile", params={"include": "risk"}, headers=auth_headers).json()
+    assert body["risk"]["cluster"]["cluster_id"] == companies[0].id
+    body = client.get(f"/companies/{chain[2]}/network", headers=auth_headers).json()
+    assert body["cluster"]["cluster_size"] == 3
+
+    # Recomputing replaces the previous rows
+    db.query(CompanyCluster).delete()
+    db.add(CompanyCluster(company_id=companies[2].id, cluster_id=1, cluster_size=99, negative_count=0, computed_at=datetime.now()))
+    db.commit()
+    assert compute_clusters(db) == 6
+    assert db.get(CompanyCluster, companies[2].id) is None
+
+
+def test_backfill_person_ids(db):
+    from sqlalchemy import update
+
+    from app.models.financial import Officer
+    from app.services.officer_identity import backfill_person_ids
+
+    _officer_graph(db)
+    db.execute(update(Officer).values(person_id=None))
+    db.commit()
+    assert backfill_person_ids(db, batch_size=2) == 5
+    person_ids = [o.person_id for o in db.query(Officer).order_by(Officer.id)]
+    assert person_ids[0] == person_ids[1] and person_ids[3] == person_ids[4]
+    assert len(set(person_ids)) == 3
+
+
+def test_chat_context_lists_other_companies_of_officers(db):
+    from app.services.chat_service import _build_company_text
+
+    companies = _officer_graph(db)
+    text = _build_company_text(companies[1], db)
+    assert "Kovács  János; további cégei: Halo 0 Kft." in text
+    assert "Szabó Anna; további cégei: Halo 3 Kft." in text
+    assert "Halo 2 Kft." not in text
+
+
+def test_classify_query():
+    from app.services.company_search import classify_query
+
+    assert classify_query("12345678") == ("adoszam", "12345678")
+    assert classify_query("12345678-1-41") == ("adoszam", "12345678-1-41")
+    assert classify_query("12345678141") == ("adoszam", "12345678-1-41")
+    assert classify_query("01-09-123456") == ("cegjegyzekszam", "01-09-123456")
+    assert classify_query("0109123456") == ("cegjegyzekszam", "01-09-123456")
+    assert classify_query("Teszt 2000") == ("name", "Teszt 2000")
+    assert classify_query("1234") == ("name", "1234")
+
+
+def test_search_by_identifiers(client, auth_headers, sample_company, db):
+    from app.models.company import Company
+
+    db.add(Company(nev="Másik Kft.", adoszam="12345679-2-41", cegjegyzekszam="01-09-123457"))
+    db.commit()
+
+    for q in ("12345678", "12345678-1-41", "01-09-123456", "01 09 123456"):
+        resp = client.get("/companies/", params={"q": q}, headers=auth_headers)
+        assert [c["nev"] for c in resp.json()] == ["Teszt Kft."], q
+
+    resp = client.get("/companies/public", params={"q": "12345679"})
+    assert [c["nev"] for c in resp.json()] == ["Másik Kft."]
+
+    resp = client.get("/companies/", params={"q": "12345678-9-99"}, headers=auth_headers)
+    assert resp.json() == []
+
+
+def _walk_pages(client, auth_headers, params):
+    names, cursor = [], None
+    while True:
+        page_params = dict(params, limit=2, **({"cursor": cursor} if cursor else {}))
+        resp = client.get("/companies/", params=page_params, headers=auth_headers)
+        assert resp.status_code == 200
+        names += [c["nev"] for c in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return names
+
+
+def test_cursor_pagination(client, auth_headers, db):
+    from datetime import date
+
+    from app.models.company import Company
+
+    founded = [date(2020, 1, 1), None, date(2018, 5, 5), date(2020, 1, 1), None]
+    for i, alapitas in enumerate(founded):
+        db.add(Company(nev=f"Cég {i} Kft.", adoszam=f"1000000{i}-2-41", alapitas_datuma=alapitas))
+    db.commit()
+
+    assert _walk_pages(client, auth_headers, {}) == [f"Cég {i} Kft." for i in range(5)]
+    assert _walk_pages(client, auth_headers, {"order_by": "nev_desc"}) == [f"Cég {i} Kft." for i in reversed(range(5))]
+    assert _walk_pages(client, auth_headers, {"order_by": "alapitas_asc"}) == [
+        "Cég 2 Kft.", "Cég 0 Kft.", "Cég 3 Kft.", "Cég 1 Kft.", "Cég 4 Kft.",
+    ]
+    assert _walk_pages(client, auth_headers, {"order_by": "alapitas_desc"}) == [
+        "Cég 3 Kft.", "Cég 0 Kft.", "Cég 2 Kft.", "Cég 4 Kft.", "Cég 1 Kft.",
+    ]
+
+    # skip keeps working and matches the cursor ordering
+    resp = client.get("/companies/", params={"order_by": "nev_asc", "skip": 2, "limit": 2}, headers=auth_headers)
+    assert [c["nev"] for c in resp.json()] == ["Cég 2 Kft.", "Cég 3 Kft."]
+
+
+def test_cursor_rejects_garbage_and_mismatched_order(client, auth_headers, sample_company, db):
+    from app.models.company import Company
+
+    db.add(Company(nev="Másik Kft."))
+    db.commit()
+    resp = client.get("/companies/", params={"limit": 1}, headers=auth_headers)
+    cursor = resp.headers["X-Next-Cursor"]
+
+    resp = client.get("/companies/", params={"cursor": "nem-cursor"}, headers=auth_headers)
+    assert resp.status_code == 400
+    resp = client.get("/companies/", params={"cursor": cursor, "order_by": "nev_asc"}, headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_search_returns_page_total_and_facets(client, auth_headers, db):
+    from app.models.company import Company
+
+    db.add(Company(nev="Alfa Kft.", statusz="aktív", cegforma="Kft.", teaor_kod="6201", letszam_kategoria="1-4"))
+    db.add(Company(nev="Béta Kft.", statusz="aktív", cegforma="Kft.", teaor_kod="6202", felszamolas=True))
+    db.add(Company(nev="Gamma Zrt.", statusz="megszűnt", cegforma="Zrt.", teaor_kod="4711", felszamolas=True))
+    db.add(Company(nev="Delta Bt.", statusz="aktív", cegforma="Bt."))
+    db.commit()
+
+    resp = client.get(
+        "/companies/search", params={"limit": 2, "order_by": "nev_asc", "facets": True}, headers=auth_headers
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [c["nev"] for c in data["items"]] == ["Alfa Kft.", "Béta Kft."]
+    assert data["total"] == 4
+    assert data["next_cursor"]
+    assert data["facets"]["statusz"] == {"aktív": 3, "megszűnt": 1}
+    assert data["facets"]["cegforma"] == {"Kft.": 2, "Zrt.": 1, "Bt.": 1}
+    assert data["facets"]["teaor_fo"] == {"62": 2, "47": 1}
+    assert data["facets"]["letszam_kategoria"] == {"1-4": 1}
+    assert data["facets"]["negative_events"]["felszamolas"] == 2
+
+    resp = client.get(
+        "/companies/search",
+        params={"limit": 2, "order_by": "nev_asc", "cursor": data["next_cursor"]},
+        headers=auth_headers,
+    )
+    assert [c["nev"] for c in resp.json()["items"]] == ["Delta Bt.", "Gamma Zrt."]
+    assert resp.json()["next_cursor"] is None
+
+    # Same filter semantics as the list endpoint
+    resp = client.get(
+        "/companies/search", params={"statusz": "aktív", "felszamolas": True, "facets": True}, headers=auth_headers
+    )
+    assert resp.json()["total"] == 1
+    assert resp.json()["facets"]["statusz"] == {"aktív": 1}
+
+
+def test_search_endpoint_total_uses_count_cache(client, auth_headers, db):
+    from sqlalchemy import event
+
+    from app.models.company import Company
+    from tests.conftest import engine
+
+    db.add_all(Company(nev=f"Cég {i} Kft.", statusz="aktív") for i in range(3))
+    db.commit()
+
+    data = client.get("/companies/search", params={"limit": 2}, headers=auth_headers).json()
+    assert (data["total"], data["total_is_estimate"], data["facets"]) == (3, False, None)
+
+    statements = []
+
+    def counter(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        data = client.get("/companies/search", params={"limit": 2}, headers=auth_headers).json()
+        # A facet total is cached for the list and count endpoints too
+        client.get("/companies/search", params={"statusz": "aktív", "facets": True}, headers=auth_headers)
+        count = client.get("/companies/count", params={"statusz": "aktív"}, headers=auth_headers).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert data["total"] == 3
+    assert count == {"count": 3, "is_estimate": False}
+    # page, page + facets, nothing for the count: no COUNT query
+    assert len(statements) == 3
+
+
+def test_export_csv_streams_filtered_rows(client, auth_headers, db):
+    import csv
+    import io
+
+    from app.models.company import Company
+
+    for i in range(3):
+        db.add(Company(nev=f"Export {i} Kft.", adoszam=f"2000000{i}-2-41", statusz="aktív"))
+    db.add(Company(nev="Kimarad Kft.", statusz="megszűnt"))
+    db.commit()
+
+    resp = client.get("/companies/export/csv", params={"statusz": "aktív", "order_by": "nev_desc"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert rows[0][:3] == ["Cégnév", "Adószám", "Cégjegyzékszám"]
+    assert [r[0] for r in rows[1:]] == ["Export 2 Kft.", "Export 1 Kft.", "Export 0 Kft."]
+    assert rows[1][1] == "20000002-2-41"
+
+
+def test_sparse_fieldsets(client, auth_headers, db):
+    from sqlalchemy import event
+
+    from app.models.company import Company
+    from tests.conftest import engine
+
+    for i in range(3):
+        db.add(Company(nev=f"Mezo {i} Kft.", adoszam=f"3000000{i}-2-41", szekhely="Budapest", alapitas_datuma=date(2000 + i, 1, 1)))
+    db.commit()
+
+    statements = []
+    counter = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        resp = client.get(
+            "/companies/",
+            params={"fields": "nev,alapitas_datuma", "order_by": "nev_desc", "limit": 2},
+            headers=auth_headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"id": resp.json()[0]["id"], "nev": "Mezo 2 Kft.", "alapitas_datuma": "2002-01-01"},
+        {"id": resp.json()[1]["id"], "nev": "Mezo 1 Kft.", "alapitas_datuma": "2001-01-01"},
+    ]
+    company_selects = [s for s in statements if "FROM companies" in s]
+    assert len(company_selects) == 1
+    assert "companies.szekhely" not in company_selects[0]
+
+    cursor = resp.headers["X-Next-Cursor"]
+    resp = client.get("/companies/", params={"fields": "nev", "order_by": "nev_desc", "cursor": cursor}, headers=auth_headers)
+    assert [r["nev"] for r in resp.json()] == ["Mezo 0 Kft."]
+
+    company_id = resp.json()[0]["id"]
+    resp = client.get(f"/companies/{company_id}", params={"fields": "adoszam,weboldal"}, headers=auth_headers)
+    assert resp.json() == {"id": company_id, "adoszam": "30000000-2-41", "weboldal": None}
+
+    assert client.get("/companies/", params={"fields": "nev,hashed_password"}, headers=auth_headers).status_code == 400
+    assert client.get(f"/companies/{company_id}", params={"fields": ""}, headers=auth_headers).status_code == 400
+
+
+def test_export_csv_fields(client, auth_headers, db):
+    from app.models.company import Company
+
+    db.add(Company(nev="Oszlop Kft.", adoszam="40000000-2-41", szekhely="Győr"))
+    db.commit()
+    resp = client.get("/companies/export/csv", params={"fields": "szekhely,nev"}, headers=auth_headers)
+    assert resp.text.splitlines() == ["Székhely,Cégnév", "Győr,Oszlop Kft."]
+    assert client.get("/companies/export/csv", params={"fields": "email"}, headers=auth_headers).status_code == 400
+
+
+def test_export_csv_respects_package_limit(client, auth_headers, db, monkeypatch):
+    from app.models.company import Company
+    from app.services import export
+
+    monkeypatch.setitem(export.EXPORT_ROW_LIMITS, "free", 2)
+    for i in range(5):
+        db.add(Company(nev=f"Export {i} Kft."))
+    db.commit()
+
+    resp = client.get("/companies/export/csv", headers=auth_headers)
+    assert len(resp.text.strip().splitlines()) == 3  # header + 2 rows
+
+
+def test_marketing_export_preserves_requested_order(client, auth_headers, db, monkeypatch):
+    import csv
+    import io
+
+    from app.models.company import Company
+    from app.services import export
+
+    monkeypatch.setattr(export, "_ID_CHUNK", 2)
+    companies = [Company(nev=f"Marketing {i} Kft.", email=f"info{i}@example.com") for i in range(5)]
+    db.add_all(companies)
+    db.commit()
+
+    ids = [companies[3].id, companies[0].id, 9999, companies[4].id, companies[0].id, companies[1].id]
+    resp = client.post("/companies/export/marketing", json={"ids": ids}, headers=auth_headers)
+    assert resp.status_code == 200
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert rows[0][-3:] == ["Email", "Telefon", "Weboldal"]
+    assert [r[0] for r in rows[1:]] == ["Marketing 3 Kft.", "Marketing 0 Kft.", "Marketing 4 Kft.", "Marketing 1 Kft."]
+    assert rows[1][-3] == "info3@example.com"
+
+
+def test_marketing_export_respects_package_limit(client, auth_headers, monkeypatch):
+    from app.services import export
+
+    monkeypatch.setitem(export.EXPORT_ROW_LIMITS, "free", 2)
+    resp = client.post("/companies/export/marketing", json={"ids": [1, 2, 3]}, headers=auth_headers)
+    assert resp.status_code == 403
+
+
+def test_batch_lookup_keeps_input_order(client, auth_headers, sample_company, db):
+    from app.models.company import Company
+
+    other = Company(nev="Másik Kft.", adoszam="87654321-2-42", cegjegyzekszam="13-09-111111")
+    db.add(other)
+    db.commit()
+
+    values = ["13-09-111111", "12345678", "12345678-1-41", "99999999", "1234567899-1", "12345678-9-99", "0109123456"]
+    resp = client.post("/companies/lookup", json={"values": values}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [r["query"] for r in data] == values
+    assert [r["status"] for r in data] == ["found", "found", "found", "not_found", "invalid", "not_found", "found"]
+    assert [r["company"]["id"] if r["company"] else None for r in data] == [
+        other.id, sample_company.id, sample_company.id, None, None, None, sample_company.id,
+    ]
+
+
+def test_batch_lookup_streams_ndjson(client, auth_headers, sample_company, monkeypatch):
+    import json
+
+    from app.services import company_lookup
+
+    monkeypatch.setattr(company_lookup, "_CHUNK", 2)
+    values = ["12345678", "11111111", "01-09-123456"] * 2
+    resp = client.post(
+        "/companies/lookup",
+        json={"values": values},
+        headers={**auth_headers, "Accept": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["status"] for r in lines] == ["found", "not_found", "found"] * 2
+    assert lines[2]["company"]["nev"] == "Teszt Kft."
+
+    resp = client.post("/companies/lookup", json={"values": ["1"] * 10_001}, headers=auth_headers)
+    assert resp.status_code == 422
+
+
+def test_company_profile_in_one_request(client, auth_headers, sample_company, db):
+    from sqlalchemy import event
+
+    from app.models.financial import FinancialReport, Officer
+    from tests.conftest import engine
+
+    db.add_all([
+        FinancialReport(company_id=sample_company.id, ev=2022, netto_arbevetel=100.0, adozott_eredmeny=5.0, sajat_toke=50.0),
+        FinancialReport(company_id=sample_company.id, ev=2023, netto_arbevetel=120.0, adozott_eredmeny=8.0, sajat_toke=60.0),
+        Officer(company_id=sample_company.id, nev="Kovács János", titulus="ügyvezető"),
+    ])
+    db.commit()
+    company_id = sample_company.id
+    client.post("/watchlist", json={"company_id": company_id}, headers=auth_headers)
+
+    statements = []
+    counter = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        resp = client.get(f"/companies/{company_id}/profile", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert resp.status_code == 200
+    # current user, company + watchlist, financial reports, officers
+    assert len(statements) <= 4
+    body = resp.json()
+    assert body["company"]["nev"] == "Teszt Kft."
+    assert [r["ev"] for r in body["financials"]] == [2022, 2023]
+    assert body["officers"][0]["nev"] == "Kovács János"
+    assert body["watchlist"]["is_watched"] is True
+    assert body["risk"] == client.get(f"/risk/{sample_company.id}", headers=auth_headers).json()
+    assert body["financial_analysis"] == client.get(f"/financial-analysis/{sample_company.id}", headers=auth_headers).json()
+
+
+def test_company_profile_include_subset(client, auth_headers, sample_company):
+    resp = client.get(f"/companies/{sample_company.id}/profile", params={"include": "officers,watchlist"}, headers=auth_headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["officers"] == []
+    assert body["watchlist"] == {"is_watched": False, "watchlist_item_id": None}
+    assert body["financials"] is None and body["risk"] is None
+
+    resp = client.get(f"/companies/{sample_company.id}/profile", params={"include": "officers,bogus"}, headers=auth_headers)
+    assert resp.status_code == 400
+    assert client.get("/companies/999999/profile", headers=auth_headers).status_code == 404
@@ -0,0 +1,264 @@
+import csv
+import gzip
+import io
+import os
+
+from datetime import date, datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import load_workbook
+
+from app.config import settings
+from app.models.company import Company
+from app.models.export_job import ExportJob
+from app.models.financial import FinancialReport
+from app.routers import exports
+from app.services.export import EXPORT_ROW_LIMITS
+from app.services.export_jobs import purge_expired_exports, run_export_job
+from tests.conftest import TestSession
+
+
+@pytest.fixture(autouse=True)
+def run_jobs_inline(monkeypatch, tmp_path):
+    """Run queued jobs synchronously instead of sending them to Celery."""
+    monkeypatch.setattr(settings, "export_dir", str(tmp_path))
+    queued = []
+    monkeypatch.setattr(exports.run_export, "delay", queued.append)
+    return queued
+
+
+@pytest.fixture
+def companies(db):
+    rows = [
+        Company(nev=f"Export {i:02d} Kft.", adoszam=f"{10000000 + i}-2-41", statusz="aktív" if i % 2 else "megszűnt")
+        for i in range(12)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _run(queued):
+    for job_id in queued:
+        run_export_job(job_id, TestSession)
+
+
+def test_filter_export_csv(client, auth_headers, companies, run_jobs_inline):
+    resp = client.post(
+        "/exports",
+        json={"format": "csv", "filters": {"statusz": "aktív"}, "order_by": "nev_asc"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "queued"
+
+    _run(run_jobs_inline)
+    status = client.get(f"/exports/{job['id']}", headers=auth_headers).json()
+    assert status["status"] == "done"
+    assert status["total_rows"] == 6
+    assert status["processed_rows"] == 6
+
+    resp = client.get(f"/exports/{job['id']}/download", headers=auth_headers)
+    assert resp.status_code == 200
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert rows[0][0] == "Cégnév"
+    assert [r[0] for r in rows[1:]] == [f"Export {i:02d} Kft." for i in range(1, 12, 2)]
+
+
+def test_date_filter_export(client, auth_headers, companies, run_jobs_inline, db):
+    companies[3].alapitas_datuma = date(2010, 5, 1)
+    companies[5].alapitas_datuma = date(2020, 5, 1)
+    db.commit()
+    resp = client.post(
+        "/exports", json={"format": "csv", "filters": {"alapitas_tol": "2015-01-01"}}, headers=auth_headers
+    )
+    _run(run_jobs_inline)
+    body = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers).text
+    assert [r[0] for r in csv.reader(io.StringIO(body))][1:] == ["Export 05 Kft."]
+
+
+def test_keyset_batches_keep_order(client, auth_headers, companies, run_jobs_inline, monkeypatch):
+    monkeypatch.setattr("app.services.export._KEYSET_BATCH", 5)
+    resp = client.post("/exports", json={"format": "csv", "order_by": "nev_desc"}, headers=auth_headers)
+    _run(run_jobs_inline)
+    body = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers).text
+    names = [r[0] for r in csv.reader(io.StringIO(body))][1:]
+    assert names == [f"Export {i:02d} Kft." for i in reversed(range(12))]
+
+
+def test_id_export_gzip(client, auth_headers, companies, run_jobs_inline):
+    ids = [companies[3].id, companies[0].id, 999999]
+    resp = client.post("/exports", json={"format": "csv.gz", "ids": ids}, headers=auth_headers)
+    _run(run_jobs_inline)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    assert resp.status_code == 200
+    rows = list(csv.reader(io.StringIO(gzip.decompress(resp.content).decode())))
+    assert [r[0] for r in rows[1:]] == ["Export 03 Kft.", "Export 00 Kft."]
+
+
+def test_xlsx_export(client, auth_headers, companies, run_jobs_inline):
+    resp = client.post("/exports", json={"format": "xlsx", "filters": {"q": "Export 1"}}, headers=auth_headers)
+    _run(run_jobs_inline)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    sheet = load_workbook(io.BytesIO(resp.content)).active
+    values = [row[0] for row in sheet.iter_rows(values_only=True)]
+    assert values == ["Cégnév", "Export 10 Kft.", "Export 11 Kft."]
+
+
+def test_parquet_keeps_types_and_row_groups(client, auth_headers, companies, run_jobs_inline, monkeypatch, db):
+    monkeypatch.setattr("app.services.export_jobs._BATCH_ROWS", 5)
+    companies[0].alapitas_datuma = date(2001, 2, 3)
+    db.commit()
+    resp = client.post("/exports", json={"format": "parquet", "dataset": "companies_financials", "order_by": "nev_asc"}, headers=auth_headers)
+    _run(run_jobs_inline)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    parquet = pq.ParquetFile(io.BytesIO(resp.content))
+    assert parquet.metadata.num_rows == 12
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.schema.field("alapitas_datuma").type == pa.date32()
+    assert table.column("nev")[0].as_py() == "Export 00 Kft."
+    assert table.column("alapitas_datuma")[0].as_py() == date(2001, 2, 3)
+    assert table.column("ev").null_count == 12
+
+
+def test_arrow_with_latest_financials(client, auth_headers, companies, run_jobs_inline, db):
+    db.add_all([
+        FinancialReport(company_id=companies[1].id, ev=2022, netto_arbevetel=100.0),
+        FinancialReport(company_id=companies[1].id, ev=2023, netto_arbevetel=150.5),
+        FinancialReport(company_id=companies[3].id, ev=2021, netto_arbevetel=80.0),
+    ])
+    db.commit()
+    resp = client.post(
+        "/exports",
+        json={"format": "arrow", "dataset": "companies_financials", "ids": [companies[3].id, companies[1].id, companies[0].id]},
+        headers=auth_headers,
+    )
+    _run(run_jobs_inline)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    table = pa.ipc.open_file(pa.BufferReader(resp.content)).read_all()
+    assert "id" not in table.column_names
+    assert table.schema.field("netto_arbevetel").type == pa.float64()
+    assert table.column("nev").to_pylist() == ["Export 03 Kft.", "Export 01 Kft.", "Export 00 Kft."]
+    assert table.column("ev").to_pylist() == [2021, 2023, None]
+    assert table.column("netto_arbevetel").to_pylist() == [80.0, 150.5, None]
+
+
+def test_export_fields(client, auth_headers, companies, run_jobs_inline, db):
+    db.add(FinancialReport(company_id=companies[2].id, ev=2023, netto_arbevetel=70.0))
+    db.commit()
+    resp = client.post(
+        "/exports",
+        json={"format": "arrow", "dataset": "companies_financials", "ids": [companies[2].id], "fields": ["netto_arbevetel", "nev"]},
+        headers=auth_headers,
+    )
+    _run(run_jobs_inline)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    table = pa.ipc.open_file(pa.BufferReader(resp.content)).read_all()
+    # Company columns first, then the financial ones
+    assert table.column_names == ["nev", "netto_arbevetel"]
+    assert table.to_pylist() == [{"nev": "Export 02 Kft.", "netto_arbevetel": 70.0}]
+
+    resp = client.post("/exports", json={"fields": ["nev", "netto_arbevetel"]}, headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_free_package_row_limit(client, auth_headers, companies, run_jobs_inline, monkeypatch):
+    monkeypatch.setitem(EXPORT_ROW_LIMITS, "free", 4)
+    resp = client.post("/exports", json={"format": "csv"}, headers=auth_headers)
+    _run(run_jobs_inline)
+    assert client.get(f"/exports/{resp.json()['id']}", headers=auth_headers).json()["total_rows"] == 4
+
+    resp = client.post("/exports", json={"ids": [c.id for c in companies]}, headers=auth_headers)
+    assert resp.status_code == 403
+
+
+def test_download_before_done(client, auth_headers, companies):
+    resp = client.post("/exports", json={"format": "csv"}, headers=auth_headers)
+    resp = client.get(f"/exports/{resp.json()['id']}/download", headers=auth_headers)
+    assert resp.status_code == 409
+
+
+def test_filters_and_ids_are_exclusive(client, auth_headers):
+    resp = client.post("/exports", json={"ids": [1], "filters": {"q": "x"}}, headers=auth_headers)
+    assert resp.status_code == 422
+
+
+def test_active_job_limit(client, auth_headers, companies):
+    for _ in range(exports.ACTIVE_JOB_LIMIT):
+        assert client.post("/exports", json={}, headers=auth_headers).status_code == 202
+    assert client.post("/exports", json={}, headers=auth_headers).status_code == 429
+
+
+def test_jobs_are_private(client, auth_headers, admin_headers, companies):
+    job_id = client.post("/exports", json={}, headers=auth_headers).json()["id"]
+    assert client.get(f"/exports/{job_id}", headers=admin_headers).status_code == 404
+    assert client.get("/exports", headers=admin_headers).json() == []
+    assert len(client.get("/exports", headers=auth_headers).json()) == 1
+
+
+def test_delete_removes_file(client, auth_headers, companies, run_jobs_inline, db):
+    job_id = client.post("/exports", json={}, headers=auth_headers).json()["id"]
+    _run(run_jobs_inline)
+    path = db.get(ExportJob, job_id).file_path
+    assert client.delete(f"/exports/{job_id}", headers=auth_headers).status_code == 204
+    assert not os.path.exists(path)
+    assert client.get(f"/exports/{job_id}", headers=auth_headers).status_code == 404
+
+
+def test_enqueue_failure_fails_job(client, auth_headers, companies, monkeypatch, db):
+    def broker_down(_job_id):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(exports.run_export, "delay", broker_down)
+    for _ in range(exports.ACTIVE_JOB_LIMIT + 1):
+        assert client.post("/exports", json={}, headers=auth_headers).status_code == 503
+    assert {job.status for job in db.query(ExportJob)} == {"failed"}
+
+
+def test_stale_running_job_is_taken_over(client, auth_headers, companies, run_jobs_inline, db):
+    for _ in range(exports.ACTIVE_JOB_LIMIT):
+        client.post("/exports", json={}, headers=auth_headers)
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.export_job_stale_seconds + 60)
+    jobs = db.query(ExportJob).order_by(ExportJob.id).all()
+    for job in jobs:
+        job.status, job.started_at, job.heartbeat_at = "running", stale, stale
+    jobs[2].heartbeat_at = datetime.now(timezone.utc)
+    db.commit()
+
+    # Redelivered after a worker crash: the stale job is taken over, the live one left alone
+    run_export_job(jobs[0].id, TestSession)
+    run_export_job(jobs[2].id, TestSession)
+    db.expire_all()
+    assert [job.status for job in jobs] == ["done", "running", "running"]
+    assert jobs[0].processed_rows == len(companies)
+
+    # The job whose task never came back stops counting as active and can be deleted
+    assert client.post("/exports", json={}, headers=auth_headers).status_code == 202
+    db.expire_all()
+    assert (jobs[1].status, jobs[2].status) == ("failed", "running")
+    assert client.delete(f"/exports/{jobs[1].id}", headers=auth_headers).status_code == 204
+
+
+def test_purge_expired_exports(client, auth_headers, companies, run_jobs_inline, db, tmp_path):
+    for _ in range(2):
+        client.post("/exports", json={}, headers=auth_headers)
+    _run(run_jobs_inline)
+    old, recent = db.query(ExportJob).order_by(ExportJob.id).all()
+    old.finished_at = datetime.now(timezone.utc) - timedelta(days=settings.export_retention_days + 1)
+    db.commit()
+    old_path, recent_path = old.file_path, recent.file_path
+    orphan = tmp_path / "export_999.csv.part"
+    orphan.write_text("x")
+    expired = (datetime.now(timezone.utc) - timedelta(days=settings.export_retention_days + 1)).timestamp()
+    os.utime(orphan, (expired, expired))
+
+    assert purge_expired_exports(TestSession) == 1
+    assert not os.path.exists(old_path) and not orphan.exists()
+    assert os.path.exists(recent_path)
+    db.expire_all()
+    assert [job.id for job in db.query(ExportJob)] == [recent.id]
+
@@ -245,6 +245,59 @@ def test_compare_success(
         assert "avg_roe" in company_data
 
 
+def test_compare_set_based(
+    client, auth_headers, db, company_with_financials, second_company_with_financials, sample_company
+):
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    first, second = company_with_financials.id, second_company_with_financials.id
+    ids = f"{second},{first},{sample_company.id},{first}"
+    statements = []
+
+    def counter(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        resp = client.get("/financial-analysis/compare", params={"ids": ids}, headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert resp.status_code == 200
+    # user + companies + reports
+    assert len(statements) == 3
+
+    items = resp.json()["companies"]
+    assert [c["company_id"] for c in items] == [second, first, sample_company.id, first]
+    for item in items[:2]:
+        single = client.get(f"/financial-analysis/{item['company_id']}", headers=auth_headers).json()
+        assert item["yearly_metrics"] == single["yearly_metrics"]
+        for key in ("avg_profit_margin", "avg_roe", "avg_debt_ratio", "avg_liquidity"):
+            assert item[key] == single[key]
+    assert items[2]["yearly_metrics"] == []
+    assert items[2]["avg_roe"] is None
+
+
+def test_compare_limit_by_package(client, auth_headers, db, test_user):
+    companies = [Company(nev=f"Cég {i}", adoszam=f"2{i:07d}-1-41", statusz="aktív") for i in range(51)]
+    db.add_all(companies)
+    db.commit()
+    ids = ",".join(str(c.id) for c in companies)
+
+    test_user.package = "enterprise"
+    db.commit()
+    resp = client.get("/financial-analysis/compare", params={"ids": ids}, headers=auth_headers)
+    assert resp.status_code == 400
+    assert "Maximum 50" in resp.json()["detail"]
+
+    resp = client.get(
+        "/financial-analysis/compare", params={"ids": ids.rsplit(",", 1)[0]}, headers=auth_headers
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["companies"]) == 50
+
+
 # ── GET /financial-analysis/benchmark ────────────────────────────────────────
 
 
@@ -337,3 +390,75 @@ def test_benchmark_no_peers(client, auth_headers, db):
     assert resp.status_code == 200
     data = resp.json()
     assert data["industry_company_count"] == 0
+
+
+def test_benchmark_materialized(client, auth_headers, db, company_with_financials, second_company_with_financials):
+    from sqlalchemy import delete, event, select
+
+    from app.models.industry_benchmark import IndustryBenchmark
+    from app.services.industry_benchmarks import refresh_industry_benchmarks
+    from tests.conftest import engine
+
+    def rows():
+        db.expire_all()
+        return {
+            (r.teaor_kod, r.ev): (r.company_count, r.avg_roe, r.roe_count)
+            for r in db.scalars(select(IndustryBenchmark))
+        }
+
+    # Kept current by the commits of the fixtures
+    assert rows() == {
+        ("6201", 2021): (1, 0.24, 1),
+        ("6201", 2022): (1, 0.233, 1),
+        ("6201", 2023): (2, pytest.approx(0.2335), 2),
+    }
+
+    third = Company(nev="Harmadik Bt.", adoszam="55555555-1-41", teaor_kod="6201", statusz="aktív")
+    db.add(third)
+    db.flush()
+    db.add(FinancialReport(company_id=third.id, ev=2023, roe=0.3, netto_arbevetel=10_000))
+    db.commit()
+    assert rows()[("6201", 2023)] == (3, pytest.approx(0.767 / 3), 3)
+
+    statements = []
+
+    def counter(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        resp = client.get(
+            "/financial-analysis/benchmark", params={"company_id": company_with_financials.id}, headers=auth_headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    # user + company + latest report + benchmark row
+    assert len(statements) == 4
+    data = resp.json()
+    assert data["industry_company_count"] == 2
+    metrics = {m["metric"]: m for m in data["metrics"]}
+    assert metrics["roe"]["industry_avg"] == 0.27  # (0.24 + 0.3) / 2, without the company itself
+    assert metrics["revenue"]["industry_avg"] == 105_000
+    assert metrics["debt_ratio"]["industry_avg"] == 0.333  # the third company has no value
+
+    # Without a row (e.g. before the first refresh-benchmarks) the reports are aggregated
+    db.execute(delete(IndustryBenchmark))
+    db.commit()
+    assert client.get(
+        "/financial-analysis/benchmark", params={"company_id": company_with_financials.id}, headers=auth_headers
+    ).json() == data
+    refresh_industry_benchmarks(db)
+
+    # A company moved to another TEÁOR code leaves every year of the old one
+    third.teaor_kod = "4711"
+    db.commit()
+    assert rows()[("6201", 2023)] == (2, pytest.approx(0.2335), 2)
+    assert rows()[("4711", 2023)] == (1, 0.3, 1)
+
+    db.delete(db.scalars(select(FinancialReport).filter_by(company_id=second_company_with_financials.id)).one())
+    db.commit()
+    incremental = rows()
+    assert incremental[("6201", 2023)] == (1, 0.227, 1)
+
+    assert refresh_industry_benchmarks(db) == len(incremental)
+    assert rows() == incremental
@@ -113,3 +113,30 @@ def test_integrations_require_auth(client):
 
     resp = client.post("/integrations/nav/query/12345678")
     assert resp.status_code == 401
+
+
+@patch("app.routers.integrations._nav_configured", return_value=True)
+@patch("app.routers.integrations.query_taxpayer")
+def test_nav_public_lookup_is_cached(mock_query, mock_configured, client, sample_company, db):
+    mock_query.return_value = {"success": True, "funcCode": "OK", "taxpayerName": "Teszt Kft."}
+
+    for adoszam in ("12345678", "12345678-1-41", "12345678"):
+        resp = client.get(f"/integrations/nav/lookup/{adoszam}")
+        assert resp.status_code == 200
+    assert mock_query.call_count == 1
+
+    # A change to the company behind the tax number drops its entry
+    sample_company.szekhely = "1011 Budapest, Fő utca 2."
+    db.commit()
+    client.get("/integrations/nav/lookup/12345678")
+    assert mock_query.call_count == 2
+
+
+@patch("app.routers.integrations._nav_configured", return_value=True)
+@patch("app.routers.integrations.query_taxpayer")
+def test_nav_public_lookup_does_not_cache_errors(mock_query, mock_configured, client):
+    mock_query.return_value = {"success": False, "funcCode": "ERROR", "message": "NAV API HTTP 500"}
+
+    for _ in range(2):
+        assert client.get("/integrations/nav/lookup/12345678").status_code == 422
+    assert mock_query.call_count == 2
@@ -20,6 +20,9 @@ echo ">>> Running database migrations..."
 cd "$APP_DIR/backend"
 sudo -u cegverzum "$APP_DIR/backend/venv/bin/alembic" upgrade head
 
+# New columns and indexes (CREATE INDEX CONCURRENTLY); the API does not create them at startup
+sudo -u cegverzum "$APP_DIR/backend/venv/bin/python" maintenance.py migrate-schema
+
 # --- 3. Frontend: rebuild ---
 echo ">>> Building frontend..."
 cd "$APP_DIR/frontend"
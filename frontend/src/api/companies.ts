@@ -1,5 +1,5 @@
 import { api } from './client'
-import type { Company, CompanyListItem, SearchParams, FinancialReport, Officer, NetworkData } from '../types'
+import type { Company, CompanyListItem, CompanySearchResponse, SearchParams, FinancialReport, Officer, NetworkData, ConnectionPathResult, CompanyProfile, CompanyProfileSection } from '../types'
 
 function buildQuery(params: SearchParams): URLSearchParams {
   const query = new URLSearchParams()
@@ -25,11 +25,17 @@ function buildQuery(params: SearchParams): URLSearchParams {
 
 export const companiesApi = {
   search: (params: SearchParams) => api.get<CompanyListItem[]>(`/companies/?${buildQuery(params)}`),
-  count: (params: SearchParams) => api.get<{ count: number }>(`/companies/count?${buildQuery(params)}`),
+  searchWithTotal: (params: SearchParams) => api.get<CompanySearchResponse>(`/companies/search?${buildQuery(params)}`),
+  count: (params: SearchParams) => api.get<{ count: number; is_estimate: boolean }>(`/companies/count?${buildQuery(params)}`),
   getById: (id: number) => api.get<Company>(`/companies/${id}`),
   getFinancials: (id: number) => api.get<FinancialReport[]>(`/companies/${id}/financials`),
   getOfficers: (id: number) => api.get<Officer[]>(`/companies/${id}/officers`),
-  getNetwork: (id: number) => api.get<NetworkData>(`/companies/${id}/network`),
+  getProfile: (id: number, include?: CompanyProfileSection[]) =>
+    api.get<CompanyProfile>(`/companies/${id}/profile${include ? `?include=${include.join(',')}` : ''}`),
+  getNetwork: (id: number, options?: { layout?: boolean }) =>
+    api.get<NetworkData>(`/companies/${id}/network${options?.layout ? '?layout=true' : ''}`),
+  getConnectionPath: (id: number, targetId: number, maxLength?: number) =>
+    api.get<ConnectionPathResult>(`/companies/${id}/path/${targetId}${maxLength ? `?max_length=${maxLength}` : ''}`),
   exportCsv: async (params: SearchParams): Promise<void> => {
     const query = buildQuery(params)
     query.delete('skip')
@@ -65,4 +71,18 @@ export const companiesApi = {
     a.click()
     URL.revokeObjectURL(url)
   },
+  exportNetwork: async (id: number, format: 'graphml' | 'gexf' | 'ndjson', depth = 2): Promise<void> => {
+    const token = localStorage.getItem('cegverzum_token')
+    const headers: Record<string, string> = {}
+    if (token) headers['Authorization'] = `Bearer ${token}`
+    const resp = await fetch(`/api/companies/${id}/network/export?format=${format}&depth=${depth}`, { headers })
+    if (!resp.ok) throw new Error('Export failed')
+    const blob = await resp.blob()
+    const url = URL.createObjectURL(blob)
+    const a = document.createElement('a')
+    a.href = url
+    a.download = `cegverzum_network_${id}.${format}`
+    a.click()
+    URL.revokeObjectURL(url)
+  },
 }
@@ -359,18 +359,15 @@ export function CompanyDetailPage() {
   useEffect(() => {
     if (!id) return
     const cid = Number(id)
-    Promise.all([
-      companiesApi.getById(cid),
-      companiesApi.getFinancials(cid),
-      companiesApi.getOfficers(cid),
-    ])
-      .then(([c, f, o]) => { setCompany(c); setFinancials(f); setOfficers(o) })
+    companiesApi.getProfile(cid, ['financials', 'officers', 'watchlist'])
+      .then(p => {
+        setCompany(p.company)
+        setFinancials(p.financials ?? [])
+        setOfficers(p.officers ?? [])
+        setIsWatched(p.watchlist?.is_watched ?? false)
+      })
       .catch(err => setError(err instanceof Error ? err.message : s.errorOccurred))
       .finally(() => setLoading(false))
-
-    watchlistApi.check(cid)
-      .then(s => setIsWatched(s.is_watched))
-      .catch(() => {})
   }, [id])
 
   const toggleWatch = async () => {
@@ -19,6 +19,8 @@ export function NetworkPage() {
       legendConnected: 'Kapcsolt',
       statsCompanies: 'cég',
       statsConnections: 'kapcsolat',
+      clusterInfo: (size: number, negative: number) => `${size} cégből álló csoport, ${negative} negatív eseménnyel`,
+      exportGraph: 'Letöltés (Gephi):',
       navHint: 'Kattints egy cégre a hálóban a részletek megtekintéséhez, vagy az új központi cégként való betöltéshez.',
     },
     en: {
@@ -31,6 +33,8 @@ export function NetworkPage() {
       legendConnected: 'Connected',
       statsCompanies: 'companies',
       statsConnections: 'connections',
+      clusterInfo: (size: number, negative: number) => `${size}-company group, ${negative} with negative events`,
+      exportGraph: 'Download (Gephi):',
       navHint: 'Click on a company in the graph to view its details or load it as the new center.',
     },
   }
@@ -49,7 +53,7 @@ export function NetworkPage() {
   const loadNetwork = useCallback(async (companyId: number) => {
     setLoading(true)
     try {
-      const data = await companiesApi.getNetwork(companyId)
+      const data = await companiesApi.getNetwork(companyId, { layout: true })
       setNetworkData(data)
       const center = data.nodes.find(n => n.is_center)
       if (center) setSelectedCompany(center.nev)
@@ -99,6 +103,8 @@ export function NetworkPage() {
     setSearchParams({ company: String(node.id) })
   }, [setSearchParams])
 
+  const centerId = networkData?.nodes.find(n => n.is_center)?.id ?? null
+
   // Graph data transformation
   const graphData = networkData ? {
     nodes: networkData.nodes.map(n => ({
@@ -107,6 +113,9 @@ export function NetworkPage() {
       statusz: n.statusz,
       isCenter: n.is_center,
       val: n.is_center ? 8 : 3,
+      // Server-side layout: pinned, so the browser does not run the simulation
+      fx: n.x,
+      fy: n.y,
     })),
     links: networkData.links.map(l => ({
       source: l.source,
@@ -208,6 +217,23 @@ export function NetworkPage() {
                 </span>
               </div>
               <p className="text-gray-400 mt-1">{networkData.nodes.length} {s.statsCompanies}, {networkData.links.length} {s.statsConnections}</p>
+              {networkData.cluster && (
+                <p className="text-gray-400">{s.clusterInfo(networkData.cluster.cluster_size, networkData.cluster.negative_count)}</p>
+              )}
+              {centerId !== null && (
+                <p className="text-gray-400 mt-1 flex items-center gap-2">
+                  {s.exportGraph}
+                  {(['graphml', 'gexf'] as const).map(format => (
+                    <button
+                      key={format}
+                      onClick={() => companiesApi.exportNetwork(centerId, format).catch(() => {})}
+                      className="text-teal hover:underline bg-transparent border-none cursor-pointer p-0 text-xs"
+                    >
+                      {format.toUpperCase()}
+                    </button>
+                  ))}
+                </p>
+              )}
             </div>
 
             <ForceGraph2D
@@ -221,7 +247,7 @@ export function NetworkPage() {
               linkWidth={1.5}
               linkLabel={(link: { officers?: string[] }) => (link.officers || []).join(', ')}
               onNodeClick={handleNodeClick}
-              cooldownTicks={100}
+              cooldownTicks={networkData.nodes[0]?.x !== undefined ? 0 : 100}
               nodeCanvasObject={(node: { x?: number; y?: number; isCenter?: boolean; name?: string }, ctx: CanvasRenderingContext2D) => {
                 const x = node.x || 0
                 const y = node.y || 0
@@ -55,6 +55,7 @@ const t = {
     points: 'pont',
     negativeEventsTitle: 'Negatív események',
     noNegativeEvents: 'Nincs negatív esemény',
+    clusterInfo: (size: number, negative: number) => `Egy ${size} cégből álló csoport tagja (közös tisztségviselők), ebből ${negative} cégnél van negatív esemény`,
     labelDebt: 'Eladósodottság',
     labelEquity: 'Saját tőke',
     labelLiquidity: 'Likviditás',
@@ -119,6 +120,7 @@ const t = {
     points: 'pts',
     negativeEventsTitle: 'Negative Events',
     noNegativeEvents: 'No negative events',
+    clusterInfo: (size: number, negative: number) => `Part of a ${size}-company group (shared officers), ${negative} with negative events`,
     labelDebt: 'Debt Ratio',
     labelEquity: 'Equity',
     labelLiquidity: 'Liquidity',
@@ -451,6 +453,9 @@ export function RiskAnalysisPage() {
                       ))}
                     </div>
                   )}
+                  {risk.cluster && (
+                    <p className="text-xs text-gray-500 mt-3">{s.clusterInfo(risk.cluster.cluster_size, risk.cluster.negative_count)}</p>
+                  )}
                 </div>
 
                 {/* Financial Risk Indicators */}
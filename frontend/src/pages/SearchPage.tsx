@@ -216,6 +216,7 @@ export function SearchPage() {
   // Results
   const [results, setResults] = useState<CompanyListItem[]>([])
   const [count, setCount] = useState(0)
+  const [countIsEstimate, setCountIsEstimate] = useState(false)
   const [loading, setLoading] = useState(false)
   const [searched, setSearched] = useState(false)
 
@@ -311,15 +312,14 @@ export function SearchPage() {
     }
 
     try {
-      const [data, countResp] = await Promise.all([
-        companiesApi.search(params),
-        companiesApi.count(params),
-      ])
-      setResults(data)
-      setCount(countResp.count)
+      const data = await companiesApi.searchWithTotal(params)
+      setResults(data.items)
+      setCount(data.total)
+      setCountIsEstimate(data.total_is_estimate)
     } catch {
       setResults([])
       setCount(0)
+      setCountIsEstimate(false)
     } finally {
       setLoading(false)
     }
@@ -768,7 +768,7 @@ export function SearchPage() {
         <div className="animate-fade-in">
           {/* Toolbar: count, sort, export, view toggle */}
           <div className="flex flex-wrap items-center justify-between gap-3 mb-4">
-            <p className="text-sm text-gray-500 dark:text-gray-400">{count} találat</p>
+            <p className="text-sm text-gray-500 dark:text-gray-400">{countIsEstimate && 'kb. '}{count} találat</p>
 
             <div className="flex items-center gap-2">
               {/* Sort */}
@@ -75,6 +75,22 @@ export interface SearchParams {
   limit?: number
 }
 
+export interface CompanyFacets {
+  statusz: Record<string, number>
+  cegforma: Record<string, number>
+  letszam_kategoria: Record<string, number>
+  teaor_fo: Record<string, number>
+  negative_events: Record<string, number>
+}
+
+export interface CompanySearchResponse {
+  items: CompanyListItem[]
+  total: number
+  total_is_estimate: boolean
+  next_cursor: string | null
+  facets: CompanyFacets | null
+}
+
 export interface FinancialReport {
   id: number
   company_id: number
@@ -109,6 +125,7 @@ export interface Officer {
   nev: string
   anyja_neve: string | null
   titulus: string | null
+  person_id: number | null
 }
 
 export interface Module {
@@ -227,6 +244,9 @@ export interface NetworkNode {
   nev: string
   statusz: string
   is_center: boolean
+  level: number
+  x?: number  // with ?layout=true
+  y?: number
 }
 
 export interface NetworkLink {
@@ -235,9 +255,31 @@ export interface NetworkLink {
   officers: string[]
 }
 
+export interface CompanyCluster {
+  cluster_id: number
+  cluster_size: number
+  negative_count: number
+  computed_at: string
+}
+
 export interface NetworkData {
   nodes: NetworkNode[]
   links: NetworkLink[]
+  truncated: boolean
+  cluster: CompanyCluster | null
+}
+
+export interface ConnectionPath {
+  companies: number[]
+  officers: string[][]
+}
+
+export interface ConnectionPathResult {
+  length: number | null
+  nodes: Omit<NetworkNode, 'level'>[]
+  paths: ConnectionPath[]
+  truncated: boolean
+  exhausted: boolean
 }
 
 export interface NavTaxNumberDetail {
@@ -368,6 +410,18 @@ export interface RiskAnalysis {
   sajat_toke: number | null
   likviditasi_gyorsrata: number | null
   adozott_eredmeny: number | null
+  cluster: CompanyCluster | null
+}
+
+export type CompanyProfileSection = 'financials' | 'officers' | 'risk' | 'financial_analysis' | 'watchlist'
+
+export interface CompanyProfile {
+  company: Company
+  financials: FinancialReport[] | null
+  officers: Officer[] | null
+  risk: RiskAnalysis | null
+  financial_analysis: FinancialAnalysis | null
+  watchlist: WatchlistStatus | null
 }
 
 export interface WatchlistRiskItem {